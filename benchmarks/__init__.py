@@ -0,0 +1,6 @@
+"""
+Benchmark suite for ThetaFlow's pricing, selection and backtest hot paths.
+
+Run with:
+    python -m benchmarks.run_benchmarks
+"""
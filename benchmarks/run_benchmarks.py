@@ -0,0 +1,272 @@
+"""
+run_benchmarks.py
+Measure throughput and peak memory of ThetaFlow hot paths and compare them to a stored baseline
+
+Examples:
+    python -m benchmarks.run_benchmarks                      # run and compare with baseline.json
+    python -m benchmarks.run_benchmarks --scale 4            # 4x larger inputs
+    python -m benchmarks.run_benchmarks --only select        # benchmarks whose name contains 'select'
+    python -m benchmarks.run_benchmarks --update-baseline    # record a new baseline
+
+A benchmark regresses when its throughput drops, or its peak memory grows, by more
+than the tolerance relative to the baseline. The exit status is 1 if anything regressed.
+Baselines are machine-specific; record one on the machine you compare on.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_chain, make_price_history
+from thetaflow.backtest import ThetaFlowBacktester
+from thetaflow.earnings import EarningsCalendar
+from thetaflow.ranking import rank_candidates
+from thetaflow.risk_model import estimate_delta, estimate_delta_batch
+from thetaflow.scenarios import stress_test
+from thetaflow.strategy import select_low_risk_calls
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.30
+
+
+def _delta_inputs(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(50, 500, size), rng.uniform(50, 500, size), rng.uniform(0.01, 2.0, size),
+            0.05, rng.uniform(0.1, 1.5, size))
+
+
+def bench_estimate_delta(size):
+    """Scalar estimate_delta called once per contract."""
+    price, strike, t, r, vol = _delta_inputs(size)
+    price, strike, t, vol = price.tolist(), strike.tolist(), t.tolist(), vol.tolist()
+
+    def run():
+        for i in range(size):
+            estimate_delta(price[i], strike[i], t[i], r, vol[i])
+    return run
+
+
+def bench_estimate_delta_batch(size):
+    """estimate_delta_batch over one array of contracts."""
+    inputs = _delta_inputs(size)
+    return lambda: estimate_delta_batch(*inputs)
+
+
+def bench_select_low_risk_calls(size):
+    """select_low_risk_calls on a multi-expiry chain, earnings served from memory."""
+    chain = make_chain(size)
+    calendar = EarningsCalendar(cache_file=None, fetcher=lambda symbol: None)
+    return lambda: select_low_risk_calls(chain, max_contracts=10, target_probability=0.9,
+                                         earnings_calendar=calendar)
+
+
+def bench_rank_candidates(size):
+    """rank_candidates returning the top 10 of a multi-expiry chain, earnings served from memory."""
+    chain = make_chain(size)
+    calendar = EarningsCalendar(cache_file=None, fetcher=lambda symbol: None)
+    return lambda: rank_candidates(chain, k=10, earnings_calendar=calendar)
+
+
+def bench_simulate_options_data(size):
+    """simulate_options_data called once per trading day."""
+    history = make_price_history(size)
+    backtester = ThetaFlowBacktester()
+    closes = history['Close'].tolist()
+    dates = list(history.index)
+
+    def run():
+        for price, date in zip(closes, dates):
+            backtester.simulate_options_data(price, date)
+    return run
+
+
+def _bench_backtest(size, vectorized):
+    history = make_price_history(size)
+
+    def run():
+        backtester = ThetaFlowBacktester(start_date=history.index[0], end_date=history.index[-1],
+                                         trade_options=not vectorized)
+        backtester.stock_data = history
+        with contextlib.redirect_stdout(io.StringIO()):
+            backtester.run_backtest(vectorized=vectorized)
+    return run
+
+
+def bench_run_backtest(size):
+    """Day-by-day run_backtest over `size` trading days."""
+    return _bench_backtest(size, vectorized=False)
+
+
+def bench_run_backtest_vectorized(size):
+    """Vectorized run_backtest over `size` trading days."""
+    return _bench_backtest(size, vectorized=True)
+
+
+def bench_stress_test(size):
+    """stress_test of `size` short calls on 20 underlyings over a 50 x 20 x 10 scenario grid."""
+    rng = np.random.default_rng(0)
+    spots = {f"T{i:02d}": float(rng.uniform(50, 500)) for i in range(20)}
+    tickers = rng.choice(list(spots), size)
+    spot = np.array([spots[t] for t in tickers])
+    positions = pd.DataFrame({
+        'ticker': tickers,
+        'quantity': -rng.integers(1, 10, size).astype(float),
+        'strike': np.round(spot * rng.uniform(1.0, 1.3, size), 2),
+        'time_to_expiry': rng.uniform(2, 90, size) / 365.25,
+        'implied_volatility': rng.uniform(0.2, 0.8, size),
+    })
+    grid = (np.linspace(-0.3, 0.3, 50), np.linspace(-0.1, 0.3, 20), np.arange(10) * 2)
+    return lambda: stress_test(positions, spots, *grid)
+
+
+# name -> (setup function, default size, unit counted by size)
+BENCHMARKS = {
+    'estimate_delta': (bench_estimate_delta, 10_000, 'contracts'),
+    'estimate_delta_batch': (bench_estimate_delta_batch, 1_000_000, 'contracts'),
+    'select_low_risk_calls': (bench_select_low_risk_calls, 5_000, 'rows'),
+    'rank_candidates': (bench_rank_candidates, 50_000, 'rows'),
+    'simulate_options_data': (bench_simulate_options_data, 1_260, 'days'),
+    'stress_test': (bench_stress_test, 1_000, 'positions'),
+    'run_backtest': (bench_run_backtest, 1_260, 'days'),
+    'run_backtest_vectorized': (bench_run_backtest_vectorized, 1_260, 'days'),
+}
+
+
+def run_benchmark(name, size, repeat=3):
+    """
+    Time a benchmark and measure its peak traced memory.
+
+    The best of `repeat` timed runs gives the throughput; a separate run under
+    tracemalloc gives peak memory (tracing slows execution, so it is not timed).
+
+    Returns:
+        dict: name, size, unit, seconds, throughput (units per second) and peak_mb.
+    """
+    setup, _, unit = BENCHMARKS[name]
+    run = setup(size)
+    run()  # Warm-up: imports, caches, first-call allocation
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'name': name,
+        'size': size,
+        'unit': unit,
+        'seconds': best,
+        'throughput': size / best if best > 0 else float('inf'),
+        'peak_mb': peak / 2 ** 20,
+    }
+
+
+def result_key(result):
+    return f"{result['name']}[{result['size']}]"
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Flag results that are slower or use more memory than the baseline allows.
+
+    Args:
+        results (list): Output of run_benchmark
+        baseline (dict): result_key -> stored result
+        tolerance (float): Allowed relative slowdown / memory growth
+
+    Returns:
+        list: Human-readable regression messages (empty if none)
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result_key(result))
+        if reference is None:
+            continue
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(
+                f"{result_key(result)}: throughput {result['throughput']:,.0f} {result['unit']}/s "
+                f"vs baseline {reference['throughput']:,.0f}"
+            )
+        # Ignore sub-megabyte noise in small benchmarks
+        if result['peak_mb'] > reference['peak_mb'] * (1 + tolerance) + 1.0:
+            regressions.append(
+                f"{result_key(result)}: peak memory {result['peak_mb']:.1f} MB "
+                f"vs baseline {reference['peak_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path):
+    baseline = load_baseline(path)
+    baseline.update({result_key(r): r for r in results})
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ThetaFlow benchmark suite")
+    parser.add_argument("--only", nargs="+", help="Run benchmarks whose name contains any of these")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every default input size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (best is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [n for n in BENCHMARKS if not args.only or any(pattern in n for pattern in args.only)]
+
+    print("=== ThetaFlow Benchmarks ===")
+    results = []
+    for name in names:
+        size = max(1, int(BENCHMARKS[name][1] * args.scale))
+        result = run_benchmark(name, size, repeat=args.repeat)
+        results.append(result)
+        print(f"{result_key(result):<36} {result['seconds'] * 1000:>10.2f} ms "
+              f"{result['throughput']:>14,.0f} {result['unit']}/s {result['peak_mb']:>9.1f} MB peak")
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"- {message}")
+        return 1
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Deterministic synthetic inputs for benchmarks.
+
+Everything is generated from a seed, so runs are repeatable and need no network access.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_chain(n_rows, seed=0, as_of=None, underlying_price=250.0, n_expiries=12, ticker="BENCH"):
+    """
+    Build a calls chain shaped like get_options_data output across several expiries.
+
+    Args:
+        n_rows (int): Number of contracts
+        seed (int): Random seed
+        as_of (Timestamp): Date the expiries are counted from (defaults to today)
+        underlying_price (float): Spot price written to currentPrice
+        n_expiries (int): Number of weekly expiries the rows are spread over
+        ticker (str): Underlying ticker written to the ticker column
+
+    Returns:
+        DataFrame: Synthetic chain
+    """
+    rng = np.random.default_rng(seed)
+    as_of = (as_of or pd.Timestamp.now()).normalize()
+    expiries = [(as_of + pd.Timedelta(days=7 * (i + 1))).strftime('%Y-%m-%d') for i in range(n_expiries)]
+    strikes = np.round(underlying_price * rng.uniform(0.6, 1.6, n_rows), 1)
+    return pd.DataFrame({
+        'contractSymbol': [f"{ticker}{i:09d}" for i in range(n_rows)],
+        'strike': strikes,
+        'lastPrice': np.round(rng.uniform(0.01, 25.0, n_rows), 2),
+        'bid': np.round(rng.uniform(0.01, 25.0, n_rows), 2),
+        'ask': np.round(rng.uniform(0.01, 25.0, n_rows), 2),
+        'volume': rng.integers(0, 10_000, n_rows),
+        'openInterest': rng.integers(0, 20_000, n_rows),
+        'impliedVolatility': rng.uniform(0.1, 1.5, n_rows),
+        'currentPrice': underlying_price,
+        'expiry': rng.choice(expiries, n_rows),
+        'ticker': ticker,
+    })
+
+
+def make_price_history(n_days, seed=0, start="2015-01-01", start_price=200.0, volatility=0.03):
+    """
+    Build daily OHLCV bars following a geometric random walk.
+
+    Args:
+        n_days (int): Number of business days
+        seed (int): Random seed
+        start (str): First date
+        start_price (float): Initial close
+        volatility (float): Daily log-return standard deviation
+
+    Returns:
+        DataFrame: Bars indexed by date, as returned by PriceCache.get_history
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days, name='Date')
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n_days)))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': 1e6}, index=dates)
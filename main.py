@@ -1,13 +1,53 @@
 """
 ThetaFlow – Income Generation via Options Time Decay
 Entry point: Fetch TSLA options data and identify viable covered call candidates.
+
+Run `python main.py --watch TSLA AAPL --interval 60` to keep polling a watchlist and
+print candidates as they appear or drop out.
 """
 
+import argparse
+import asyncio
+
 from thetaflow import data_fetch, strategy, utils
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ThetaFlow covered call selection")
+    parser.add_argument("--watch", nargs="+", metavar="TICKER", help="Monitor these tickers continuously")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between polls in --watch mode")
+    return parser.parse_args(argv)
+
+
+def print_event(event):
+    if event['type'] == 'new':
+        candidate = event['candidate']
+        print(f"[{event['time']:%H:%M:%S}] NEW     {event['contractSymbol']} strike {candidate['strike']} "
+              f"last {candidate['lastPrice']} prob {candidate['prob_profit']:.2%}")
+    else:
+        print(f"[{event['time']:%H:%M:%S}] DROPPED {event['contractSymbol']}")
+
+
+def watch(tickers, interval):
+    from thetaflow.monitor import WatchlistMonitor
+
+    print(f"=== ThetaFlow: watching {', '.join(tickers)} every {interval:g}s (Ctrl+C to stop) ===")
+    monitor = WatchlistMonitor(tickers, interval_seconds=interval, max_contracts=2,
+                               target_probability=0.90, on_event=print_event)
+    try:
+        asyncio.run(monitor.run())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    args = parse_args(argv)
     utils.setup_logging()
+    if args.watch:
+        watch(args.watch, args.interval)
+        utils.log_message("Watchlist monitor stopped")
+        return
+
     print("=== ThetaFlow: TSLA Covered Call Strategy ===")
 
     options_data = data_fetch.get_options_data("TSLA")
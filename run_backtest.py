@@ -9,13 +9,13 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from thetaflow.backtest import ThetaFlowBacktester
+from thetaflow.results_io import render_chart_async, save_results
 from thetaflow.utils import setup_logging
-import pandas as pd
 
 
 def main():
-    # Setup logging
-    setup_logging()
+    # Setup logging; per-day trade logs are written off the simulation thread
+    setup_logging(queued=True)
 
     print("=== ThetaFlow Backtesting System ===")
 
@@ -35,42 +35,16 @@ def main():
 
         # Save results if we have trades
         if not trades_df.empty:
-            # Ensure data directory exists
-            os.makedirs('data', exist_ok=True)
-
-            # Save to CSV
-            trades_df.to_csv('data/backtest_trades.csv', index=False)
-            portfolio_df.to_csv('data/backtest_portfolio.csv')
+            paths = save_results(portfolio_df, trades_df, 'data')
+            # Render the chart in a background process while the results are reported
+            chart = render_chart_async(portfolio_df, 'data/backtest_performance.png', ticker=backtester.ticker)
 
             print(f"\nResults saved to:")
-            print(f"- data/backtest_trades.csv ({len(trades_df)} trades)")
-            print(f"- data/backtest_portfolio.csv ({len(portfolio_df)} days)")
+            print(f"- {paths['trades']} ({len(trades_df)} trades)")
+            print(f"- {paths['portfolio']} ({len(portfolio_df)} days)")
 
-            # Try to create a simple performance chart
             try:
-                import matplotlib.pyplot as plt
-
-                plt.figure(figsize=(12, 6))
-                plt.subplot(1, 2, 1)
-                plt.plot(portfolio_df.index, portfolio_df['total_value'])
-                plt.title('Portfolio Value Over Time')
-                plt.xlabel('Date')
-                plt.ylabel('Portfolio Value ($)')
-                plt.xticks(rotation=45)
-                plt.grid(True, alpha=0.3)
-
-                plt.subplot(1, 2, 2)
-                plt.plot(portfolio_df.index, portfolio_df['stock_price'])
-                plt.title('TSLA Stock Price')
-                plt.xlabel('Date')
-                plt.ylabel('Stock Price ($)')
-                plt.xticks(rotation=45)
-                plt.grid(True, alpha=0.3)
-
-                plt.tight_layout()
-                plt.savefig('data/backtest_performance.png', dpi=300, bbox_inches='tight')
-                print(f"- data/backtest_performance.png (performance chart)")
-
+                print(f"- {chart.result()} (performance chart)")
             except ImportError:
                 print("matplotlib not available - skipping chart generation")
                 print("Install with: pip install matplotlib")
@@ -92,7 +66,7 @@ def main():
 
             # Show portfolio tracking
             if backtester.portfolio_value:
-                portfolio_df = pd.DataFrame(backtester.portfolio_value)
+                portfolio_df = backtester.portfolio_value.to_frame()
                 print(f"- Portfolio tracking: {len(portfolio_df)} days")
                 print(
                     f"- TSLA price range: ${portfolio_df['stock_price'].min():.2f} - ${portfolio_df['stock_price'].max():.2f}")
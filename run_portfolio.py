@@ -0,0 +1,72 @@
+"""
+run_portfolio.py
+Run a covered call backtest across several underlyings with a shared equity curve
+
+Example:
+    python run_portfolio.py --tickers TSLA AAPL MSFT NVDA --capital 1000000 \
+        --allocation inverse_volatility --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from thetaflow.portfolio import ALLOCATION_RULES, PortfolioBacktester
+from thetaflow.results_io import RESULT_FORMATS, write_frame
+from thetaflow.sweep import summarize_run
+from thetaflow.utils import setup_logging
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ThetaFlow multi-ticker portfolio backtest")
+    parser.add_argument("--tickers", nargs="+", required=True)
+    parser.add_argument("--start-date", default="2020-01-01")
+    parser.add_argument("--end-date", default="2024-12-31")
+    parser.add_argument("--capital", type=float, default=1_000_000)
+    parser.add_argument("--allocation", choices=ALLOCATION_RULES, default="equal")
+    parser.add_argument("--max-contracts", type=int, default=None, help="Cap on round lots per ticker")
+    parser.add_argument("--target-probability", type=float, default=0.90)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output-dir", default="data")
+    parser.add_argument("--format", choices=RESULT_FORMATS, default=None,
+                        help="Results format (default: Parquet when pyarrow is installed, else gzipped CSV)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    print("=== ThetaFlow Portfolio Backtest ===")
+    print(f"{len(args.tickers)} tickers from {args.start_date} to {args.end_date}, "
+          f"${args.capital:,.0f} allocated by {args.allocation}")
+
+    book = PortfolioBacktester(
+        args.tickers,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        initial_capital=args.capital,
+        allocation=args.allocation,
+        max_contracts=args.max_contracts,
+        max_workers=args.workers,
+        target_probability=args.target_probability
+    )
+    started = time.perf_counter()
+    equity_df, trades_df = book.run()
+    elapsed = time.perf_counter() - started
+
+    summary = summarize_run(equity_df, trades_df, args.capital)
+    print(f"\nCompleted in {elapsed:.1f}s")
+    print(f"Final value: ${summary['final_value']:,.2f} ({summary['total_return']:+.2%}), "
+          f"max drawdown {summary['max_drawdown']:.2%}, {summary['n_trades']} trades")
+
+    equity_path = write_frame(equity_df, os.path.join(args.output_dir, "portfolio_equity"), args.format)
+    trades_path = write_frame(trades_df, os.path.join(args.output_dir, "portfolio_trades"), args.format, index=False)
+    print(f"\nResults saved to {equity_path} and {trades_path}")
+
+
+if __name__ == "__main__":
+    main()
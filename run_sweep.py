@@ -0,0 +1,77 @@
+"""
+run_sweep.py
+Run a ThetaFlow backtest parameter sweep across a process pool
+
+Example:
+    python run_sweep.py --target-probability 0.85 0.9 0.95 --max-contracts 1 2 \
+        --strike-step 0.025 0.05 --days-to-expiry 7 14 30 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from thetaflow.results_io import RESULT_FORMATS, write_frame
+from thetaflow.sweep import run_sweep
+from thetaflow.utils import setup_logging
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ThetaFlow backtest parameter sweep")
+    parser.add_argument("--ticker", default="TSLA")
+    parser.add_argument("--start-date", default="2020-01-01")
+    parser.add_argument("--end-date", default="2024-12-31")
+    parser.add_argument("--target-probability", type=float, nargs="+", default=[0.90])
+    parser.add_argument("--max-contracts", type=int, nargs="+", default=[2])
+    parser.add_argument("--strike-step", type=float, nargs="+", default=[0.025])
+    parser.add_argument("--days-to-expiry", type=int, nargs="+", default=[30])
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--vectorized", action="store_true", help="Use the vectorized backtest mode (untraded portfolio)")
+    parser.add_argument("--output", default="data/sweep_results",
+                        help="Output path; the extension (.parquet, .feather, .csv, .csv.gz) picks the format")
+    parser.add_argument("--format", choices=RESULT_FORMATS, default=None,
+                        help="Results format (default: from --output, else Parquet when pyarrow is installed)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    print("=== ThetaFlow Parameter Sweep ===")
+
+    param_grid = {
+        'target_probability': args.target_probability,
+        'max_contracts': args.max_contracts,
+        'strike_step': args.strike_step,
+        'days_to_expiry': args.days_to_expiry,
+    }
+    n_configs = 1
+    for values in param_grid.values():
+        n_configs *= len(values)
+    print(f"Running {n_configs} configurations for {args.ticker} "
+          f"from {args.start_date} to {args.end_date}")
+
+    started = time.perf_counter()
+    results = run_sweep(
+        param_grid,
+        ticker=args.ticker,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        max_workers=args.workers,
+        vectorized=args.vectorized
+    )
+    elapsed = time.perf_counter() - started
+
+    output = write_frame(results, args.output, args.format, index=False)
+
+    print(f"\nCompleted in {elapsed:.1f}s")
+    print(results.sort_values('total_return', ascending=False).head(10).to_string(index=False))
+    print(f"\nResults saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
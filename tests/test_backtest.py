@@ -1,6 +1,20 @@
 import pytest
+import numpy as np
+import pandas as pd
 from thetaflow.backtest import ThetaFlowBacktester
 
+
+def make_price_history(start="2020-01-01", end="2025-01-01", flat=False, seed=0):
+    """Build deterministic daily bars (a random walk, or a flat $200 line)"""
+    dates = pd.bdate_range(start, end, inclusive='left')
+    if flat:
+        close = np.full(len(dates), 200.0)
+    else:
+        rng = np.random.default_rng(seed)
+        close = 200.0 * np.exp(np.cumsum(rng.normal(0, 0.03, len(dates))))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close,
+                         'Close': close, 'Volume': 1e6}, index=dates)
+
 def test_backtest_initialization():
     """Test backtest object creation"""
     bt = ThetaFlowBacktester(
@@ -11,3 +25,233 @@ def test_backtest_initialization():
     assert bt.ticker == "TSLA"
     # Initial capital should be 100000
     assert bt.initial_capital == 100000
+
+
+def test_backtest_reads_price_cache(tmp_path):
+    """Test that run_backtest loads prices through the local cache without network access"""
+    from thetaflow.price_cache import PriceCache
+
+    def downloader(ticker_symbol, start, end, interval):
+        return make_price_history(start, end, flat=True)
+
+    bt = ThetaFlowBacktester(
+        ticker="TSLA",
+        start_date="2023-01-02",
+        end_date="2023-02-01",
+        price_cache=PriceCache(cache_dir=str(tmp_path), downloader=downloader)
+    )
+    portfolio_df, trades_df = bt.run_backtest()
+    assert len(portfolio_df) == len(pd.bdate_range("2023-01-02", "2023-02-01", inclusive='left'))
+    assert (portfolio_df['stock_price'] == 200.0).all()
+    # Flat prices: premiums can only add to the starting capital
+    assert portfolio_df['total_value'].iloc[0] == bt.initial_capital
+    assert portfolio_df['total_value'].is_monotonic_increasing
+
+
+
+def test_vectorized_backtest_matches_loop():
+    """Test that the vectorized mode reproduces the day-by-day portfolio path without option trading"""
+    history = make_price_history()
+    loop_bt = ThetaFlowBacktester(trade_options=False)
+    loop_bt.stock_data = history
+    loop_portfolio, _ = loop_bt.run_backtest()
+
+    vec_bt = ThetaFlowBacktester(trade_options=False)
+    vec_bt.stock_data = history
+    vec_portfolio, _ = vec_bt.run_backtest(vectorized=True)
+    pd.testing.assert_frame_equal(loop_portfolio, vec_portfolio, check_dtype=False)
+    trading = ThetaFlowBacktester()
+    trading.stock_data = history
+    with pytest.raises(ValueError):
+        trading.run_backtest(vectorized=True)
+
+    date = history.index[100]
+    chain = vec_bt.simulate_options_data(float(history['Close'].iloc[100]), date)
+    np.testing.assert_array_equal(vec_bt.options_surface['strike'][100], chain['strike'])
+    np.testing.assert_array_equal(vec_bt.options_surface['lastPrice'][100], chain['lastPrice'])
+    assert vec_bt.options_surface['expiry'][100] == chain['expiry'].iloc[0]
+
+
+def test_iter_backtest_streams_and_resumes(tmp_path):
+    """Test that a run restored from a checkpoint continues to the same result as an uninterrupted run"""
+    history = make_price_history("2023-01-02", "2024-01-01")
+    full = ThetaFlowBacktester()
+    full.stock_data = history
+    full_portfolio, _ = full.run_backtest()
+
+    checkpoint = str(tmp_path / "run.ckpt")
+    partial = ThetaFlowBacktester()
+    partial.stock_data = history
+    days = partial.iter_backtest(checkpoint_path=checkpoint, checkpoint_every=50)
+    for _ in range(120):
+        state = next(days)
+    assert state['date'] == history.index[119]
+    days.close()  # Simulate a crash after the checkpoint at day 100
+
+    resumed = ThetaFlowBacktester.load_checkpoint(checkpoint)
+    assert resumed.last_date == history.index[99]
+    resumed.stock_data = history
+    resumed_portfolio, _ = resumed.run_backtest()
+    pd.testing.assert_frame_equal(resumed_portfolio, full_portfolio)
+
+
+def test_periodic_checkpoints_append_only_new_rows(tmp_path):
+    """Test that repeated checkpoints append ledger rows instead of rewriting the history"""
+    history = make_price_history("2020-01-01", "2024-01-01")
+    checkpoint = tmp_path / "run.ckpt"
+    ledgers = tmp_path / "run.ckpt.ledgers"
+    bt = ThetaFlowBacktester()
+    bt.stock_data = history
+    days = bt.iter_backtest(checkpoint_path=str(checkpoint), checkpoint_every=100)
+    for _ in range(101):  # The checkpoint after day 100 is written when day 101 is requested
+        next(days)
+    first_state, first_ledgers = checkpoint.stat().st_size, ledgers.read_bytes()
+    for _ in days:
+        pass
+
+    # The state file does not grow with the history; the ledger file only grows at its end
+    assert checkpoint.stat().st_size < 2 * first_state
+    assert ledgers.read_bytes()[:len(first_ledgers)] == first_ledgers
+    resumed = ThetaFlowBacktester.load_checkpoint(str(checkpoint))
+    pd.testing.assert_frame_equal(resumed.portfolio_value.to_frame(), bt.portfolio_value.to_frame())
+    pd.testing.assert_frame_equal(resumed.trades.to_frame(), bt.trades.to_frame())
+
+
+def test_appending_a_day_processes_only_that_day():
+    """Test that extending a finished backtest steps through the new bar only"""
+    history = make_price_history("2023-01-02", "2023-03-01")
+    bt = ThetaFlowBacktester()
+    bt.stock_data = history.iloc[:-1]
+    bt.run_backtest()
+    bt.stock_data = history
+    states = list(bt.iter_backtest())
+    assert [s['date'] for s in states] == [history.index[-1]]
+    assert len(bt.portfolio_value) == len(history)
+
+
+def test_print_results_requires_a_run():
+    """Test that print_results no longer re-runs the backtest behind the caller's back"""
+    bt = ThetaFlowBacktester()
+    with pytest.raises(ValueError):
+        bt.print_results()
+
+
+def make_option_chain(price, date, strikes=(210.0, 230.0, 250.0), premium=1.5, days=28):
+    """Build a liquid 28-day chain on the given day"""
+    return pd.DataFrame({
+        'strike': list(strikes),
+        'lastPrice': premium,
+        'impliedVolatility': 0.3,
+        'openInterest': [5000, 4000, 3000],
+        'currentPrice': price,
+        'expiry': pd.Timestamp(date) + pd.Timedelta(days=days),
+    })
+
+
+def test_historical_runs_do_not_look_up_live_earnings(monkeypatch):
+    """Test that a chain with a ticker column never reaches the live earnings calendar"""
+    from thetaflow import strategy
+
+    def live_calendar():
+        raise AssertionError("live earnings lookup during a backtest")
+
+    monkeypatch.setattr(strategy, 'get_default_calendar', live_calendar)
+    bt = ThetaFlowBacktester(max_contracts=1)
+    day = pd.Timestamp('2024-01-02')
+    bt.step(day, 200.0, make_option_chain(200.0, day).assign(ticker='TSLA'))
+    assert 'sell_call' in bt.trades.to_frame()['action'].tolist()
+
+
+def test_calls_are_sold_and_expire_worthless():
+    """Test the sell -> expire cycle, including covering with stock first"""
+    bt = ThetaFlowBacktester(max_contracts=2)
+    day = pd.Timestamp('2024-01-02')
+    bt.step(day, 200.0, make_option_chain(200.0, day))
+    trades = bt.trades.to_frame()
+    assert trades['action'].tolist() == ['buy_stock', 'sell_call', 'sell_call']
+    assert bt.stock_position == 200
+    assert bt.option_positions.open_contracts('TSLA') == 2
+
+    # No new sales while covered, then both calls expire out of the money
+    bt.step(day + pd.Timedelta(days=1), 200.0, make_option_chain(200.0, day + pd.Timedelta(days=1)))
+    assert len(bt.trades) == 3
+    bt.step(day + pd.Timedelta(days=28), 205.0, pd.DataFrame())
+    assert bt.trades.to_frame()['action'].tolist()[-2:] == ['expired', 'expired']
+    expected_cash = 100000 - 200 * 200.0 + 2 * (1.5 * 100 - 0.65)
+    assert bt.current_capital == pytest.approx(expected_cash)
+
+
+def test_in_the_money_calls_are_assigned_and_stock_rebought():
+    """Test that assignment delivers the shares at the strike and the stock is bought back"""
+    bt = ThetaFlowBacktester(max_contracts=1)
+    day = pd.Timestamp('2024-01-02')
+    bt.step(day, 200.0, make_option_chain(200.0, day))
+    strike = bt.trades.to_frame()['strike'].iloc[-1]
+    expiry_day = day + pd.Timedelta(days=28)
+    bt.step(expiry_day, 300.0, pd.DataFrame())
+    actions = bt.trades.to_frame()['action'].tolist()
+    assert actions[2:] == ['assigned', 'buy_stock']
+    assert bt.trades.to_frame()['cash_flow'].iloc[2] == pytest.approx(strike * 100)
+    assert bt.stock_position == 100
+
+
+def test_review_closes_profitable_calls_early():
+    """Test take-profit buy-backs at the review date"""
+    bt = ThetaFlowBacktester(max_contracts=1, review_days=7, take_profit=0.5)
+    day = pd.Timestamp('2024-01-02')
+    bt.step(day, 200.0, make_option_chain(200.0, day))
+    review_day = day + pd.Timedelta(days=21)
+    cheap = make_option_chain(200.0, day, premium=0.5)
+    bt.step(review_day, 200.0, cheap)
+    trades = bt.trades.to_frame()
+    assert 'buy_to_close' in trades['action'].tolist()
+    # The freed lot is written again the same day
+    assert trades['action'].iloc[-1] == 'sell_call'
+
+
+def minute_bars(ticker_symbol, start, end, interval):
+    """Serve flat $200 one-minute bars for regular trading hours"""
+    days = pd.bdate_range(start, end, inclusive='left')
+    times = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(day + pd.Timedelta(hours=9, minutes=30), periods=390, freq='min') for day in days
+    ]))
+    return pd.DataFrame({'Open': 200.0, 'High': 200.0, 'Low': 200.0, 'Close': 200.0, 'Volume': 1e3},
+                        index=times)
+
+
+def test_intraday_mode_streams_chunks_and_decays_premium(tmp_path):
+    """Test that minute bars arrive in bounded chunks and short calls lose value bar by bar"""
+    from thetaflow.price_cache import PriceCache
+
+    bt = ThetaFlowBacktester(
+        start_date="2023-01-02", end_date="2023-01-14", max_contracts=1,
+        price_cache=PriceCache(cache_dir=str(tmp_path), downloader=minute_bars)
+    )
+    chunks = list(bt.iter_intraday(interval="1m", chunk_size=500))
+    assert max(len(chunk) for chunk in chunks) == 500
+    bars = pd.concat(chunks)
+    assert len(bars) == 10 * 390
+    # One daily row per trading day, not one per bar
+    assert len(bt.portfolio_value) == 10
+
+    assert (bt.trades.to_frame()['action'] == 'sell_call').sum() == 1
+    marks = bars['option_value'].to_numpy()
+    assert marks[0] > 0
+    assert np.all(np.diff(marks) <= 1e-9)
+
+
+def test_intraday_calls_settle_at_the_expiry_close(tmp_path):
+    """Test that intraday calls expire at the session close and settle on that day's last bar"""
+    from thetaflow.price_cache import PriceCache
+
+    bt = ThetaFlowBacktester(
+        start_date="2023-01-02", end_date="2023-01-07", max_contracts=1, days_to_expiry=3,
+        price_cache=PriceCache(cache_dir=str(tmp_path), downloader=minute_bars)
+    )
+    bars = pd.concat(bt.iter_intraday(interval="1m"))
+    trades = bt.trades.to_frame()
+    first_expiry = trades[trades['action'] == 'expired'].iloc[0]
+    assert first_expiry['expiry'] == pd.Timestamp("2023-01-05 16:00")
+    assert first_expiry['date'] == pd.Timestamp("2023-01-05 15:59")
+    # The call keeps time value through the expiry day's open
+    assert bars.loc[pd.Timestamp("2023-01-05 09:30"), 'option_value'] > 0
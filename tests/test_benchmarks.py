@@ -0,0 +1,25 @@
+from benchmarks.run_benchmarks import BENCHMARKS, DEFAULT_BASELINE, compare_to_baseline, load_baseline, run_benchmark
+
+
+def test_every_benchmark_runs_on_tiny_inputs():
+    """Test that each benchmark runs offline and reports throughput and memory"""
+    for name in BENCHMARKS:
+        result = run_benchmark(name, size=20, repeat=1)
+        assert result['throughput'] > 0
+        assert result['peak_mb'] >= 0
+
+
+def test_compare_flags_slowdowns_and_memory_growth():
+    """Test regression detection against a stored baseline"""
+    baseline = {'select_low_risk_calls[5000]': {'throughput': 1000.0, 'peak_mb': 10.0}}
+    fast = {'name': 'select_low_risk_calls', 'size': 5000, 'unit': 'rows', 'throughput': 900.0, 'peak_mb': 10.0}
+    slow = dict(fast, throughput=500.0, peak_mb=30.0)
+    assert compare_to_baseline([fast], baseline, tolerance=0.3) == []
+    assert len(compare_to_baseline([slow], baseline, tolerance=0.3)) == 2
+
+
+def test_baseline_covers_every_benchmark():
+    """Test that each benchmark has a stored baseline at its default size, so none run unchecked"""
+    baseline = load_baseline(DEFAULT_BASELINE)
+    for name, (_, size, unit) in BENCHMARKS.items():
+        assert baseline[f"{name}[{size}]"]['unit'] == unit
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from thetaflow.data_fetch import get_options_chains, get_options_data
+from thetaflow.providers import DataProvider
+
+
+class FakeProvider(DataProvider):
+    """Offline provider serving a few weekly expiries"""
+
+    def current_price(self, ticker_symbol):
+        if ticker_symbol == 'BAD':
+            raise ValueError("possibly delisted")
+        return 100.0
+
+    def option_expiries(self, ticker_symbol):
+        today = pd.Timestamp.now().normalize()
+        return [(today + pd.Timedelta(days=d)).strftime('%Y-%m-%d') for d in (3, 10, 17, 45)]
+
+    def option_chain(self, ticker_symbol, expiry):
+        return pd.DataFrame({
+            'contractSymbol': [f"{ticker_symbol}{expiry}C{k}" for k in (95, 105)],
+            'strike': [95.0, 105.0],
+        })
+
+    def next_earnings(self, ticker_symbol):
+        return None
+
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        raise ValueError("No price history in this fake")
+
+
+def test_fetches_every_expiry_for_every_ticker():
+    """Test that chains are concatenated with typed ticker and expiry columns"""
+    chains = get_options_chains(['TSLA', 'aapl'], max_workers=4, provider=FakeProvider())
+    assert len(chains) == 2 * 4 * 2
+    assert list(chains['ticker'].cat.categories) == ['TSLA', 'AAPL']
+    assert pd.api.types.is_datetime64_dtype(chains['expiry'])
+    assert (chains['currentPrice'] == 100.0).all()
+
+
+def test_expiry_window_and_failed_tickers():
+    """Test that the expiry window is applied and failing tickers are skipped"""
+    chains = get_options_chains(['TSLA', 'BAD'], expiry_window=(7, 30), provider=FakeProvider())
+    assert set(chains['ticker']) == {'TSLA'}
+    assert chains['expiry'].nunique() == 2
+
+
+def test_raises_when_nothing_fetched():
+    """Test that an error is raised when no ticker returns data"""
+    with pytest.raises(ValueError):
+        get_options_chains(['BAD'], provider=FakeProvider())
+
+
+def test_single_chain_uses_nearest_expiry():
+    """Test that get_options_data returns the nearest expiry with reference columns"""
+    calls = get_options_data('TSLA', provider=FakeProvider())
+    assert calls['expiry'].nunique() == 1
+    assert (calls['ticker'] == 'TSLA').all()
+    assert (calls['currentPrice'] == 100.0).all()
@@ -0,0 +1,41 @@
+import pandas as pd
+from thetaflow.earnings import EarningsCalendar, ticker_from_options
+
+
+def test_lookups_are_cached_within_ttl():
+    """Test that repeated lookups only fetch once while the entry is fresh"""
+    calls = []
+    calendar = EarningsCalendar(cache_file=None, fetcher=lambda s: calls.append(s) or pd.Timestamp('2025-07-23'))
+    assert calendar.next_earnings('tsla') == pd.Timestamp('2025-07-23')
+    assert calendar.next_earnings('TSLA') == pd.Timestamp('2025-07-23')
+    assert calls == ['TSLA']
+
+
+def test_stale_entry_served_while_refreshing_in_background():
+    """Test that an expired entry is returned immediately and refreshed asynchronously"""
+    dates = iter([pd.Timestamp('2025-04-22'), pd.Timestamp('2025-07-23')])
+    calendar = EarningsCalendar(ttl_seconds=0, cache_file=None, fetcher=lambda s: next(dates))
+    assert calendar.next_earnings('TSLA') == pd.Timestamp('2025-04-22')
+    # Stale: the old value comes back straight away and a refresh starts
+    assert calendar.next_earnings('TSLA') == pd.Timestamp('2025-04-22')
+    calendar._refreshing['TSLA'].join(timeout=5)
+    assert calendar.next_earnings('TSLA') == pd.Timestamp('2025-07-23')
+
+
+def test_cache_persists_to_disk(tmp_path):
+    """Test that a new calendar instance reuses entries written by a previous one"""
+    cache_file = str(tmp_path / "earnings.json")
+    EarningsCalendar(cache_file=cache_file, fetcher=lambda s: pd.Timestamp('2025-07-23')).next_earnings('AAPL')
+
+    def offline(symbol):
+        raise AssertionError("should not fetch")
+
+    calendar = EarningsCalendar(cache_file=cache_file, fetcher=offline)
+    assert calendar.next_earnings('AAPL') == pd.Timestamp('2025-07-23')
+
+
+def test_ticker_from_contract_symbol():
+    """Test that the underlying is parsed from OCC contract symbols when no ticker column exists"""
+    chain = pd.DataFrame({'contractSymbol': ['BRK.B250620C00450000']})
+    assert ticker_from_options(chain) == 'BRK.B'
+    assert ticker_from_options(chain.assign(ticker='NVDA')) == 'NVDA'
@@ -0,0 +1,58 @@
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.ledger import ColumnarLedger, PORTFOLIO_COLUMNS
+
+
+def test_append_grows_past_initial_capacity():
+    """Test that rows survive buffer growth and export in column order"""
+    ledger = ColumnarLedger(PORTFOLIO_COLUMNS, initial_capacity=2)
+    dates = pd.bdate_range("2024-01-01", periods=5)
+    for i, date in enumerate(dates):
+        ledger.append(date=date, stock_price=100.0 + i, stock_value=0.0, cash=1000.0, total_value=1000.0)
+    frame = ledger.to_frame()
+    assert len(ledger) == 5
+    assert list(frame.columns) == list(PORTFOLIO_COLUMNS)
+    assert (frame['date'] == dates).all()
+    np.testing.assert_array_equal(frame['stock_price'], [100.0, 101.0, 102.0, 103.0, 104.0])
+
+
+def test_extend_and_zero_copy_export():
+    """Test bulk appends and that the exported frame shares the ledger's buffers"""
+    ledger = ColumnarLedger(PORTFOLIO_COLUMNS)
+    n = 10
+    ledger.extend(date=pd.bdate_range("2024-01-01", periods=n), stock_price=np.arange(n, dtype=float),
+                  stock_value=np.zeros(n), cash=np.ones(n), total_value=np.ones(n))
+    frame = ledger.to_frame()
+    assert np.shares_memory(frame['stock_price'].to_numpy(), ledger._data['stock_price'])
+    assert not np.shares_memory(ledger.to_frame(copy=True)['cash'].to_numpy(), ledger._data['cash'])
+    with pytest.raises(ValueError):
+        ledger.extend(date=[pd.Timestamp("2024-02-01")], stock_price=[1.0, 2.0],
+                      stock_value=[0.0], cash=[0.0], total_value=[0.0])
+
+
+def test_memory_per_row_versus_dicts():
+    """Test that the ledger uses an order of magnitude less memory than a list of dicts"""
+    n = 10_000
+    ledger = ColumnarLedger(PORTFOLIO_COLUMNS, initial_capacity=n)
+    rows = []
+    for i, date in enumerate(pd.date_range("2000-01-01", periods=n)):
+        row = {'date': date, 'stock_price': float(i), 'stock_value': float(i) * 2,
+               'cash': float(i) * 3, 'total_value': float(i) * 5}
+        rows.append(row)
+        ledger.append(row)
+    dict_bytes = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values()) for r in rows)
+    assert ledger.nbytes * 10 < dict_bytes
+
+
+def test_pickle_keeps_rows_and_stays_appendable():
+    """Test that a pickled ledger drops spare capacity but keeps its rows and can grow"""
+    import pickle
+
+    ledger = ColumnarLedger(PORTFOLIO_COLUMNS, initial_capacity=1024)
+    ledger.append(date="2024-01-02", stock_price=1.0, stock_value=0.0, cash=5.0, total_value=5.0)
+    restored = pickle.loads(pickle.dumps(ledger))
+    assert restored.nbytes < ledger.nbytes
+    restored.append(date="2024-01-03", stock_price=2.0, stock_value=0.0, cash=5.0, total_value=5.0)
+    assert list(restored['stock_price']) == [1.0, 2.0]
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow import metrics
+from thetaflow.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_metrics_record_nothing():
+    """Test that the disabled path hands out a shared no-op timer and drops counters"""
+    registry = MetricsRegistry()
+    assert registry.timer('fetch') is registry.timer('select')
+    with registry.timer('fetch'):
+        registry.increment('rows_fetched', 10)
+    assert registry.snapshot() == {'timers': {}, 'counters': {}}
+
+
+def test_instrumented_stages_are_recorded(enabled_metrics):
+    """Test that Greeks, selection and trade processing report timings and counters"""
+    from thetaflow.backtest import ThetaFlowBacktester
+    from thetaflow.risk_model import estimate_delta_batch
+
+    estimate_delta_batch(100.0, np.array([90.0, 100.0, 110.0]), 0.5, 0.05, 0.3)
+    bt = ThetaFlowBacktester(trade_options=True)
+    bt.stock_data = pd.DataFrame({'Close': 200.0}, index=pd.bdate_range('2023-01-02', periods=5))
+    bt.run_backtest()
+
+    snapshot = metrics.snapshot()
+    assert snapshot['timers']['greeks']['count'] >= 1
+    assert snapshot['timers']['trade_processing']['count'] == 5
+    assert snapshot['timers']['results_export']['count'] == 1
+    assert snapshot['counters']['contracts_priced'] >= 3
+    assert snapshot['counters']['backtest_days'] == 5
+
+
+def test_export_formats(tmp_path):
+    """Test JSON and Prometheus text exports"""
+    registry = MetricsRegistry()
+    registry.enabled = True
+    with registry.timer('select'):
+        pass
+    registry.increment('rows_screened', 42)
+
+    registry.export(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json") as f:
+        exported = json.load(f)
+    assert exported['counters'] == {'rows_screened': 42}
+    assert exported['timers']['select']['count'] == 1
+
+    registry.export(str(tmp_path / "metrics.prom"))
+    text = (tmp_path / "metrics.prom").read_text()
+    assert 'thetaflow_stage_seconds_count{stage="select"} 1' in text
+    assert 'thetaflow_rows_screened_total 42' in text
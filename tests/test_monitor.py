@@ -0,0 +1,121 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.earnings import EarningsCalendar
+from thetaflow.monitor import WatchlistMonitor
+from thetaflow.providers import DataProvider
+
+
+def make_chain(open_interest=None, price=100.0):
+    """Build a 30-day chain with strikes 100..150 and descending open interest"""
+    strikes = np.arange(100.0, 151.0, 5.0)
+    expiry = (pd.Timestamp.now().normalize() + pd.Timedelta(days=30)).strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'contractSymbol': [f"TEST{k:.0f}" for k in strikes],
+        'strike': strikes,
+        'lastPrice': np.linspace(5.0, 0.1, len(strikes)),
+        'impliedVolatility': 0.3,
+        'openInterest': open_interest if open_interest is not None else np.arange(len(strikes), 0, -1) * 1000 + 500,
+        'currentPrice': price,
+        'expiry': expiry,
+        'ticker': 'TEST',
+    })
+
+
+class SequenceProvider(DataProvider):
+    """Serve a new chain for every poll"""
+
+    def __init__(self, chains):
+        self.chains = list(chains)
+        self.chain = None
+
+    def current_price(self, ticker_symbol):
+        self.chain = self.chains.pop(0)
+        return float(self.chain['currentPrice'].iloc[0])
+
+    def option_expiries(self, ticker_symbol):
+        return [self.chains[0]['expiry'].iloc[0] if self.chains else self.chain['expiry'].iloc[0]]
+
+    def option_chain(self, ticker_symbol, expiry):
+        return self.chain.drop(columns=['currentPrice', 'expiry', 'ticker'])
+
+    def next_earnings(self, ticker_symbol):
+        return None
+
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        raise ValueError("No price history in this fake")
+
+
+@pytest.fixture
+def calendar():
+    return EarningsCalendar(cache_file=None, fetcher=lambda ticker_symbol: None)
+
+
+def test_only_changed_contracts_are_rescored(calendar):
+    """Test that an unchanged chain re-scores nothing and a quote change re-scores one contract"""
+    monitor = WatchlistMonitor(['TEST'], max_contracts=2, earnings_calendar=calendar)
+    chain = make_chain()
+    events = monitor.update('TEST', chain)
+    assert monitor.last_rescored['TEST'] == len(chain)
+    assert [e['type'] for e in events] == ['new', 'new']
+
+    assert monitor.update('TEST', chain) == []
+    assert monitor.last_rescored['TEST'] == 0
+
+    changed = chain.copy()
+    changed.loc[changed['strike'] == 150.0, 'lastPrice'] = 0.2
+    monitor.update('TEST', changed)
+    assert monitor.last_rescored['TEST'] == 1
+
+
+def test_candidate_changes_emit_events(calendar):
+    """Test that a contract overtaking on open interest is reported as new and the loser as dropped"""
+    monitor = WatchlistMonitor(['TEST'], max_contracts=1, earnings_calendar=calendar)
+    chain = make_chain()
+    first = monitor.update('TEST', chain)[0]['contractSymbol']
+
+    boosted = chain.copy()
+    boosted.loc[boosted['strike'] == 150.0, 'openInterest'] = 10 ** 6
+    events = monitor.update('TEST', boosted)
+    assert {(e['type'], e['contractSymbol']) for e in events} == {('new', 'TEST150'), ('dropped', first)}
+    assert events[0]['candidate']['openInterest'] == 10 ** 6
+
+
+def test_stale_scores_are_refreshed(calendar):
+    """Test that unchanged contracts are re-scored once their score is too old"""
+    monitor = WatchlistMonitor(['TEST'], rescore_after=60, earnings_calendar=calendar)
+    chain = make_chain()
+    now = pd.Timestamp.now()
+    monitor.update('TEST', chain, now=now)
+    monitor.update('TEST', chain, now=now + pd.Timedelta(seconds=30))
+    assert monitor.last_rescored['TEST'] == 0
+    monitor.update('TEST', chain, now=now + pd.Timedelta(seconds=90))
+    assert monitor.last_rescored['TEST'] == len(chain)
+
+
+def test_run_polls_provider_and_queues_events(calendar):
+    """Test the asyncio loop end to end with a scripted provider"""
+    provider = SequenceProvider([make_chain(), make_chain(price=130.0)])
+    received = []
+    monitor = WatchlistMonitor(['TEST'], interval_seconds=0, max_contracts=2, provider=provider,
+                               earnings_calendar=calendar, on_event=received.append)
+    asyncio.run(monitor.run(iterations=2))
+    assert monitor.events.qsize() == len(received)
+    assert [e['type'] for e in received[:2]] == ['new', 'new']
+    # Spot moved above the first candidates' strikes, so they drop out
+    assert {e['type'] for e in received[2:]} == {'new', 'dropped'}
+
+
+def test_undrained_event_queue_is_bounded(calendar):
+    """Test that the event queue keeps only the newest events when nobody reads it"""
+    chains = [make_chain(price=price) for price in (100.0, 130.0, 100.0, 130.0)]
+    received = []
+    monitor = WatchlistMonitor(['TEST'], interval_seconds=0, max_contracts=2, provider=SequenceProvider(chains),
+                               earnings_calendar=calendar, on_event=received.append, max_queued_events=3)
+    asyncio.run(monitor.run(iterations=4))
+    assert len(received) > 3
+    assert monitor.events.qsize() == 3
+    queued = [monitor.events.get_nowait() for _ in range(3)]
+    assert queued == received[-3:]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+from thetaflow.monte_carlo import covered_call_pnl_distribution, score_candidates
+from thetaflow.risk_model import black_scholes_greeks
+
+
+def test_matches_black_scholes_under_risk_neutral_drift():
+    """Test assignment probability and expected P&L against closed-form values"""
+    price, strike, t, r, vol = 100.0, 110.0, 0.25, 0.05, 0.4
+    premium = float(black_scholes_greeks(price, strike, t, r, vol)['price'])
+    result = covered_call_pnl_distribution(price, strike, premium, t, vol, drift=r,
+                                           n_paths=400_000, seed=7, fee_per_contract=0.0)
+
+    d2 = (np.log(price / strike) + (r - vol ** 2 / 2) * t) / (vol * np.sqrt(t))
+    assert result['prob_assignment'] == pytest.approx(norm.cdf(d2), abs=0.005)
+    # E[min(S_T, K)] = (S_0 - C) * exp(rT), so E[P&L] = 100 * (S_0 - C) * (exp(rT) - 1)
+    expected = 100 * (price - premium) * (np.exp(r * t) - 1)
+    assert result['expected_pnl'] == pytest.approx(expected, abs=3 * result['pnl_std'] / np.sqrt(400_000))
+    assert result['percentiles'][1] < result['percentiles'][50] <= result['max_pnl']
+
+
+def test_reproducible_across_worker_counts():
+    """Test that a seed gives identical results however chunks are scheduled"""
+    kwargs = dict(price=250.0, strike=300.0, premium=2.5, time_to_expiry=0.1, volatility=0.6,
+                  n_paths=250_000, chunk_size=60_000, seed=42, jump_intensity=2.0,
+                  jump_mean=-0.05, jump_std=0.1)
+    single = covered_call_pnl_distribution(n_workers=1, **kwargs)
+    threaded = covered_call_pnl_distribution(n_workers=4, **kwargs)
+    assert single == threaded
+
+
+def test_rejects_empty_path_counts():
+    """Test that zero paths or a zero chunk size raise ValueError"""
+    for kwargs in ({'n_paths': 0}, {'chunk_size': 0}):
+        with pytest.raises(ValueError):
+            covered_call_pnl_distribution(100.0, 110.0, 1.0, 0.25, 0.4, **kwargs)
+
+
+def test_score_candidates_adds_columns():
+    """Test scoring of a selection frame"""
+    candidates = pd.DataFrame({
+        'currentPrice': [100.0, 100.0],
+        'strike': [110.0, 130.0],
+        'lastPrice': [1.5, 0.2],
+        'impliedVolatility': [0.4, 0.4],
+        'time_to_expiry': [30 / 365.25, 30 / 365.25],
+    })
+    scored = score_candidates(candidates, n_paths=50_000, seed=1)
+    assert {'mc_expected_return', 'mc_prob_assignment', 'mc_pnl_p5'} <= set(scored.columns)
+    assert scored['mc_prob_assignment'].iloc[0] > scored['mc_prob_assignment'].iloc[1]
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.portfolio import PortfolioBacktester, allocate_capital
+
+
+def make_price_matrix(n_tickers=4, start="2023-01-02", end="2023-07-01", seed=0):
+    """Random-walk closes for several tickers, the last one listing a month late"""
+    dates = pd.bdate_range(start, end, inclusive='left')
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), n_tickers)), axis=0))
+    matrix = pd.DataFrame(closes, index=dates, columns=[f"T{i}" for i in range(n_tickers)])
+    matrix.iloc[:20, -1] = np.nan
+    return matrix
+
+
+def test_allocation_rules():
+    """Test equal, inverse-volatility and explicit-weight allocations"""
+    prices = make_price_matrix()
+    equal = allocate_capital(prices, 1000.0)
+    assert equal.tolist() == [250.0] * 4
+
+    calm = prices.copy()
+    calm['T0'] = np.linspace(100, 101, len(calm))
+    inverse = allocate_capital(calm, 1000.0, rule='inverse_volatility')
+    assert inverse.sum() == pytest.approx(1000.0)
+    assert inverse.idxmax() == 'T0'
+
+    weighted = allocate_capital(prices, 1000.0, weights={'T0': 3, 'T1': 1})
+    assert weighted['T0'] == pytest.approx(750.0)
+    assert weighted['T3'] == 0.0
+    with pytest.raises(ValueError):
+        allocate_capital(prices, 1000.0, rule='momentum')
+
+
+def test_equity_curve_sums_ticker_paths():
+    """Test that the book's value is the sum of ticker values plus unallocated cash"""
+    book = PortfolioBacktester([f"T{i}" for i in range(4)], initial_capital=200_000, max_workers=1)
+    book.price_matrix = make_price_matrix()
+    equity_df, trades_df = book.run()
+
+    assert equity_df['total_value'].iloc[0] == pytest.approx(200_000)
+    parts = equity_df[[f"T{i}" for i in range(4)] + ['cash']].sum(axis=1)
+    np.testing.assert_allclose(equity_df['total_value'], parts)
+    # The late listing holds its allocation in cash until its first bar
+    assert (equity_df['T3'].iloc[:20] == book.capital['T3']).all()
+    assert set(trades_df['ticker']) == {f"T{i}" for i in range(4)}
+
+
+def test_parallel_run_matches_in_process_run():
+    """Test that worker processes on the shared matrix reproduce the serial result"""
+    prices = make_price_matrix()
+    serial = PortfolioBacktester(list(prices.columns), max_workers=1)
+    serial.price_matrix = prices
+    parallel = PortfolioBacktester(list(prices.columns), max_workers=2)
+    parallel.price_matrix = prices
+
+    serial_equity, serial_trades = serial.run()
+    parallel_equity, parallel_trades = parallel.run()
+    pd.testing.assert_frame_equal(serial_equity, parallel_equity)
+    pd.testing.assert_frame_equal(serial_trades, parallel_trades)
+
+
+def test_inverse_volatility_lots_use_first_tradable_close():
+    """Test that lots are sized at the first close after the volatility lookback"""
+    dates = pd.bdate_range("2023-01-02", "2023-07-01", inclusive='left')
+    rng = np.random.default_rng(1)
+    prices = pd.DataFrame(100.0 * np.exp(rng.normal(0, 0.01, (len(dates), 2))), index=dates, columns=['T0', 'T1'])
+    prices.iloc[:60, 0] *= 4  # T0 quarters in price when trading starts
+
+    book = PortfolioBacktester(['T0', 'T1'], initial_capital=200_000, allocation='inverse_volatility', max_workers=1)
+    book.price_matrix = prices
+    _, trades_df = book.run()
+    first_buy = trades_df[(trades_df['ticker'] == 'T0') & (trades_df['action'] == 'buy_stock')].iloc[0]
+    assert first_buy['contracts'] == int(book.capital['T0'] // (prices['T0'].iloc[60] * 100))
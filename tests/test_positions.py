@@ -0,0 +1,40 @@
+import pandas as pd
+from thetaflow.positions import PositionBook
+
+
+def test_due_returns_only_positions_reaching_their_date():
+    """Test that the schedule pops positions in date order and skips closed ones"""
+    book = PositionBook()
+    late = book.open('TSLA', 250, '2024-03-15', 1, 2.0, '2024-01-02')
+    early = book.open('TSLA', 260, '2024-02-16', 2, 1.5, '2024-01-02')
+    closed = book.open('AAPL', 200, '2024-02-16', 1, 1.0, '2024-01-02')
+    book.close(closed)
+
+    assert book.due('2024-02-15') == []
+    assert book.due('2024-02-16') == [early]
+    assert book.open_contracts('TSLA') == 3
+    assert book.open_contracts('AAPL') == 0
+    book.close(early)
+    assert book.due('2024-12-31') == [late]
+
+
+def test_review_date_and_reschedule():
+    """Test that a review date comes due first and the position can be rescheduled to expiry"""
+    book = PositionBook()
+    position = book.open('TSLA', 250, '2024-03-15', 1, 2.0, '2024-01-02', review_date='2024-03-08')
+    assert book.due('2024-03-08') == [position]
+    book.reschedule(position, position.expiry)
+    assert book.due('2024-03-14') == []
+    assert book.due('2024-03-15') == [position]
+
+
+def test_thousands_of_positions_touch_only_due_ones():
+    """Test a large book where each day only returns that day's expiries"""
+    book = PositionBook()
+    expiries = pd.bdate_range('2024-01-01', periods=50)
+    for i in range(5000):
+        book.open(f"T{i % 25}", 100 + i % 7, expiries[i % 50], 1, 1.0, '2023-12-01')
+    due = book.due(expiries[0])
+    assert len(due) == 100
+    assert all(p.expiry == expiries[0] for p in due)
+    assert len(book) == 5000
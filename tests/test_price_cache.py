@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.price_cache import PriceCache
+
+
+class FakeDownloader:
+    """Serve synthetic business-day bars and record every requested range"""
+
+    def __init__(self):
+        self.requests = []
+        self.offline = False
+
+    def __call__(self, ticker_symbol, start, end, interval):
+        if self.offline:
+            raise ConnectionError("no network")
+        self.requests.append((pd.Timestamp(start), pd.Timestamp(end)))
+        dates = pd.bdate_range(start, end, inclusive='left')
+        close = np.arange(len(dates), dtype=float) + 100.0
+        return pd.DataFrame({'Open': close, 'High': close, 'Low': close,
+                             'Close': close, 'Volume': 1e6}, index=dates)
+
+
+@pytest.fixture
+def downloader():
+    return FakeDownloader()
+
+
+def test_repeat_reads_do_not_download(tmp_path, downloader):
+    """Test that a cached range is served from disk without another download"""
+    cache = PriceCache(cache_dir=str(tmp_path), downloader=downloader)
+    first = cache.get_history('TSLA', '2023-01-02', '2023-03-01')
+    second = cache.get_history('TSLA', '2023-01-02', '2023-03-01')
+    assert len(downloader.requests) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert first.index[0] == pd.Timestamp('2023-01-02')
+    assert first.index[-1] < pd.Timestamp('2023-03-01')
+
+
+def test_only_missing_tail_is_fetched(tmp_path, downloader):
+    """Test that extending the end date downloads only the uncovered tail"""
+    cache = PriceCache(cache_dir=str(tmp_path), downloader=downloader)
+    cache.get_history('TSLA', '2023-01-02', '2023-03-01')
+    extended = cache.get_history('TSLA', '2023-01-02', '2023-04-03')
+    assert downloader.requests[-1] == (pd.Timestamp('2023-03-01'), pd.Timestamp('2023-04-03'))
+    assert extended.index.is_unique and extended.index.is_monotonic_increasing
+    assert len(extended) == len(pd.bdate_range('2023-01-02', '2023-04-03', inclusive='left'))
+
+
+def test_extensions_merge_in_bounded_chunks(tmp_path, downloader):
+    """Test that prefix, tail and overlapping downloads merge correctly chunk by chunk"""
+    cache = PriceCache(cache_dir=str(tmp_path), downloader=downloader, chunk_size=7)
+    cache.get_history('TSLA', '2023-02-01', '2023-03-01')
+    cache.get_history('TSLA', '2023-01-02', '2023-04-03')
+    bars = cache.get_history('TSLA', '2023-01-02', '2023-04-03')
+    assert list(bars.index) == list(pd.bdate_range('2023-01-02', '2023-04-03', inclusive='left'))
+    # The tail download restarts its synthetic closes at 100, so it replaced nothing it should not
+    assert bars.loc['2023-03-01', 'Close'] == 100.0
+    assert bars.loc['2023-02-28', 'Close'] == len(pd.bdate_range('2023-02-01', '2023-02-28')) + 99.0
+
+
+def test_serves_cache_when_offline(tmp_path, downloader):
+    """Test that a failed refresh falls back to the cached bars"""
+    cache = PriceCache(cache_dir=str(tmp_path), downloader=downloader)
+    cached = cache.get_history('TSLA', '2023-01-02', '2023-03-01')
+    downloader.offline = True
+    offline = cache.get_history('TSLA', '2023-01-02', '2023-06-01')
+    pd.testing.assert_frame_equal(cached, offline)
+
+
+def test_iter_chunks_streams_the_same_bars(tmp_path, downloader):
+    """Test that chunked reads are bounded in size and add up to get_history"""
+    cache = PriceCache(cache_dir=str(tmp_path), downloader=downloader)
+    full = cache.get_history('TSLA', '2023-01-02', '2023-06-01')
+    chunks = list(cache.iter_chunks('TSLA', '2023-01-02', '2023-06-01', chunk_size=25))
+    assert max(len(chunk) for chunk in chunks) == 25
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
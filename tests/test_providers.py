@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+from thetaflow import providers
+from thetaflow.price_cache import PriceCache
+from thetaflow.providers import DataProvider, ReplayProvider
+
+
+class CountingSource(DataProvider):
+    """Deterministic live-data stand-in that counts every call"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def current_price(self, ticker_symbol):
+        self.calls += 1
+        return 200.0
+
+    def option_expiries(self, ticker_symbol):
+        self.calls += 1
+        return ['2023-02-17', '2023-03-17']
+
+    def option_chain(self, ticker_symbol, expiry):
+        self.calls += 1
+        return pd.DataFrame({'strike': [190.0, 210.0], 'lastPrice': [12.5, 3.0]})
+
+    def next_earnings(self, ticker_symbol):
+        self.calls += 1
+        return pd.Timestamp('2023-04-19')
+
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        self.calls += 1
+        dates = pd.bdate_range(start, end, inclusive='left')
+        return pd.DataFrame({'Close': range(len(dates))}, index=dates, dtype=float)
+
+
+def test_recorded_responses_replay_offline(tmp_path):
+    """Test that responses recorded from a source are served without it afterwards"""
+    source = CountingSource()
+    recorder = ReplayProvider(str(tmp_path), source=source)
+    chain = recorder.option_chain('TSLA', '2023-02-17')
+    recorder.current_price('TSLA')
+    recorder.next_earnings('TSLA')
+    assert source.calls == 3
+
+    replay = ReplayProvider(str(tmp_path))
+    pd.testing.assert_frame_equal(replay.option_chain('TSLA', '2023-02-17'), chain)
+    assert replay.current_price('TSLA') == 200.0
+    assert replay.next_earnings('TSLA') == pd.Timestamp('2023-04-19')
+    with pytest.raises(ValueError):
+        replay.option_expiries('TSLA')
+
+
+def test_price_history_sub_ranges_replay(tmp_path):
+    """Test that recorded history is merged and sliced for narrower requests"""
+    source = CountingSource()
+    recorder = ReplayProvider(str(tmp_path), source=source)
+    recorder.price_history('TSLA', '2023-01-02', '2023-02-01')
+    recorder.price_history('TSLA', '2023-01-16', '2023-03-01')
+    assert source.calls == 2
+
+    replay = ReplayProvider(str(tmp_path))
+    bars = replay.price_history('TSLA', '2023-01-09', '2023-02-15')
+    assert bars.index[0] == pd.Timestamp('2023-01-09')
+    assert bars.index[-1] == pd.Timestamp('2023-02-14')
+
+
+def test_price_history_gaps_between_recordings(tmp_path, caplog):
+    """Test that disjoint recordings do not mark the range between them as covered"""
+    source = CountingSource()
+    recorder = ReplayProvider(str(tmp_path), source=source)
+    recorder.price_history('TSLA', '2020-01-02', '2020-02-01')
+    recorder.price_history('TSLA', '2023-01-02', '2023-02-01')
+
+    replay = ReplayProvider(str(tmp_path))
+    with caplog.at_level('WARNING'):
+        bars = replay.price_history('TSLA', '2020-01-15', '2023-01-15')
+    assert "2020-02-01 to 2023-01-02" in caplog.text
+    assert len(bars) == len(pd.bdate_range('2020-01-15', '2020-02-01', inclusive='left')) + \
+        len(pd.bdate_range('2023-01-02', '2023-01-15', inclusive='left'))
+
+    # With a source only the gap is fetched, after which the whole range replays
+    recorder.price_history('TSLA', '2020-01-15', '2023-01-15')
+    assert source.calls == 3
+    full = ReplayProvider(str(tmp_path)).price_history('TSLA', '2020-01-15', '2023-01-15')
+    assert len(full) == len(pd.bdate_range('2020-01-15', '2023-01-15', inclusive='left'))
+
+
+def test_yfinance_intraday_bars_are_tz_naive(monkeypatch):
+    """Test that tz-aware intraday bars from yfinance are returned with a naive exchange-time index"""
+    times = pd.date_range("2023-01-03 09:30", periods=3, freq="min", tz="America/New_York")
+
+    class FakeYFinance:
+        @staticmethod
+        def download(*args, **kwargs):
+            return pd.DataFrame({'Close': [1.0, 2.0, 3.0]}, index=times)
+
+    monkeypatch.setattr(providers, 'yf', FakeYFinance)
+    bars = providers.YFinanceProvider().price_history('TSLA', '2023-01-03', '2023-01-04', interval="1m")
+    assert bars.index.tz is None
+    assert bars.index[0] == pd.Timestamp("2023-01-03 09:30")
+
+
+def test_incomplete_provider_cannot_be_created():
+    """Test that a provider missing interface methods fails at construction"""
+    class QuoteOnly(DataProvider):
+        def current_price(self, ticker_symbol):
+            return 1.0
+
+    with pytest.raises(TypeError):
+        QuoteOnly()
+
+
+def test_default_provider_drives_price_cache(tmp_path, monkeypatch):
+    """Test that the price cache downloads through the default provider"""
+    source = CountingSource()
+    monkeypatch.setattr(providers, '_default_provider', ReplayProvider(str(tmp_path / "rec"), source=source))
+    cache = PriceCache(cache_dir=str(tmp_path / "cache"))
+    history = cache.get_history('TSLA', '2023-01-02', '2023-02-01')
+    assert len(history) == len(pd.bdate_range('2023-01-02', '2023-02-01', inclusive='left'))
+    assert source.calls == 1
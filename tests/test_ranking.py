@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_chain
+from thetaflow.earnings import EarningsCalendar
+from thetaflow.ranking import chain_features, default_scorer, make_scorer, rank_candidates
+
+NO_EARNINGS = EarningsCalendar(cache_file=None, fetcher=lambda symbol: None)
+
+
+def two_ticker_chain():
+    """Multi-expiry chains for two underlyings in one frame"""
+    return pd.concat([make_chain(3000, seed=1, ticker='AAA'), make_chain(2000, seed=2, ticker='BBB')],
+                     ignore_index=True)
+
+
+def test_top_k_matches_full_sort():
+    """Test that partial selection returns the same contracts as sorting every score"""
+    chain = two_ticker_chain()
+    as_of = pd.Timestamp.now()
+    ranked = rank_candidates(chain, k=5, as_of=as_of, earnings_calendar=NO_EARNINGS)
+
+    assert list(ranked['ticker']) == ['AAA'] * 5 + ['BBB'] * 5
+    assert list(ranked['rank']) == [1, 2, 3, 4, 5] * 2
+    for ticker_symbol, group in ranked.groupby('ticker'):
+        assert group['score'].is_monotonic_decreasing
+        sub = chain[chain['ticker'] == ticker_symbol]
+        full = rank_candidates(sub, k=len(sub), as_of=as_of, earnings_calendar=NO_EARNINGS)
+        np.testing.assert_allclose(group['score'], full['score'].head(5))
+    assert (ranked['strike'] > ranked['currentPrice']).all()
+    assert (ranked['openInterest'] > 1000).all()
+
+
+def test_custom_scorer_and_min_probability():
+    """Test that any callable can rank contracts and the probability floor applies"""
+    chain = two_ticker_chain()
+    ranked = rank_candidates(chain, k=3, scorer=lambda f: -f['strike'], min_probability=0.95,
+                             earnings_calendar=NO_EARNINGS)
+    assert (ranked['prob_otm'] >= 0.95).all()
+    for _, group in ranked.groupby('ticker'):
+        assert group['strike'].is_monotonic_increasing
+
+    with pytest.raises(ValueError):
+        rank_candidates(chain, k=3, scorer=lambda f: np.ones(3), earnings_calendar=NO_EARNINGS)
+
+
+def test_earnings_penalty_demotes_contracts_near_earnings():
+    """Test that expiries near earnings are penalized by the default scorer"""
+    chain = make_chain(2000, seed=3, ticker='AAA')
+    as_of = pd.Timestamp.now()
+    best = rank_candidates(chain, k=1, as_of=as_of, earnings_calendar=NO_EARNINGS).iloc[0]
+    earnings = EarningsCalendar(cache_file=None, fetcher=lambda symbol: best['expiry_datetime'])
+
+    features = chain_features(chain, as_of=as_of, earnings_calendar=earnings)
+    near = features['near_earnings']
+    assert near.any() and not near.all()
+    np.testing.assert_allclose(default_scorer(features)[near],
+                               make_scorer(earnings_penalty=0)(features)[near] * 0.5)
+
+    excluded = rank_candidates(chain, k=1, as_of=as_of, earnings_calendar=earnings,
+                               scorer=make_scorer(earnings_penalty=1.0)).iloc[0]
+    assert not excluded['near_earnings']
+    assert excluded['contractSymbol'] != best['contractSymbol']
@@ -0,0 +1,66 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow import results_io
+from thetaflow.results_io import downsample, read_frame, render_chart_async, save_results, write_frame
+
+
+def make_portfolio(n=5000):
+    """Portfolio rows shaped like create_results output"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'date': pd.date_range("2020-01-01", periods=n, freq='h'),
+        'stock_price': 200.0 + np.cumsum(rng.normal(0, 1, n)),
+        'total_value': 100000.0 + np.cumsum(rng.normal(0, 10, n)),
+    })
+
+
+def test_csv_fallback_round_trip(tmp_path, monkeypatch):
+    """Test that columnar requests fall back to gzipped CSV without pyarrow and read back unchanged"""
+    monkeypatch.setattr(results_io, "columnar_available", lambda: False)
+    portfolio = make_portfolio(100)
+    trades = pd.DataFrame({'action': ['sell_call'], 'strike': [210.0]})
+
+    paths = save_results(portfolio, trades, str(tmp_path))
+    assert paths == {'portfolio': str(tmp_path / "backtest_portfolio.csv.gz"),
+                     'trades': str(tmp_path / "backtest_trades.csv.gz")}
+    restored = read_frame(paths['portfolio'])
+    np.testing.assert_allclose(restored['total_value'], portfolio['total_value'])
+
+    assert write_frame(trades, str(tmp_path / "trades.parquet"), index=False) == str(tmp_path / "trades.csv.gz")
+    assert write_frame(trades, str(tmp_path / "plain.csv"), index=False) == str(tmp_path / "plain.csv")
+    with pytest.raises(ValueError):
+        write_frame(trades, str(tmp_path / "trades"), format='xlsx')
+
+
+def test_columnar_round_trip(tmp_path):
+    """Test Parquet and Feather output when pyarrow is installed"""
+    pytest.importorskip("pyarrow")
+    portfolio = make_portfolio(100)
+    for fmt in ('parquet', 'feather'):
+        path = write_frame(portfolio, str(tmp_path / "portfolio"), format=fmt, index=False)
+        assert path.endswith(f".{fmt}")
+        pd.testing.assert_frame_equal(read_frame(path), portfolio)
+
+
+def test_downsample_keeps_extremes_and_endpoints():
+    """Test that downsampling bounds the row count but keeps every series' min and max"""
+    portfolio = make_portfolio()
+    small = downsample(portfolio, ['total_value', 'stock_price'], max_points=200)
+    assert len(small) <= 2 * 200 + 2
+    assert small.index.is_monotonic_increasing
+    for column in ('total_value', 'stock_price'):
+        assert small[column].max() == portfolio[column].max()
+        assert small[column].min() == portfolio[column].min()
+    assert small.index[0] == 0 and small.index[-1] == len(portfolio) - 1
+    short = portfolio.head(10)
+    assert downsample(short, ['total_value'], max_points=200) is short
+
+
+def test_chart_renders_in_background_process(tmp_path):
+    """Test that the chart is written by a worker process"""
+    pytest.importorskip("matplotlib")
+    path = str(tmp_path / "chart.png")
+    assert render_chart_async(make_portfolio(), path, ticker="TSLA").result(timeout=120) == path
+    assert os.path.getsize(path) > 0
@@ -1,6 +1,8 @@
 import pytest
 import numpy as np
-from thetaflow.risk_model import estimate_delta
+from thetaflow.risk_model import (
+    black_scholes_greeks, estimate_delta, estimate_delta_batch, implied_volatility_batch
+)
 
 def test_at_the_money_call_delta():
     """Test that ATM call options have delta close to 0.5"""
@@ -55,4 +57,59 @@ def test_zero_time_to_expiry():
             time_to_expiry=0,
             risk_free_rate=0.05,
             implied_volatility=0.2
-        )
\ No newline at end of file
+        )
+
+def test_batch_delta_matches_scalar():
+    """Test that the vectorized delta matches estimate_delta contract by contract"""
+    strikes = np.array([80.0, 95.0, 100.0, 105.0, 130.0])
+    times = np.array([0.05, 0.25, 0.5, 1.0, 2.0])
+    vols = np.array([0.15, 0.3, 0.45, 0.6, 0.9])
+    batch = estimate_delta_batch(100.0, strikes, times, 0.05, vols)
+    scalar = [estimate_delta(100.0, k, t, 0.05, v) for k, t, v in zip(strikes, times, vols)]
+    np.testing.assert_array_equal(batch, scalar)
+
+
+def test_batch_invalid_inputs_are_masked():
+    """Test that invalid rows are flagged instead of raising"""
+    greeks = black_scholes_greeks(
+        price=100.0,
+        strike=np.array([100.0, -5.0, 100.0, 100.0]),
+        time_to_expiry=np.array([1.0, 1.0, 0.0, 1.0]),
+        risk_free_rate=0.05,
+        implied_volatility=np.array([0.2, 0.2, 0.2, np.nan])
+    )
+    assert greeks['valid'].tolist() == [True, False, False, False]
+    assert np.isnan(greeks['delta'][1:]).all()
+
+
+def test_black_scholes_reference_values():
+    """Test price and Greeks against the textbook ATM example"""
+    greeks = black_scholes_greeks(100.0, 100.0, 1.0, 0.05, 0.2)
+    assert greeks['price'] == pytest.approx(10.4506, abs=1e-4)
+    assert greeks['delta'] == pytest.approx(0.6368, abs=1e-4)
+    assert greeks['gamma'] == pytest.approx(0.018762, abs=1e-6)
+    assert greeks['vega'] == pytest.approx(37.5240, abs=1e-4)
+    assert greeks['theta'] == pytest.approx(-6.4140, abs=1e-4)
+    assert greeks['rho'] == pytest.approx(53.2325, abs=1e-4)
+
+
+def test_implied_volatility_batch_round_trip():
+    """Test that solved volatilities reprice a chain generated at known volatilities"""
+    strikes = np.linspace(70.0, 150.0, 41)
+    true_vol = 0.25 + 0.002 * (strikes - 100.0) ** 2 / 10
+    prices = black_scholes_greeks(100.0, strikes, 0.5, 0.05, true_vol)['price']
+    solved = implied_volatility_batch(prices, 100.0, strikes, 0.5, 0.05, tol=1e-10)
+    np.testing.assert_allclose(solved, true_vol, atol=1e-6)
+
+
+def test_implied_volatility_batch_rejects_arbitrage_prices():
+    """Test that prices outside the no-arbitrage bounds give NaN instead of raising"""
+    solved = implied_volatility_batch(
+        option_price=np.array([0.0, 5.0, 120.0, 10.45]),
+        price=100.0,
+        strike=np.array([100.0, 50.0, 100.0, 100.0]),
+        time_to_expiry=1.0,
+        risk_free_rate=0.05
+    )
+    assert np.isnan(solved[:3]).all()
+    assert solved[3] == pytest.approx(0.2, abs=1e-3)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.risk_model import black_scholes_greeks
+from thetaflow.scenarios import POSITION_COLUMNS, positions_from_backtester, stress_test
+
+SPOT_SHOCKS = np.array([-0.2, 0.0, 0.1])
+VOL_SHOCKS = np.array([-0.05, 0.0, 0.2])
+TIME_STEPS = np.array([0, 10, 40])
+
+
+def make_book():
+    """200 shares of AAA covered by two short calls, plus a short BBB call"""
+    return pd.DataFrame({
+        'ticker': ['AAA', 'AAA', 'AAA', 'BBB'],
+        'quantity': [200.0, -1.0, -1.0, -3.0],
+        'strike': [np.nan, 110.0, 110.0, 55.0],
+        'time_to_expiry': [np.nan, 30 / 365.25, 30 / 365.25, 60 / 365.25],
+        'implied_volatility': [np.nan, 0.4, 0.4, 0.3],
+    }), {'AAA': 100.0, 'BBB': 50.0}
+
+
+def call_value(spot, strike, years, vol):
+    if years <= 0:
+        return max(spot - strike, 0.0)
+    return float(black_scholes_greeks(spot, strike, years, 0.05, vol)['price'])
+
+
+def test_grid_matches_scalar_repricing():
+    """Test every scenario against repricing each position on its own, including expiry"""
+    positions, spots = make_book()
+    result = stress_test(positions, spots, SPOT_SHOCKS, VOL_SHOCKS, TIME_STEPS, risk_free_rate=0.05)
+    assert result.pnl.shape == (3, 3, 3)
+    assert result.pnl_by_ticker.shape == (2, 3, 3, 3)
+
+    for i, ds in enumerate(SPOT_SHOCKS):
+        for j, dv in enumerate(VOL_SHOCKS):
+            for k, days in enumerate(TIME_STEPS):
+                elapsed = days / 365.25
+                aaa = 200 * 100.0 * ds - 200 * (call_value(100.0 * (1 + ds), 110.0, 30 / 365.25 - elapsed, 0.4 + dv)
+                                                - call_value(100.0, 110.0, 30 / 365.25, 0.4))
+                bbb = -300 * (call_value(50.0 * (1 + ds), 55.0, 60 / 365.25 - elapsed, 0.3 + dv)
+                              - call_value(50.0, 55.0, 60 / 365.25, 0.3))
+                np.testing.assert_allclose(result.pnl_by_ticker[:, i, j, k], [aaa, bbb], rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(result.pnl[1, 1, 0], 0.0, atol=1e-9)
+
+
+def test_chunking_worst_case_and_greeks():
+    """Test that chunk size does not change results and that the summaries are consistent"""
+    positions, spots = make_book()
+    full = stress_test(positions, spots, SPOT_SHOCKS, VOL_SHOCKS, TIME_STEPS)
+    chunked = stress_test(positions, spots, SPOT_SHOCKS, VOL_SHOCKS, TIME_STEPS, chunk_elements=1)
+    np.testing.assert_allclose(chunked.pnl, full.pnl)
+
+    worst = full.worst_case()
+    assert worst['pnl'] == full.pnl.min()
+    assert full.to_frame()['pnl'].min() == worst['pnl']
+    assert full.pnl_surface(time_step=0).shape == (3, 3)
+
+    greeks = full.greeks
+    delta_110 = black_scholes_greeks(100.0, 110.0, 30 / 365.25, 0.05, 0.4)['delta']
+    np.testing.assert_allclose(greeks.loc['AAA', 'delta'], 200 - 200 * delta_110)
+    np.testing.assert_allclose(greeks.loc['TOTAL', 'theta'], greeks.loc[['AAA', 'BBB'], 'theta'].sum())
+    assert greeks.loc['BBB', 'delta'] < 0 and greeks.loc['TOTAL', 'theta'] > 0
+
+    with pytest.raises(ValueError):
+        stress_test(positions, {'AAA': 100.0})
+
+
+def test_stock_only_and_empty_books():
+    """Test books without calls, including an empty one"""
+    stock = pd.DataFrame([('AAA', 100.0, np.nan, np.nan, np.nan)], columns=POSITION_COLUMNS)
+    result = stress_test(stock, {'AAA': 50.0}, SPOT_SHOCKS, VOL_SHOCKS, TIME_STEPS)
+    np.testing.assert_allclose(result.pnl[:, 1, 2], 100 * 50.0 * SPOT_SHOCKS)
+    assert result.greeks.loc['AAA', 'delta'] == 100.0 and result.greeks.loc['TOTAL', 'gamma'] == 0.0
+
+    empty = stress_test(pd.DataFrame(columns=POSITION_COLUMNS), {}, SPOT_SHOCKS, VOL_SHOCKS, TIME_STEPS)
+    assert empty.tickers == [] and not empty.pnl.any()
+    assert empty.worst_case()['pnl'] == 0.0
+    assert list(empty.greeks.index) == ['TOTAL']
+
+
+def test_positions_from_backtester():
+    """Test that a backtester's stock and open calls become scenario positions"""
+    from thetaflow.backtest import ThetaFlowBacktester
+
+    bt = ThetaFlowBacktester()
+    bt.stock_data = pd.DataFrame({'Close': 200.0}, index=pd.bdate_range("2023-01-02", periods=5))
+    bt.run_backtest()
+    positions, spots = positions_from_backtester(bt)
+    assert spots == {'TSLA': 200.0}
+    assert positions['quantity'].iloc[0] == bt.stock_position
+    assert (positions['quantity'].iloc[1:] < 0).all()
+    assert -positions['quantity'].iloc[1:].sum() == len(bt.option_positions)
+    result = stress_test(positions, spots)
+    # Covered calls cap the upside: the book gains less than the stock alone
+    assert result.pnl[-1, :, 0].max() < bt.stock_position * 200.0 * 0.3
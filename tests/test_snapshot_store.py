@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.snapshot_store import ChainSnapshotStore
+
+
+def make_chain(ticker="TSLA", price=200.0, expiries=("2023-02-17", "2023-03-17")):
+    """Build a small call chain with string, float, int and datetime columns"""
+    frames = []
+    for expiry in expiries:
+        strikes = np.arange(150.0, 255.0, 10.0)
+        frames.append(pd.DataFrame({
+            'contractSymbol': [f"{ticker}{pd.Timestamp(expiry):%y%m%d}C{int(s * 1000):08d}" for s in strikes],
+            'strike': strikes,
+            'lastPrice': np.maximum(price - strikes, 0) + 1.0,
+            'openInterest': np.full(len(strikes), 1500),
+            'currentPrice': price,
+            'expiry': pd.Timestamp(expiry),
+            'ticker': ticker,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_round_trip_preserves_columns(tmp_path):
+    """Test that an archived chain reads back with the same values and dtypes"""
+    store = ChainSnapshotStore(root=str(tmp_path))
+    chain = make_chain()
+    store.append(chain, captured_at="2023-01-03 15:30")
+    restored = store.read('TSLA')
+    assert restored['captured_at'].iloc[0] == pd.Timestamp("2023-01-03 15:30")
+    pd.testing.assert_frame_equal(restored.drop(columns='captured_at'), chain)
+
+
+def test_multi_ticker_frames_are_partitioned(tmp_path):
+    """Test that each ticker in a combined chain gets its own partition"""
+    store = ChainSnapshotStore(root=str(tmp_path))
+    store.append(pd.concat([make_chain('TSLA'), make_chain('AAPL', price=150.0)]), captured_at="2023-01-03")
+    assert store.tickers() == ['AAPL', 'TSLA']
+    assert set(store.read('AAPL')['ticker']) == {'AAPL'}
+
+
+def test_predicates_prune_partitions_and_rows(tmp_path):
+    """Test expiry/strike filters, including skipping captures via min/max stats"""
+    store = ChainSnapshotStore(root=str(tmp_path))
+    stale_parts = store.append(make_chain(expiries=("2023-02-17",)), captured_at="2023-01-03")
+    store.append(make_chain(expiries=("2023-06-16",)), captured_at="2023-01-04")
+
+    result = store.read('TSLA', expiry_range=("2023-06-01", None), strike_range=(200, 230))
+    assert (result['expiry'] == pd.Timestamp("2023-06-16")).all()
+    assert result['strike'].tolist() == [200.0, 210.0, 220.0, 230.0]
+
+    # The 2023-01-03 capture never satisfies the predicate, so its columns are not opened
+    for part in stale_parts:
+        os.remove(os.path.join(part, "strike.npy"))
+    assert len(store.read('TSLA', expiry_range=("2023-06-01", None), strike_range=(200, 230))) == 4
+
+
+def test_string_expiries_are_stored_as_dates(tmp_path):
+    """Test that a get_options_data-shaped chain with string expiries archives and filters by expiry"""
+    store = ChainSnapshotStore(root=str(tmp_path))
+    chain = make_chain(expiries=("2023-02-17",))
+    chain['expiry'] = "2023-02-17"
+    store.append(chain, captured_at="2023-01-03")
+    store.append(make_chain(expiries=("2023-06-16",)).assign(expiry="2023-06-16"), captured_at="2023-01-04")
+
+    days = list(store.replay('TSLA', expiry_range=(None, "2023-03-01")))
+    assert [date for date, _ in days] == [pd.Timestamp("2023-01-03")]
+    assert (days[0][1]['expiry'] == pd.Timestamp("2023-02-17")).all()
+    assert len(days[0][1]) == len(chain)
+
+
+def test_replay_yields_latest_capture_per_day(tmp_path):
+    """Test that replay streams one chain per date, using the last capture of the day"""
+    store = ChainSnapshotStore(root=str(tmp_path))
+    store.append(make_chain(price=200.0), captured_at="2023-01-03 10:00")
+    store.append(make_chain(price=205.0), captured_at="2023-01-03 15:00")
+    store.append(make_chain(price=210.0), captured_at="2023-01-05 15:00")
+
+    days = list(store.replay('TSLA', "2023-01-01", "2023-01-31", columns=['strike', 'currentPrice']))
+    assert [date for date, _ in days] == [pd.Timestamp("2023-01-03"), pd.Timestamp("2023-01-05")]
+    assert days[0][1]['currentPrice'].iloc[0] == 205.0
+    assert list(days[0][1].columns) == ['strike', 'currentPrice', 'captured_at']
+    assert len(store.read('TSLA', end="2023-01-03", latest_per_day=False)) == 2 * len(make_chain())
+
+
+def test_backtester_replays_snapshots(tmp_path):
+    """Test that the backtester feeds archived chains to _process_trades day by day"""
+    from thetaflow.backtest import ThetaFlowBacktester
+
+    store = ChainSnapshotStore(root=str(tmp_path))
+    store.append(make_chain(price=200.0), captured_at="2023-01-03 16:00")
+    store.append(make_chain(price=210.0), captured_at="2023-01-05 16:00")
+
+    bt = ThetaFlowBacktester(start_date="2023-01-02", end_date="2023-01-07", snapshot_store=store)
+    dates = pd.bdate_range("2023-01-02", "2023-01-06")
+    bt.stock_data = pd.DataFrame({'Close': 200.0}, index=dates)
+    seen = {}
+    bt._process_trades = lambda options_data, date: seen.__setitem__(date, options_data)
+    bt.run_backtest()
+
+    assert seen[pd.Timestamp("2023-01-02")].empty
+    assert seen[pd.Timestamp("2023-01-05")]['currentPrice'].iloc[0] == 210.0
+    with pytest.raises(ValueError):
+        bt.run_backtest(vectorized=True)
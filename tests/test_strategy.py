@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import pandas as pd
+from thetaflow import strategy
+from thetaflow.earnings import EarningsCalendar
+from thetaflow.strategy import select_low_risk_calls
+
+
+@pytest.fixture(autouse=True)
+def offline_calendar(monkeypatch):
+    """Serve earnings lookups from memory with no earnings date known"""
+    calendar = EarningsCalendar(cache_file=None, fetcher=lambda symbol: None)
+    monkeypatch.setattr(strategy, "get_default_calendar", lambda: calendar)
+
+
+def make_chain(expiry_days=(7, 30, 60)):
+    """Build a small synthetic calls chain around a $100 underlying"""
+    now = pd.Timestamp.now().normalize()
+    rows = []
+    for days in expiry_days:
+        expiry_date = now + pd.Timedelta(days=days)
+        expiry = expiry_date.strftime('%Y-%m-%d')
+        for strike in np.arange(80.0, 161.0, 5.0):
+            rows.append({
+                'contractSymbol': f"TEST{expiry_date:%y%m%d}C{int(strike * 1000):08d}",
+                'strike': strike,
+                'lastPrice': max(0.05, (100.0 - strike) * 0.5 + 2.0),
+                'openInterest': 1500 if strike != 150.0 else 500,
+                'impliedVolatility': 0.35,
+                'currentPrice': 100.0,
+                'expiry': expiry,
+            })
+    return pd.DataFrame(rows)
+
+
+def test_selects_only_liquid_otm_calls_above_target():
+    """Test that every candidate is OTM, liquid and meets the probability target"""
+    selected = select_low_risk_calls(make_chain(), max_contracts=100, target_probability=0.90)
+    assert not selected.empty
+    assert (selected['strike'] > 100.0).all()
+    assert (selected['openInterest'] > 1000).all()
+    assert (selected['prob_profit'] >= 0.90).all()
+    assert 150.0 not in selected['strike'].values
+
+
+def test_respects_max_contracts_and_net_premium():
+    """Test that results are capped and net premium accounts for fees"""
+    selected = select_low_risk_calls(make_chain(), max_contracts=2, target_probability=0.5)
+    assert len(selected) == 2
+    expected = selected['lastPrice'] * 100 - 0.65
+    np.testing.assert_allclose(selected['net_premium'], expected)
+
+
+def test_expired_chain_returns_empty_frame():
+    """Test that a chain with only expired contracts yields no candidates"""
+    selected = select_low_risk_calls(make_chain(expiry_days=(-3,)))
+    assert selected.empty
+
+
+def test_avoids_expiries_near_earnings():
+    """Test that expiries within five days of earnings are excluded for the chain's ticker"""
+    chain = make_chain()
+    earnings_date = pd.Timestamp(chain['expiry'].iloc[0])
+    seen = []
+
+    def fetcher(symbol):
+        seen.append(symbol)
+        return earnings_date
+
+    calendar = EarningsCalendar(cache_file=None, fetcher=fetcher)
+    selected = select_low_risk_calls(chain, max_contracts=100, target_probability=0.5,
+                                     earnings_calendar=calendar)
+    assert seen == ['TEST']
+    assert not selected.empty
+    assert (abs(selected['expiry_datetime'] - earnings_date) > pd.Timedelta(days=5)).all()
+
+
+def test_solve_iv_replaces_stale_volatility():
+    """Test that selection can re-solve IV from bid/ask mids when reported IV is zero"""
+    from thetaflow.risk_model import black_scholes_greeks
+    from thetaflow.strategy import solve_chain_implied_volatility
+
+    chain = make_chain()
+    as_of = pd.Timestamp.now()
+    t = (pd.to_datetime(chain['expiry']) - as_of).dt.total_seconds() / (365.25 * 24 * 3600)
+    fair = black_scholes_greeks(100.0, chain['strike'].to_numpy(), t.to_numpy(), 0.05, 0.35)['price']
+    chain = chain.assign(bid=fair - 0.01, ask=fair + 0.01, impliedVolatility=0.0)
+
+    solved = solve_chain_implied_volatility(chain, as_of=as_of)
+    otm = (chain['strike'] > 100.0).to_numpy() & (fair > 0.05)
+    np.testing.assert_allclose(solved[otm], 0.35, atol=0.02)
+
+    assert select_low_risk_calls(chain, max_contracts=100).empty
+    selected = select_low_risk_calls(chain, max_contracts=100, solve_iv=True)
+    assert not selected.empty
+    assert (selected['impliedVolatility'] > 0).all()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.shared_frame import SharedFrame
+from thetaflow.sweep import expand_grid, run_sweep, summarize_run
+
+
+def make_price_history():
+    dates = pd.bdate_range("2023-01-02", "2023-07-01")
+    close = np.linspace(100.0, 150.0, len(dates))
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close,
+                         'Close': close, 'Volume': 1e6}, index=dates)
+
+
+def test_expand_grid():
+    """Test that the grid expands to every combination and rejects unknown names"""
+    configs = expand_grid({'target_probability': [0.85, 0.9], 'max_contracts': [1, 2, 3]})
+    assert len(configs) == 6
+    assert configs[0] == {'target_probability': 0.85, 'max_contracts': 1}
+    with pytest.raises(ValueError):
+        expand_grid({'leverage': [2]})
+
+
+def test_summarize_run_drawdown():
+    """Test total return and maximum drawdown of a value path"""
+    portfolio = pd.DataFrame({'total_value': [100.0, 120.0, 90.0, 110.0]})
+    summary = summarize_run(portfolio, pd.DataFrame(), initial_capital=100.0)
+    assert summary['total_return'] == pytest.approx(0.10)
+    assert summary['max_drawdown'] == pytest.approx(-0.25)
+    assert summary['n_trades'] == 0
+
+
+def test_shared_frame_round_trip():
+    """Test that an attached frame matches the original without copying it"""
+    history = make_price_history()
+    with SharedFrame(history) as shared:
+        frame, handles = SharedFrame.attach(shared.spec)
+        pd.testing.assert_frame_equal(frame, history, check_freq=False)
+        assert not frame.to_numpy().flags.writeable
+        del frame
+        for handle in handles:
+            handle.close()
+
+
+def test_run_sweep_across_processes():
+    """Test that every configuration produces a summary row"""
+    results = run_sweep(
+        {'strike_step': [0.025, 0.05], 'days_to_expiry': [7, 30]},
+        start_date="2023-01-02",
+        end_date="2023-07-01",
+        max_workers=2,
+        stock_data=make_price_history()
+    )
+    assert len(results) == 4
+    assert {'strike_step', 'days_to_expiry', 'total_return', 'max_drawdown', 'n_trades'} <= set(results.columns)
@@ -0,0 +1,120 @@
+import json
+import logging
+import subprocess
+import sys
+import pytest
+from thetaflow.utils import LazyModule, atomic_write, lazy_import, setup_logging, shutdown_logging
+
+
+def _modules_after(code):
+    """Run code in a fresh interpreter and return the top-level modules it imported"""
+    script = f"{code}\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return set(output.stdout.split())
+
+
+def test_package_import_is_lazy():
+    """Test that reaching setup_logging does not import pandas, scipy or yfinance"""
+    loaded = _modules_after("from thetaflow import setup_logging, log_message")
+    assert not loaded & {'pandas', 'numpy', 'scipy', 'yfinance'}
+
+
+def test_strategy_defers_scipy_and_yfinance():
+    """Test that heavy dependencies load only when a function needs them"""
+    loaded = _modules_after("import thetaflow.strategy, thetaflow.data_fetch, thetaflow.backtest")
+    assert 'scipy' not in loaded and 'yfinance' not in loaded
+    loaded = _modules_after("from thetaflow import estimate_delta; estimate_delta(100.0, 110.0, 0.5, 0.05, 0.3)")
+    assert 'scipy' in loaded
+
+
+def test_lazy_module_forwards_attributes(monkeypatch):
+    """Test that a lazy module behaves like the real one, including monkeypatching"""
+    import json
+    assert lazy_import("json") is json
+    lazy = LazyModule("json")
+    assert lazy.dumps([1]) == "[1]"
+    monkeypatch.setattr(lazy, "dumps", lambda obj: "patched")
+    assert json.dumps([1]) == "patched"
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path):
+    """Test that a failed write leaves the previous file and no temporary file behind"""
+    path = tmp_path / "out" / "state.json"
+    atomic_write(str(path), lambda f: f.write("old"), mode="w")
+
+    def fail(f):
+        f.write("partial")
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(str(path), fail, mode="w")
+    assert path.read_text() == "old"
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
+
+
+def test_package_exposes_same_names():
+    """Test that the lazily exposed names resolve to the module attributes"""
+    import thetaflow
+    from thetaflow.strategy import select_low_risk_calls
+    assert thetaflow.select_low_risk_calls is select_low_risk_calls
+    assert thetaflow.ThetaFlowBacktester is not None
+    with pytest.raises(AttributeError):
+        thetaflow.not_a_name
+
+
+@pytest.fixture
+def root_logger():
+    """Restore the root logger's handlers and level after a test reconfigures it"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    root.handlers = []
+    yield root
+    shutdown_logging()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def test_queued_logging_writes_json_lines_on_shutdown(tmp_path, root_logger):
+    """Test that queued records are all written as JSON lines once logging shuts down"""
+    log_file = tmp_path / "logs" / "run.jsonl"
+    setup_logging(str(log_file), queued=True, json_lines=True)
+    for i in range(1000):
+        logging.info("day %d", i, extra={'ticker': 'TSLA'})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logging.exception("failed")
+    shutdown_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert len(entries) == 1001
+    assert entries[0]['message'] == "day 0" and entries[0]['ticker'] == 'TSLA'
+    assert entries[999]['message'] == "day 999"
+    assert entries[-1]['level'] == 'ERROR' and 'RuntimeError: boom' in entries[-1]['exc_info']
+
+
+def test_queued_logging_rotates_by_size(tmp_path, root_logger):
+    """Test that the writer rotates the file before it exceeds max_bytes"""
+    log_file = tmp_path / "run.log"
+    setup_logging(str(log_file), queued=True, max_bytes=2000, backup_count=2)
+    for i in range(200):
+        logging.info("message %03d", i)
+    shutdown_logging()
+
+    assert log_file.stat().st_size <= 2000
+    assert (tmp_path / "run.log.1").stat().st_size <= 2000
+    assert (tmp_path / "run.log.2").exists() and not (tmp_path / "run.log.3").exists()
+    assert log_file.read_text().splitlines()[-1].endswith("message 199")
+
+
+def test_queued_logging_without_backups_never_truncates(tmp_path, root_logger):
+    """Test that backup_count=0 keeps every record in one file, like RotatingFileHandler"""
+    log_file = tmp_path / "run.log"
+    setup_logging(str(log_file), queued=True, max_bytes=2000, backup_count=0)
+    for i in range(200):
+        logging.info("message %03d", i)
+    shutdown_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 200 and lines[0].endswith("message 000")
+    assert list(tmp_path.iterdir()) == [log_file]
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from thetaflow.backtest import ThetaFlowBacktester
+from thetaflow.vol_surface import SurfaceCache, VolatilitySurface, parametric_surface
+
+AS_OF = pd.Timestamp("2024-01-02")
+
+
+def make_chain(surface, spot=100.0, expiry_days=(7, 30, 90)):
+    """Build a calls chain whose implied volatilities lie on a known surface"""
+    rows = []
+    for days in expiry_days:
+        strikes = np.arange(70.0, 140.0, 2.5)
+        ivs = surface.implied_volatility(strikes, days * 86400 / (365.25 * 86400), spot)
+        rows += [{'strike': k, 'impliedVolatility': iv, 'openInterest': 5000, 'currentPrice': spot,
+                  'expiry': AS_OF + pd.Timedelta(days=days)} for k, iv in zip(strikes, ivs)]
+    return pd.DataFrame(rows)
+
+
+def test_fit_recovers_smile_across_strikes_and_tenors():
+    """Test that fitted SVI slices reproduce the chain's smile and interpolate between expiries"""
+    true = parametric_surface(0.4, spot=100.0)
+    fitted = VolatilitySurface.fit(make_chain(true), as_of=AS_OF)
+    assert len(fitted.tenors) == 3
+
+    strikes = np.linspace(75.0, 130.0, 12)
+    tenors = np.array([3, 20, 60, 365]) / 365.25
+    np.testing.assert_allclose(fitted.implied_volatility(strikes[None, :], tenors[:, None]),
+                               true.implied_volatility(strikes[None, :], tenors[:, None]), atol=2e-3)
+    # Put-side skew survives the fit
+    assert fitted.implied_volatility(80.0, 0.1) > fitted.implied_volatility(100.0, 0.1)
+    assert np.isnan(fitted.implied_volatility(100.0, 0.0))
+
+    with pytest.raises(ValueError):
+        VolatilitySurface.fit(make_chain(true).head(3), as_of=AS_OF)
+
+
+def test_total_variance_interpolates_linearly_between_slices():
+    """Test tenor interpolation inside the fitted range and constant volatility outside it"""
+    surface = VolatilitySurface([0.1, 0.5], [[0.004, 0.0, 0.0, 0.0, 0.1], [0.05, 0.0, 0.0, 0.0, 0.1]],
+                                spot=100.0, risk_free_rate=0.0)
+    np.testing.assert_allclose(surface.total_variance(100.0, 0.3), (0.004 + 0.05) / 2)
+    np.testing.assert_allclose(surface.implied_volatility(100.0, [0.05, 2.0]),
+                               [np.sqrt(0.004 / 0.1), np.sqrt(0.05 / 0.5)])
+
+
+def test_surface_cache_persists_and_serves_latest(tmp_path, monkeypatch):
+    """Test that surfaces are fitted once per ticker and date and read back from disk"""
+    chain = make_chain(parametric_surface(0.3))
+    cache = SurfaceCache(root=str(tmp_path))
+    surface = cache.fit('tsla', AS_OF, chain)
+
+    def no_refit(*args, **kwargs):
+        raise AssertionError("surface refitted")
+    monkeypatch.setattr(VolatilitySurface, 'fit', no_refit)
+    assert cache.fit('TSLA', AS_OF, chain) is surface
+
+    reopened = SurfaceCache(root=str(tmp_path))
+    restored = reopened.latest('TSLA', AS_OF + pd.Timedelta(days=10))
+    np.testing.assert_allclose(restored.params, surface.params)
+    assert reopened.latest('TSLA', AS_OF - pd.Timedelta(days=1)) is None
+    # The day's own fit is not used to price that day unless asked for
+    assert reopened.latest('TSLA', AS_OF) is None
+    assert reopened.latest('TSLA', AS_OF, include_date=True) is restored
+    assert reopened.get('AAPL', AS_OF) is None
+
+
+def test_simulated_chain_is_priced_off_the_surface():
+    """Test that simulated chains carry the smile and Black-Scholes premiums for OTM strikes"""
+    bt = ThetaFlowBacktester()
+    chain = bt.simulate_options_data(200.0, AS_OF)
+    assert (chain['lastPrice'] > np.maximum(200.0 - chain['strike'], 0)).all()
+    assert chain['impliedVolatility'].iloc[0] > chain['impliedVolatility'].iloc[-1]
+
+    cache = SurfaceCache()
+    cache.put('TSLA', AS_OF - pd.Timedelta(days=5), parametric_surface(0.8))
+    high_vol = ThetaFlowBacktester(vol_surface=cache).simulate_options_data(200.0, AS_OF)
+    assert (high_vol['lastPrice'] > chain['lastPrice']).all()
+    before_fit = ThetaFlowBacktester(vol_surface=cache).simulate_options_data(200.0, AS_OF - pd.Timedelta(days=6))
+    pd.testing.assert_frame_equal(before_fit, bt.simulate_options_data(200.0, AS_OF - pd.Timedelta(days=6)))
@@ -1,28 +1,64 @@
 """
 ThetaFlow Package Initialization
 
-This file initializes the thetaflow package by importing key modules
-used throughout the project. This makes it easier to access functions
-directly from the package. For example:
+This file exposes the key functions used throughout the project so they can be
+accessed directly from the package. For example:
 
     from thetaflow import get_options_data, select_covered_calls, setup_logging
 
-Modules Imported:
-- data_fetch: Contains functions to retrieve live options data using yfinance.
+Names are loaded lazily (PEP 562): a submodule is only imported the first time
+one of its names is accessed, so `from thetaflow import setup_logging` does not
+pull in pandas, scipy or yfinance. Run `python -m thetaflow.importtime` to
+measure cold-start import cost.
+
+Modules Exposed:
+- data_fetch: Contains functions to retrieve options data through a pluggable data provider.
 - strategy: Hosts the logic to filter and select low-risk covered call candidates.
+- ranking: Scores candidates across every expiry and strike and returns the best k per ticker.
 - risk_model: Contains risk calculation functions using Black-Scholes model.
+- scenarios: Revalues a book of stock and short calls over spot x vol x time stress grids.
 - utils: Provides utility functions like logging setup and helper methods.
 - backtest: Contains the backtesting framework for strategy evaluation.
 """
 
-from .data_fetch import get_options_data
-from .strategy import select_covered_calls, select_low_risk_calls
-from .risk_model import estimate_delta
-from .utils import setup_logging, log_message
-
-# Import backtest module conditionally to avoid circular imports
-try:
-    from .backtest import ThetaFlowBacktester
-except ImportError:
-    # Backtest module might not be available in all environments
-    ThetaFlowBacktester = None
\ No newline at end of file
+import importlib
+
+# Public name -> submodule that defines it
+_LAZY_ATTRIBUTES = {
+    'get_options_data': 'data_fetch',
+    'select_covered_calls': 'strategy',
+    'select_low_risk_calls': 'strategy',
+    'rank_candidates': 'ranking',
+    'estimate_delta': 'risk_model',
+    'stress_test': 'scenarios',
+    'setup_logging': 'utils',
+    'log_message': 'utils',
+    'shutdown_logging': 'utils',
+    'ThetaFlowBacktester': 'backtest',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if module_name == 'backtest':
+        # Import backtest module conditionally to avoid circular imports
+        try:
+            value = importlib.import_module(f".{module_name}", __name__).ThetaFlowBacktester
+        except ImportError:
+            # Backtest module might not be available in all environments
+            value = None
+    else:
+        value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -3,29 +3,160 @@ ThetaFlow Backtesting Framework
 A simplified backtesting approach using historical stock prices and simulated options data.
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
-from .risk_model import estimate_delta
+import os
+import pickle
+from . import metrics
+from .risk_model import black_scholes_greeks, estimate_delta
+from .price_cache import DEFAULT_CHUNK_BARS, get_default_price_cache
+from .earnings import EarningsCalendar
+from .ledger import ColumnarLedger, PORTFOLIO_COLUMNS, TRADE_COLUMNS
+from .positions import PositionBook
+from .utils import atomic_write
+from .strategy import FEE_PER_CONTRACT, RISK_FREE_RATE, SECONDS_PER_YEAR, _expiry_datetimes, select_low_risk_calls
+from .vol_surface import SurfaceCache, parametric_surface
+
+# Synthetic chain layout: strikes from 80% to 120% of spot in 2.5% steps
+STRIKE_LOW = 0.8
+STRIKE_HIGH = 1.2
+STRIKE_STEP = 0.025
+DAYS_TO_EXPIRY = 30
+SIMULATED_IV = 0.4  # At-the-money level of the default simulated smile
+SIMULATED_VOLUME = 1000
+SIMULATED_OPEN_INTEREST = 5000  # Above strategy.MIN_OPEN_INTEREST so the chain passes the liquidity filter
+CHECKPOINT_EVERY = 250  # Trading days between periodic checkpoints
+CHECKPOINT_VERSION = 3
+LEDGER_SEGMENTS_SUFFIX = ".ledgers"  # Checkpoint ledger rows live in <checkpoint>.ledgers
+SHARES_PER_CONTRACT = 100
+INTRADAY_CHUNK_BARS = DEFAULT_CHUNK_BARS  # Bars held in memory at once (~130 trading days of minute bars)
+SESSION_CLOSE = pd.Timedelta(hours=16)  # Intraday expiries are at the 16:00 close (bar times are exchange time)
+# Smile used for simulated chains when no fitted surface is available
+SIMULATED_SURFACE = parametric_surface(SIMULATED_IV)
+
+
+def _no_earnings(ticker_symbol):
+    """Earnings fetcher for historical runs, which have no point-in-time earnings dates."""
+    return None
+
+
+def _strike_grid(prices, strike_step=STRIKE_STEP):
+    """
+    Build the synthetic strike grid for one or many spot prices.
+
+    Args:
+        prices (float or ndarray): Spot price(s), shape (n_dates,) or scalar
+        strike_step (float): Strike spacing as a fraction of spot
+
+    Returns:
+        ndarray: Strikes with shape prices.shape + (n_strikes,)
+    """
+    n_strikes = int(round((STRIKE_HIGH - STRIKE_LOW) / strike_step))
+    prices = np.asarray(prices, dtype=float)[..., None]
+    start = prices * STRIKE_LOW
+    # Same arithmetic as np.arange(start, stop, step), evaluated for every row at once
+    delta = (start + prices * strike_step) - start
+    return start + np.arange(n_strikes) * delta
+
 
 class ThetaFlowBacktester:
-    def __init__(self, ticker="TSLA", start_date="2020-01-01", end_date="2024-12-31"):
+    """
+    Day-by-day covered call backtest.
+
+    The strategy holds max_contracts round lots of stock and writes calls against
+    them using select_low_risk_calls on each day's chain. Short calls are settled at
+    expiry (assigned when in the money, otherwise expiring worthless); the stock is
+    bought back after an assignment. With review_days set, each call is reviewed that
+    many days before expiry and bought back early when it has captured take_profit of
+    its premium, or unconditionally when roll=True (a new call is then sold the same
+    day). Open calls are not marked to market in total_value.
+
+    Args:
+        trade_options (bool): Run the position engine; False tracks the untraded
+            portfolio only (the mode the vectorized backtest models)
+        review_days (int): Days before expiry to review open calls; None holds to expiry
+        take_profit (float): Fraction of the premium captured that triggers an early close
+        roll (bool): Close every reviewed call and sell a new one in its place
+        earnings_calendar (EarningsCalendar): Passed through to select_low_risk_calls. Defaults
+            to a calendar with no earnings dates: the live next-earnings date would be
+            look-ahead on every historical day, so pass a calendar that answers as of
+            the simulated date to avoid earnings in a backtest.
+        initial_capital (float): Starting cash
+        vol_surface (VolatilitySurface or SurfaceCache): Smile used to price simulated
+            chains. A SurfaceCache supplies the latest surface fitted before each day
+            (the prior close, never the day's own chain); SIMULATED_SURFACE is used
+            when None or when the cache has none yet.
+    """
+
+    def __init__(self, ticker="TSLA", start_date="2020-01-01", end_date="2024-12-31", price_cache=None,
+                 target_probability=0.90, max_contracts=2, strike_step=STRIKE_STEP,
+                 days_to_expiry=DAYS_TO_EXPIRY, snapshot_store=None, trade_options=True,
+                 review_days=None, take_profit=0.8, roll=False, earnings_calendar=None, initial_capital=100000,
+                 vol_surface=None):
         self.ticker = ticker
         self.start_date = pd.to_datetime(start_date)
         self.end_date = pd.to_datetime(end_date)
-        self.trades = []
-        self.portfolio_value = []
-        self.initial_capital = 100000  # $100k starting capital
+        # Strategy parameters
+        self.target_probability = target_probability
+        self.max_contracts = max_contracts
+        self.strike_step = strike_step  # Strike spacing as a fraction of spot
+        self.days_to_expiry = days_to_expiry
+        self.trade_options = trade_options
+        self.review_days = review_days
+        self.take_profit = take_profit
+        self.roll = roll
+        self.earnings_calendar = earnings_calendar or EarningsCalendar(cache_file=None, fetcher=_no_earnings)
+        self.price_cache = price_cache
+        self.snapshot_store = snapshot_store  # Replay archived chains instead of simulating them
+        self.vol_surface = vol_surface
+        self.stock_data = None  # Daily bars, loaded on first use
+        self.trades = ColumnarLedger(TRADE_COLUMNS)
+        self.portfolio_value = ColumnarLedger(PORTFOLIO_COLUMNS)
+        self.initial_capital = initial_capital  # $100k starting capital by default
         self.current_capital = self.initial_capital
         self.stock_position = 0
-        self.option_positions = []
+        self.option_positions = PositionBook()  # Open short calls, scheduled by expiry/review date
+        self.current_price = None  # Close of the day being processed
+        self.last_date = None  # Last trading day processed; later runs resume after it
+        self._checkpoint = None  # (path, trade rows, portfolio rows, ledger bytes) of the last save
+
+    def volatility_surface(self, date):
+        """
+        Return the volatility surface used to price the simulated chain on a date.
+
+        Args:
+            date (Timestamp): Trading day
+
+        Returns:
+            VolatilitySurface: The configured surface, the cache's latest surface from
+                before date, or SIMULATED_SURFACE
+        """
+        if isinstance(self.vol_surface, SurfaceCache):
+            surface = self.vol_surface.latest(self.ticker, date)
+            if surface is not None:
+                return surface
+        elif self.vol_surface is not None:
+            return self.vol_surface
+        return SIMULATED_SURFACE
+
+    def _price_chain(self, surface, current_price, strikes, time_to_expiry):
+        """Read each strike's volatility off the surface and price the calls with Black-Scholes."""
+        implied_volatility = surface.implied_volatility(strikes, time_to_expiry, current_price)
+        prices = black_scholes_greeks(current_price, strikes, time_to_expiry, RISK_FREE_RATE,
+                                      implied_volatility)['price']
+        return implied_volatility, prices
 
     def simulate_options_data(self, current_price, date):
         """
         Simulate options chain data based on current price
-        
+
+        Strikes span STRIKE_LOW to STRIKE_HIGH of spot and expire days_to_expiry days
+        after date. Each strike's implied volatility comes from volatility_surface(date)
+        (sticky-moneyness, so the smile moves with spot) and lastPrice is its
+        Black-Scholes value.
+
         Args:
             current_price (float): Current stock price
             date (datetime): Current date
@@ -33,82 +164,658 @@ class ThetaFlowBacktester:
         # Ensure current_price is a single float value
         if isinstance(current_price, pd.Series):
             current_price = float(current_price.iloc[0])
-        
-        strikes = np.arange(
-            current_price * 0.8,  # 20% below current price
-            current_price * 1.2,  # 20% above current price
-            current_price * 0.025  # 2.5% strike intervals
-        )
-        
+
+        strikes = _strike_grid(current_price, self.strike_step)
+        expiry = date + timedelta(days=self.days_to_expiry)  # 30-day options by default
+        time_to_expiry = self.days_to_expiry * 86400 / SECONDS_PER_YEAR
+        implied_volatility, prices = self._price_chain(self.volatility_surface(date), current_price, strikes,
+                                                       time_to_expiry)
+
         data = {
             'strike': strikes,
             'currentPrice': current_price,
-            'impliedVolatility': 0.4,  # Assumed constant volatility
-            'lastPrice': np.zeros_like(strikes),  # Will calculate below
-            'volume': 1000,  # Assumed constant volume
-            'openInterest': 1000,  # Assumed constant open interest
-            'expiry': date + timedelta(days=30)  # 30-day options
+            'impliedVolatility': implied_volatility,
+            'lastPrice': prices,
+            'volume': SIMULATED_VOLUME,  # Assumed constant volume
+            'openInterest': SIMULATED_OPEN_INTEREST,  # Assumed constant open interest
+            'expiry': expiry
         }
-        
-        # Calculate option prices using Black-Scholes
-        for i, strike in enumerate(strikes):
-            moneyness = float(current_price) / float(strike)
-            if moneyness > 1.1:  # ITM
-                data['lastPrice'][i] = max(0, current_price - strike) * 1.1
-            elif moneyness < 0.9:  # OTM
-                data['lastPrice'][i] = max(0, current_price - strike) * 0.9
-            else:  # ATM
-                data['lastPrice'][i] = max(0, current_price - strike)
-        
+
         return pd.DataFrame(data)
 
-    def run_backtest(self):
-        """Run the backtest simulation"""
+    def simulate_options_surface(self, prices, dates):
+        """
+        Simulate the options chain for every date at once.
+
+        Vectorized counterpart of simulate_options_data: row i of each 2-D array holds
+        the chain simulate_options_data would build for (prices[i], dates[i]). With a
+        SurfaceCache the rows are priced per distinct surface.
+
+        Args:
+            prices (array-like): Closing prices, shape (n_dates,)
+            dates (DatetimeIndex): Trading dates, shape (n_dates,)
+
+        Returns:
+            dict: 'strike', 'impliedVolatility' and 'lastPrice' arrays of shape
+                (n_dates, n_strikes), plus per-date 'currentPrice' and 'expiry' arrays
+                and the scalar 'volume' and 'openInterest' assumptions.
+        """
+        prices = np.asarray(prices, dtype=float)
+        dates = pd.DatetimeIndex(dates)
+        strikes = _strike_grid(prices, self.strike_step)
+        time_to_expiry = self.days_to_expiry * 86400 / SECONDS_PER_YEAR
+
+        implied_volatility = np.empty_like(strikes)
+        option_prices = np.empty_like(strikes)
+        if isinstance(self.vol_surface, SurfaceCache):
+            surfaces = [self.volatility_surface(date) for date in dates]
+        else:
+            surfaces = [self.volatility_surface(None)] * len(dates)
+        # Price each run of consecutive days sharing a surface in one batch
+        start = 0
+        for end in range(1, len(dates) + 1):
+            if end == len(dates) or surfaces[end] is not surfaces[start]:
+                implied_volatility[start:end], option_prices[start:end] = self._price_chain(
+                    surfaces[start], prices[start:end, None], strikes[start:end], time_to_expiry
+                )
+                start = end
+
+        return {
+            'strike': strikes,
+            'impliedVolatility': implied_volatility,
+            'lastPrice': option_prices,
+            'currentPrice': prices,
+            'expiry': dates + pd.Timedelta(days=self.days_to_expiry),
+            'volume': SIMULATED_VOLUME,
+            'openInterest': SIMULATED_OPEN_INTEREST,
+        }
+
+    def price_synthetic_chain(self, current_price, as_of):
+        """
+        Black-Scholes priced synthetic chain at an exact point in time.
+
+        Used by the intraday mode: the chain expires at the session close
+        (SESSION_CLOSE) days_to_expiry calendar days after as_of's date and time to
+        expiry is measured to the second, so premiums decay continuously through the day.
+
+        Args:
+            current_price (float): Spot price
+            as_of (Timestamp): Bar time
+
+        Returns:
+            DataFrame: Same columns as simulate_options_data
+        """
+        as_of = pd.Timestamp(as_of)
+        strikes = _strike_grid(current_price, self.strike_step)
+        expiry = as_of.normalize() + pd.Timedelta(days=self.days_to_expiry) + SESSION_CLOSE
+        time_to_expiry = (expiry - as_of).total_seconds() / SECONDS_PER_YEAR
+        implied_volatility, prices = self._price_chain(self.volatility_surface(as_of), current_price, strikes,
+                                                       time_to_expiry)
+        return pd.DataFrame({
+            'strike': strikes,
+            'currentPrice': current_price,
+            'impliedVolatility': implied_volatility,
+            'lastPrice': prices,
+            'volume': SIMULATED_VOLUME,
+            'openInterest': SIMULATED_OPEN_INTEREST,
+            'expiry': expiry
+        })
+
+    def load_price_history(self):
+        """
+        Load daily bars for the backtest range from the local price cache.
+
+        Only dates not already cached are downloaded, so repeat runs read straight
+        from disk. Assign a DataFrame to self.stock_data beforehand to bypass the cache.
+        """
+        if self.stock_data is None:
+            cache = self.price_cache or get_default_price_cache()
+            self.stock_data = cache.get_history(self.ticker, self.start_date, self.end_date, interval="1d")
+        return self.stock_data
+
+    def _replayed_options(self, dates):
+        """
+        Yield the archived chain for each trading date from the snapshot store.
+
+        Snapshots are streamed one day at a time and merged against the trading
+        calendar; dates without a capture yield an empty DataFrame.
+        """
+        snapshots = self.snapshot_store.replay(self.ticker, dates[0], dates[-1])
+        pending = next(snapshots, None)
+        for date in dates:
+            day = pd.Timestamp(date).normalize()
+            while pending is not None and pending[0] < day:
+                pending = next(snapshots, None)
+            if pending is not None and pending[0] == day:
+                yield pending[1]
+            else:
+                yield pd.DataFrame()
+
+    def _pending_history(self):
+        """
+        Return the bars that still have to be processed, i.e. those after last_date.
+
+        Once the backtest has started, only the tail after last_date is loaded, so
+        extending a finished run by a day reads one bar instead of the whole range.
+        """
+        if self.last_date is None:
+            return self.load_price_history()
+        resume_from = self.last_date + pd.Timedelta(days=1)
+        if self.stock_data is not None:
+            return self.stock_data.iloc[self.stock_data.index.searchsorted(resume_from):]
+        cache = self.price_cache or get_default_price_cache()
+        return cache.get_history(self.ticker, resume_from, self.end_date, interval="1d")
+
+    def step(self, date, current_price, options_data=None):
+        """
+        Advance the backtest by one trading day.
+
+        Records the day's portfolio value, then hands the day's option chain to
+        _process_trades. Costs O(1) regardless of how many days came before.
+
+        Args:
+            date (Timestamp): Trading day, after last_date
+            current_price (float): Closing price
+            options_data (DataFrame): Chain for the day; simulated when None
+
+        Returns:
+            dict: The day's portfolio row (date, stock_price, stock_value, cash, total_value)
+
+        Raises:
+            ValueError: If date is not after the last processed day.
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{date:%Y-%m-%d} is not after the last processed day {self.last_date:%Y-%m-%d}")
+
+        # Track portfolio value
+        state = {
+            'date': date,
+            'stock_price': current_price,
+            'stock_value': self.stock_position * current_price,
+            'cash': self.current_capital,
+            'total_value': self.current_capital + (self.stock_position * current_price),
+        }
+        self.portfolio_value.append(state)
+        metrics.increment('backtest_days')
+
+        # Replay the archived chain, or let _process_trades simulate one if it needs it
+        self.current_price = current_price
+        self._process_trades(options_data, date)
+
+        self.last_date = date
+        return state
+
+    def iter_backtest(self, checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY):
+        """
+        Run the backtest lazily, yielding each trading day's portfolio row.
+
+        Processing resumes after last_date, so calling this again on a finished (or
+        restored) backtester only processes new days: bars appended to stock_data, or,
+        when prices come from the cache, bars up to a later end_date.
+
+        Args:
+            checkpoint_path (str): Save a checkpoint here every `checkpoint_every` days
+                and when the range is exhausted; None disables checkpoints
+            checkpoint_every (int): Trading days between periodic checkpoints
+
+        Yields:
+            dict: The portfolio row returned by step()
+        """
+        stock_data = self._pending_history()
+        if stock_data.empty:
+            return
+
+        closes = stock_data['Close'].to_numpy(dtype=float)
+        replayed = self._replayed_options(stock_data.index) if self.snapshot_store is not None else None
+
+        for i, date in enumerate(stock_data.index):
+            options_data = next(replayed) if replayed is not None else None
+            yield self.step(date, float(closes[i]), options_data)
+            if checkpoint_path and (i + 1) % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path)
+
+        if checkpoint_path:
+            self.save_checkpoint(checkpoint_path)
+
+    def run_backtest(self, vectorized=False, checkpoint_path=None, interval="1d"):
+        """
+        Run the backtest simulation
+
+        Args:
+            vectorized (bool): Build the whole option surface and portfolio path with
+                array operations instead of looping day by day (see _run_vectorized).
+                Requires trade_options=False and is not available when replaying a
+                snapshot store.
+            checkpoint_path (str): Write periodic checkpoints here (see iter_backtest)
+            interval (str): Bar interval; anything other than '1d' runs the streaming
+                intraday mode (see iter_intraday) and keeps only the daily ledgers
+        """
+        if vectorized:
+            if self.trade_options:
+                raise ValueError("Vectorized backtests do not trade options; use trade_options=False "
+                                 "or run day by day")
+            if self.snapshot_store is not None:
+                raise ValueError("Vectorized backtests use the synthetic surface; replay snapshots day by day")
+            return self._run_vectorized()
+
         print(f"Running backtest from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}")
-        
-        # Get historical data
-        stock_data = yf.download(
-            self.ticker,
-            start=self.start_date,
-            end=self.end_date,
-            interval="1d"
-        )
-        
+
+        if interval != "1d":
+            for _ in self.iter_intraday(interval=interval):
+                pass
+            return self.create_results()
+
+        if self.last_date is None and self.load_price_history().empty:
+            raise ValueError("No historical data found")
+
+        for _ in self.iter_backtest(checkpoint_path=checkpoint_path):
+            pass
+
+        return self.create_results()
+
+    def iter_intraday(self, interval="1m", chunk_size=INTRADAY_CHUNK_BARS):
+        """
+        Stream an intraday backtest from the price cache, one chunk of bars at a time.
+
+        Trading decisions run once per day on the day's first bar, using the priced
+        synthetic chain (see price_synthetic_chain) and the usual position lifecycle;
+        the ledgers therefore grow by one portfolio row per day. Between decisions
+        every open call is re-marked on every bar with time to expiry shrinking
+        continuously. Calls expiring on a day are settled at that day's last bar, once
+        the next day's first bar (or the end of the data) shows the day is over.
+        Per-bar results are only yielded, never accumulated, so peak
+        memory is set by chunk_size rather than the length of the date range.
+
+        Args:
+            interval (str): Bar interval in the price cache, e.g., '1m' or '5m'
+            chunk_size (int): Bars per chunk
+
+        Yields:
+            DataFrame: One row per bar, indexed by bar time, with stock_price,
+                stock_value, option_value (cost to buy back open calls), cash and
+                total_value (cash + stock_value - option_value)
+
+        Raises:
+            ValueError: If this backtester has already processed days.
+        """
+        if self.last_date is not None:
+            raise ValueError("Intraday mode runs the whole range at once; use a fresh backtester")
+
+        cache = self.price_cache or get_default_price_cache()
+        current_day, last_time, last_close = None, None, None
+        for bars in cache.iter_chunks(self.ticker, self.start_date, self.end_date, interval, chunk_size):
+            times = bars.index
+            closes = bars['Close'].to_numpy(dtype=float)
+            days = times.normalize()
+
+            # Split the chunk into runs of bars from the same day
+            new_day = np.empty(len(days), dtype=bool)
+            new_day[0] = days[0] != current_day
+            new_day[1:] = days[1:] != days[:-1]
+            bounds = np.unique(np.concatenate([[0], np.flatnonzero(new_day), [len(days)]]))
+
+            stock_value = np.empty(len(closes))
+            option_value = np.empty(len(closes))
+            cash = np.empty(len(closes))
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                if new_day[lo]:
+                    if current_day is not None:
+                        self._settle_session(current_day, last_time, last_close)
+                    self.step(times[lo], float(closes[lo]), self.price_synthetic_chain(float(closes[lo]), times[lo]))
+                    current_day = days[lo]
+                stock_value[lo:hi] = self.stock_position * closes[lo:hi]
+                option_value[lo:hi] = self._mark_positions(closes[lo:hi], times[lo:hi])
+                cash[lo:hi] = self.current_capital
+                last_time, last_close = times[hi - 1], float(closes[hi - 1])
+
+            metrics.increment('intraday_bars', len(closes))
+            yield pd.DataFrame({
+                'stock_price': closes,
+                'stock_value': stock_value,
+                'option_value': option_value,
+                'cash': cash,
+                'total_value': cash + stock_value - option_value,
+            }, index=times)
+
+        if current_day is not None:
+            self._settle_session(current_day, last_time, last_close)
+
+    def _settle_session(self, day, last_time, last_close):
+        """
+        Settle the calls expiring at a day's close, at its last bar.
+
+        Calls expiring on a day without bars are left for _process_trades to settle
+        on the next trading day.
+        """
+        for position in self.option_positions.due(day + SESSION_CLOSE):
+            if position.expiry <= day + SESSION_CLOSE:
+                self._settle_expiry(position, last_time, last_close)
+            else:
+                # A review date falling on a day without bars: review on the next day
+                self.option_positions.reschedule(position, day + pd.Timedelta(days=1))
+
+    def _mark_positions(self, prices, times):
+        """
+        Cost to buy back every open call at each bar, priced at its entry IV.
+
+        Args:
+            prices (ndarray): Spot per bar
+            times (DatetimeIndex): Bar times
+
+        Returns:
+            ndarray: Total buy-back cost per bar
+        """
+        positions = list(self.option_positions)
+        if not positions:
+            return np.zeros(len(prices))
+
+        strikes = np.array([p.strike for p in positions])
+        expiries = np.array([p.expiry.value for p in positions])
+        vols = np.array([p.implied_volatility for p in positions])
+        shares = np.array([p.contracts * SHARES_PER_CONTRACT for p in positions])
+
+        # Bars x positions
+        time_to_expiry = (expiries[None, :] - times.asi8[:, None]) / 1e9 / SECONDS_PER_YEAR
+        spot = prices[:, None]
+        values = black_scholes_greeks(spot, strikes, time_to_expiry, RISK_FREE_RATE, vols)['price']
+        # At or past expiry (or unpriceable) a call is worth its intrinsic value
+        values = np.where(np.isfinite(values), values, np.maximum(spot - strikes, 0.0))
+        return values @ shares
+
+    def save_checkpoint(self, path):
+        """
+        Atomically save positions, cash, ledgers and parameters.
+
+        The file at `path` only holds the small state (positions, cash, parameters).
+        Ledger rows go to `path` + LEDGER_SEGMENTS_SUFFIX, and repeated saves to the
+        same path append only the rows added since the previous save, so a periodic
+        checkpoint costs O(new rows) rather than O(history). The state file records
+        how many bytes of the ledger file it covers, so rows appended by a save that
+        was interrupted before its state file was replaced are ignored on load.
+
+        Price data, the price cache and the snapshot store are not saved; they are
+        reattached when the checkpoint is loaded.
+
+        Args:
+            path (str): Checkpoint file
+        """
+        ledger_path = path + LEDGER_SEGMENTS_SUFFIX
+        previous = self._checkpoint if self._checkpoint and self._checkpoint[0] == path else None
+        if previous is not None and not os.path.exists(ledger_path):
+            previous = None
+        trade_start, portfolio_start = (previous[1], previous[2]) if previous else (0, 0)
+        segment = {
+            'trades': self.trades.columns_from(trade_start),
+            'portfolio_value': self.portfolio_value.columns_from(portfolio_start),
+        }
+
+        if previous is None:
+            atomic_write(ledger_path, lambda f: pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL))
+            ledger_bytes = os.path.getsize(ledger_path)
+        else:
+            with open(ledger_path, "r+b") as f:
+                # Drop rows from a save that never got as far as replacing the state file
+                f.truncate(previous[3])
+                f.seek(previous[3])
+                pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+                ledger_bytes = f.tell()
+
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'params': {
+                'ticker': self.ticker,
+                'start_date': self.start_date,
+                'end_date': self.end_date,
+                'target_probability': self.target_probability,
+                'max_contracts': self.max_contracts,
+                'strike_step': self.strike_step,
+                'days_to_expiry': self.days_to_expiry,
+                'trade_options': self.trade_options,
+                'review_days': self.review_days,
+                'take_profit': self.take_profit,
+                'roll': self.roll,
+            },
+            'initial_capital': self.initial_capital,
+            'current_capital': self.current_capital,
+            'stock_position': self.stock_position,
+            'option_positions': self.option_positions,
+            'last_date': self.last_date,
+            'trade_rows': len(self.trades),
+            'portfolio_rows': len(self.portfolio_value),
+            'ledger_bytes': ledger_bytes,
+        }
+        atomic_write(path, lambda f: pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL))
+        self._checkpoint = (path, len(self.trades), len(self.portfolio_value), ledger_bytes)
+
+    @classmethod
+    def load_checkpoint(cls, path, end_date=None, price_cache=None, snapshot_store=None, earnings_calendar=None,
+                        vol_surface=None):
+        """
+        Restore a backtester from a checkpoint written by save_checkpoint.
+
+        Checkpoints are trusted local files (pickle); do not load files from elsewhere.
+        Later saves to the same path keep appending to its ledger file.
+
+        Args:
+            path (str): Checkpoint file
+            end_date (str or Timestamp): Extend the run to this date; keeps the saved end date if None
+            price_cache (PriceCache): Cache to read prices from
+            snapshot_store (ChainSnapshotStore): Archived chains to replay
+            earnings_calendar (EarningsCalendar): Earnings lookup for selection
+            vol_surface (VolatilitySurface or SurfaceCache): Smile for simulated chains
+
+        Returns:
+            ThetaFlowBacktester: A backtester that resumes after the checkpoint's last day
+
+        Raises:
+            ValueError: If the checkpoint has an unsupported version or its ledger file
+                is missing rows.
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+
+        params = dict(state['params'])
+        if end_date is not None:
+            params['end_date'] = end_date
+        backtester = cls(price_cache=price_cache, snapshot_store=snapshot_store,
+                         earnings_calendar=earnings_calendar, vol_surface=vol_surface, **params)
+        for name in ('initial_capital', 'current_capital', 'stock_position', 'option_positions', 'last_date'):
+            setattr(backtester, name, state[name])
+
+        with open(path + LEDGER_SEGMENTS_SUFFIX, "rb") as f:
+            while f.tell() < state['ledger_bytes']:
+                segment = pickle.load(f)
+                backtester.trades.extend(**segment['trades'])
+                backtester.portfolio_value.extend(**segment['portfolio_value'])
+        if (len(backtester.trades), len(backtester.portfolio_value)) != (state['trade_rows'], state['portfolio_rows']):
+            raise ValueError(f"Checkpoint ledger {path}{LEDGER_SEGMENTS_SUFFIX} does not match its state file")
+        backtester._checkpoint = (path, state['trade_rows'], state['portfolio_rows'], state['ledger_bytes'])
+        return backtester
+
+    def _run_vectorized(self):
+        """
+        Vectorized backtest over the whole date range.
+
+        The synthetic option surface for all dates x strikes is built in one shot and
+        the portfolio value path is computed with array operations. No options are
+        traded: stock and cash are held at their current state for the whole run, so
+        the result equals a day-by-day run with trade_options=False (run_backtest
+        rejects vectorized runs that would trade).
+        """
+        if self.last_date is not None:
+            raise ValueError("Vectorized mode runs the whole range at once; use a fresh backtester")
+
+        print(f"Running vectorized backtest from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}")
+
+        stock_data = self.load_price_history()
         if stock_data.empty:
             raise ValueError("No historical data found")
-            
-        # Run simulation
-        for date in stock_data.index:
-            current_price = float(stock_data.loc[date, 'Close'])  # Convert to float
-            
-            # Track portfolio value
-            self.portfolio_value.append({
-                'date': date,
-                'stock_price': current_price,
-                'stock_value': self.stock_position * current_price,
-                'cash': self.current_capital,
-                'total_value': self.current_capital + (self.stock_position * current_price)
-            })
-            
-            # Simulate and select options
-            options_data = self.simulate_options_data(current_price, date)
-            self._process_trades(options_data, date)
-            
+
+        prices = stock_data['Close'].to_numpy(dtype=float)
+        self.options_surface = self.simulate_options_surface(prices, stock_data.index)
+
+        n_days = len(prices)
+        cash = np.full(n_days, float(self.current_capital))
+        stock_value = self.stock_position * prices
+        self.portfolio_value.extend(
+            date=stock_data.index,
+            stock_price=prices,
+            stock_value=stock_value,
+            cash=cash,
+            total_value=cash + stock_value
+        )
+        self.last_date = stock_data.index[-1]
         return self.create_results()
 
+    @metrics.timed('trade_processing')
     def _process_trades(self, options_data, date):
-        """Process potential trades for the current date"""
-        # Your trade logic here
-        pass
+        """
+        Run one day of the position lifecycle.
+
+        1. Settle or review the short calls that are due today (and only those)
+        2. Buy back stock up to max_contracts round lots
+        3. Sell calls from the day's chain against uncovered lots
+
+        When options_data is None the day's chain is simulated on first use, so
+        days with nothing to review or sell never price a chain.
+        """
+        if not self.trade_options or self.current_price is None:
+            return
+        date = pd.Timestamp(date)
+        price = self.current_price
+
+        for position in self.option_positions.due(date):
+            if date >= position.expiry:
+                self._settle_expiry(position, date, price)
+            else:
+                if options_data is None:
+                    options_data = self.simulate_options_data(price, date)
+                self._review(position, date, price, options_data)
 
+        self._buy_stock(date, price)
+
+        uncovered = self.stock_position // SHARES_PER_CONTRACT - self.option_positions.open_contracts(self.ticker)
+        if uncovered > 0:
+            if options_data is None:
+                options_data = self.simulate_options_data(price, date)
+            if not options_data.empty:
+                self._sell_calls(options_data, date, uncovered)
+
+    def _record_trade(self, date, action, strike, expiry, contracts, price, cash_flow):
+        """Apply a trade's cash flow and append it to the trade ledger."""
+        self.current_capital += cash_flow
+        metrics.increment('trades')
+        self.trades.append(date=date, action=action, strike=strike, expiry=expiry,
+                           contracts=contracts, price=price, cash_flow=cash_flow)
+
+    def _settle_expiry(self, position, date, price):
+        """Settle a call on the first trading day on or after its expiry, at that day's close."""
+        self.option_positions.close(position)
+        if price > position.strike:
+            shares = position.contracts * SHARES_PER_CONTRACT
+            self.stock_position -= shares
+            self._record_trade(date, 'assigned', position.strike, position.expiry, position.contracts,
+                               position.strike, position.strike * shares)
+        else:
+            self._record_trade(date, 'expired', position.strike, position.expiry, position.contracts, 0.0, 0.0)
+
+    def _review(self, position, date, price, options_data):
+        """Close a call early when rolling or when enough premium has been captured."""
+        value = self._call_value(position, date, price, options_data)
+        if self.roll or value <= (1 - self.take_profit) * position.premium:
+            self.option_positions.close(position)
+            cost = value * position.contracts * SHARES_PER_CONTRACT + FEE_PER_CONTRACT * position.contracts
+            self._record_trade(date, 'roll' if self.roll else 'buy_to_close', position.strike, position.expiry,
+                               position.contracts, value, -cost)
+        else:
+            self.option_positions.reschedule(position, position.expiry)
+
+    def _call_value(self, position, date, price, options_data):
+        """Quote for a position's contract from the day's chain, else a Black-Scholes price at its entry IV."""
+        if not options_data.empty:
+            match = (
+                np.isclose(options_data['strike'].to_numpy(dtype=float), position.strike) &
+                (_expiry_datetimes(options_data['expiry']).normalize() == position.expiry.normalize())
+            )
+            if match.any():
+                return float(options_data['lastPrice'].to_numpy(dtype=float)[match][0])
+
+        time_to_expiry = (position.expiry - date).total_seconds() / SECONDS_PER_YEAR
+        value = black_scholes_greeks(price, position.strike, time_to_expiry, RISK_FREE_RATE,
+                                     position.implied_volatility)['price'][()]
+        # Fall back to intrinsic value when the contract cannot be priced
+        return float(value) if np.isfinite(value) else max(price - position.strike, 0.0)
+
+    def _buy_stock(self, date, price):
+        """Top the stock position up to max_contracts round lots, as far as cash allows."""
+        target = self.max_contracts * SHARES_PER_CONTRACT
+        lots = min((target - self.stock_position) // SHARES_PER_CONTRACT,
+                   int(self.current_capital // (price * SHARES_PER_CONTRACT)))
+        if lots <= 0:
+            return
+        shares = lots * SHARES_PER_CONTRACT
+        self.stock_position += shares
+        self._record_trade(date, 'buy_stock', np.nan, None, lots, price, -price * shares)
+
+    def _sell_calls(self, options_data, date, uncovered):
+        """Sell one call per selected candidate, up to the number of uncovered lots."""
+        # Skip the full selection when no OTM contract can even pay its fee
+        worth_selling = (
+            (options_data['strike'].to_numpy(dtype=float) > self.current_price) &
+            (options_data['lastPrice'].to_numpy(dtype=float) * SHARES_PER_CONTRACT > FEE_PER_CONTRACT)
+        )
+        if not worth_selling.any():
+            return
+
+        candidates = select_low_risk_calls(
+            options_data, max_contracts=uncovered, target_probability=self.target_probability,
+            earnings_calendar=self.earnings_calendar, as_of=date
+        )
+        if candidates.empty:
+            return
+        # Premium has to at least pay for the contract fee
+        candidates = candidates[candidates['net_premium'] > 0]
+        review_offset = pd.Timedelta(days=self.review_days) if self.review_days is not None else None
+
+        for strike, expiry, premium, iv in zip(candidates['strike'], candidates['expiry_datetime'],
+                                               candidates['lastPrice'], candidates['impliedVolatility']):
+            expiry = pd.Timestamp(expiry)
+            self.option_positions.open(
+                self.ticker, strike, expiry, 1, premium, date, implied_volatility=iv,
+                review_date=expiry.normalize() - review_offset if review_offset is not None else None
+            )
+            self._record_trade(date, 'sell_call', strike, expiry, 1, premium,
+                               premium * SHARES_PER_CONTRACT - FEE_PER_CONTRACT)
+
+    @metrics.timed('results_export')
     def create_results(self):
-        """Create results DataFrames"""
-        portfolio_df = pd.DataFrame(self.portfolio_value)
-        trades_df = pd.DataFrame(self.trades)
+        """
+        Create results DataFrames
+
+        The frames are zero-copy views of the ledgers; call .copy() before modifying them.
+        """
+        portfolio_df = self.portfolio_value.to_frame()
+        trades_df = self.trades.to_frame()
         return portfolio_df, trades_df
 
     def print_results(self):
-        """Return portfolio and trade DataFrames"""
-        if not self.portfolio_value:  # If backtest hasn't been run
-            self.run_backtest()
-        return self.create_results()
\ No newline at end of file
+        """
+        Print a summary of the backtest and return the portfolio and trade DataFrames.
+
+        Raises:
+            ValueError: If the backtest has not been run yet.
+        """
+        if not self.portfolio_value:
+            raise ValueError("No backtest results yet; call run_backtest() first")
+
+        portfolio_df, trades_df = self.create_results()
+        final_value = portfolio_df['total_value'].iloc[-1]
+        print(f"Backtest {portfolio_df['date'].iloc[0]:%Y-%m-%d} to {portfolio_df['date'].iloc[-1]:%Y-%m-%d}: "
+              f"{len(portfolio_df)} days, {len(trades_df)} trades, "
+              f"final value ${final_value:,.2f} ({final_value / self.initial_capital - 1:+.2%})")
+        return portfolio_df, trades_df
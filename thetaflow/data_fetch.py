@@ -1,41 +1,151 @@
 """
 Module: data_fetch
-Purpose: To fetch live TSLA options data using open-source data from yfinance.
+Purpose: To fetch live TSLA options data through the configured data provider
+(yfinance by default, see providers.py).
 """
 
-import yfinance as yf
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
+from . import metrics
+from .providers import get_default_provider
+
+DEFAULT_MAX_WORKERS = 8
 
 
-def get_options_data(ticker_symbol):
+@metrics.timed('fetch')
+def get_options_data(ticker_symbol, provider=None):
     """
-    Fetch the options chain for a given ticker (e.g., TSLA) from yfinance.
+    Fetch the options chain for a given ticker (e.g., TSLA).
     Automatically selects the nearest expiration date.
 
     Args:
         ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+        provider (DataProvider): Data source; defaults to get_default_provider().
 
     Returns:
-        DataFrame: The call options chain with added columns for current price and expiry.
+        DataFrame: The call options chain with added columns for current price, expiry and ticker.
     """
-    # Create a Ticker object
-    ticker = yf.Ticker(ticker_symbol)
+    provider = provider or get_default_provider()
 
     # Get the current stock price from the latest trading day
-    current_price = ticker.history(period="1d")['Close'].iloc[-1]
+    current_price = provider.current_price(ticker_symbol)
 
     # Get the list of available option expiration dates and choose the nearest one
-    expiration_dates = ticker.options
+    expiration_dates = provider.option_expiries(ticker_symbol)
     if not expiration_dates:
         raise ValueError(f"No options data available for {ticker_symbol}")
     nearest_expiry = expiration_dates[0]
 
     # Fetch option chain for calls from the nearest expiration date
-    options_chain = ticker.option_chain(nearest_expiry)
-    calls = options_chain.calls
+    calls = provider.option_chain(ticker_symbol, nearest_expiry)
 
     # Add extra columns for reference
     calls['currentPrice'] = current_price
     calls['expiry'] = nearest_expiry
+    calls['ticker'] = ticker_symbol
+    metrics.increment('rows_fetched', len(calls))
 
     return calls
+
+
+def _select_expiries(expiration_dates, expiry_window=None, max_expiries=None, as_of=None):
+    """
+    Filter a ticker's expiration dates to a days-to-expiry window.
+
+    Args:
+        expiration_dates (list): Expiry strings as returned by DataProvider.option_expiries
+        expiry_window (tuple): Inclusive (min_days, max_days) range; None keeps every expiry
+        max_expiries (int): Keep at most this many of the nearest expiries
+        as_of (Timestamp): Reference date for days-to-expiry (defaults to today)
+    """
+    selected = list(expiration_dates)
+    if expiry_window is not None:
+        min_days, max_days = expiry_window
+        today = (as_of or pd.Timestamp.now()).normalize()
+        days = [(pd.Timestamp(e) - today).days for e in selected]
+        selected = [
+            e for e, d in zip(selected, days)
+            if (min_days is None or d >= min_days) and (max_days is None or d <= max_days)
+        ]
+    if max_expiries is not None:
+        selected = selected[:max_expiries]
+    return selected
+
+
+@metrics.timed('fetch')
+def get_options_chains(ticker_symbols, expiry_window=None, max_expiries=None, max_workers=DEFAULT_MAX_WORKERS,
+                       provider=None):
+    """
+    Fetch call chains for many tickers and expiries concurrently.
+
+    Each ticker's price history and expiry list are requested in parallel, and every
+    (ticker, expiry) chain is submitted to the same bounded thread pool as soon as its
+    expiry list arrives, so total latency is governed by the slowest requests rather
+    than the sum of them. Tickers that fail to fetch are logged and skipped.
+
+    Args:
+        ticker_symbols (list): Stock tickers, e.g., ['TSLA', 'AAPL'].
+        expiry_window (tuple): Inclusive (min_days, max_days) days-to-expiry range;
+            None fetches every listed expiry.
+        max_expiries (int): Fetch at most this many of the nearest expiries per ticker.
+        max_workers (int): Maximum number of concurrent requests.
+        provider (DataProvider): Data source; defaults to get_default_provider().
+
+    Returns:
+        DataFrame: All call chains concatenated, with 'currentPrice', a datetime64
+            'expiry' column and a categorical 'ticker' column, sorted by ticker,
+            expiry and strike. Use groupby('ticker') to run per-underlying selection.
+
+    Raises:
+        ValueError: If no chain could be fetched for any ticker.
+    """
+    symbols = list(dict.fromkeys(s.upper() for s in ticker_symbols))
+    provider = provider or get_default_provider()
+    frames = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        price_futures = {symbol: pool.submit(provider.current_price, symbol) for symbol in symbols}
+        expiry_futures = {pool.submit(provider.option_expiries, symbol): symbol for symbol in symbols}
+
+        chain_futures = {}
+        for future in as_completed(expiry_futures):
+            symbol = expiry_futures[future]
+            try:
+                expiries = _select_expiries(future.result(), expiry_window, max_expiries)
+            except Exception as e:
+                logging.warning(f"Could not list expiries for {symbol}: {e}")
+                continue
+            for expiry in expiries:
+                chain_futures[pool.submit(provider.option_chain, symbol, expiry)] = (symbol, expiry)
+
+        prices = {}
+        for symbol, future in price_futures.items():
+            try:
+                prices[symbol] = float(future.result())
+            except Exception as e:
+                logging.warning(f"Could not fetch price history for {symbol}: {e}")
+
+        for future in as_completed(chain_futures):
+            symbol, expiry = chain_futures[future]
+            if symbol not in prices:
+                continue
+            try:
+                calls = future.result()
+            except Exception as e:
+                logging.warning(f"Could not fetch {symbol} chain for {expiry}: {e}")
+                continue
+            if calls is None or calls.empty:
+                continue
+            calls = calls.assign(currentPrice=prices[symbol], expiry=expiry, ticker=symbol)
+            frames.append(calls)
+
+    if not frames:
+        raise ValueError(f"No options data available for {', '.join(symbols)}")
+
+    chains = pd.concat(frames, ignore_index=True)
+    metrics.increment('rows_fetched', len(chains))
+    chains['expiry'] = pd.to_datetime(chains['expiry'])
+    chains['ticker'] = pd.Categorical(chains['ticker'], categories=symbols)
+    return chains.sort_values(['ticker', 'expiry', 'strike'], ignore_index=True)
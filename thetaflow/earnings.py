@@ -0,0 +1,201 @@
+"""
+Module: earnings
+Purpose: Provides a cached earnings-calendar lookup so strategy selection does not
+hit the network on every call.
+
+Earnings dates only move a few times a year, so lookups are served from an
+in-memory cache backed by a small JSON file on disk. Entries older than the TTL
+are still returned immediately while a background thread refreshes them
+(stale-while-revalidate); only the very first lookup for a ticker blocks.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+from . import metrics
+from .providers import get_default_provider
+from .utils import atomic_write
+
+DEFAULT_CACHE_FILE = "data/cache/earnings_calendar.json"
+DEFAULT_TTL_SECONDS = 24 * 3600  # Refresh once a day
+
+# OCC option symbols look like TSLA250620C00100000: root, YYMMDD, C/P, strike
+_CONTRACT_SYMBOL_RE = re.compile(r"^([A-Z][A-Z.]*?)\d{6}[CP]\d+$")
+
+
+def fetch_next_earnings(ticker_symbol, provider=None):
+    """
+    Fetch the next earnings date for a ticker from the data provider.
+
+    Args:
+        ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+        provider (DataProvider): Data source; defaults to get_default_provider().
+
+    Returns:
+        Timestamp or None: The next earnings date, or None if unavailable.
+    """
+    return (provider or get_default_provider()).next_earnings(ticker_symbol)
+
+
+def ticker_from_options(options_df):
+    """
+    Work out the underlying ticker of an options chain.
+
+    Uses the 'ticker' column when present, otherwise parses the root of the
+    first OCC contract symbol.
+
+    Args:
+        options_df (DataFrame): Options chain data
+
+    Returns:
+        str or None: The ticker symbol, or None if it cannot be determined.
+    """
+    if 'ticker' in options_df.columns and len(options_df):
+        return str(options_df['ticker'].iloc[0])
+    if 'contractSymbol' in options_df.columns and len(options_df):
+        match = _CONTRACT_SYMBOL_RE.match(str(options_df['contractSymbol'].iloc[0]))
+        if match:
+            return match.group(1)
+    return None
+
+
+class EarningsCalendar:
+    """
+    TTL cache of next-earnings dates keyed by ticker.
+
+    Args:
+        ttl_seconds (float): Age after which an entry is refreshed in the background.
+        cache_file (str or None): JSON file used to persist entries between runs.
+            Pass None to keep the cache in memory only.
+        fetcher (callable): Function mapping a ticker to a Timestamp or None.
+            Defaults to fetch_next_earnings.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, cache_file=DEFAULT_CACHE_FILE, fetcher=None):
+        self.ttl_seconds = ttl_seconds
+        self.cache_file = cache_file
+        self.fetcher = fetcher or fetch_next_earnings
+        self._entries = {}  # ticker -> (fetched_at epoch seconds, Timestamp or None)
+        self._refreshing = {}  # ticker -> Thread
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def next_earnings(self, ticker_symbol):
+        """
+        Return the cached next earnings date for a ticker.
+
+        Args:
+            ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+
+        Returns:
+            Timestamp or None: The next earnings date, or None if unknown.
+        """
+        ticker_symbol = ticker_symbol.upper()
+        self._load_from_disk()
+
+        with self._lock:
+            entry = self._entries.get(ticker_symbol)
+
+        if entry is None:
+            # Nothing cached yet: this is the only lookup that blocks
+            metrics.increment('earnings_cache_misses')
+            return self._refresh(ticker_symbol)
+
+        metrics.increment('earnings_cache_hits')
+
+        fetched_at, earnings = entry
+        if time.time() - fetched_at > self.ttl_seconds:
+            self.refresh_async(ticker_symbol)
+        return earnings
+
+    def refresh_async(self, ticker_symbol):
+        """
+        Refresh a ticker's entry on a background thread.
+
+        Returns:
+            Thread: The refresh thread (an already running one is reused).
+        """
+        ticker_symbol = ticker_symbol.upper()
+        with self._lock:
+            thread = self._refreshing.get(ticker_symbol)
+            if thread is not None and thread.is_alive():
+                return thread
+            thread = threading.Thread(
+                target=self._refresh,
+                args=(ticker_symbol,),
+                name=f"earnings-refresh-{ticker_symbol}",
+                daemon=True
+            )
+            self._refreshing[ticker_symbol] = thread
+        thread.start()
+        return thread
+
+    def _refresh(self, ticker_symbol):
+        """Fetch a ticker's earnings date and store it in memory and on disk."""
+        try:
+            earnings = self.fetcher(ticker_symbol)
+        except Exception as e:
+            logging.warning(f"Earnings calendar fetch failed for {ticker_symbol}: {e}")
+            with self._lock:
+                entry = self._entries.get(ticker_symbol)
+            # Keep serving the previous value; cache the miss so we don't retry on every call
+            earnings = entry[1] if entry is not None else None
+
+        with self._lock:
+            self._entries[ticker_symbol] = (time.time(), earnings)
+        self._save_to_disk()
+        return earnings
+
+    def _load_from_disk(self):
+        """Populate the in-memory cache from the JSON file once."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.cache_file or not os.path.exists(self.cache_file):
+                return
+            try:
+                with open(self.cache_file) as f:
+                    raw = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable earnings cache {self.cache_file}: {e}")
+                return
+            for ticker_symbol, (fetched_at, earnings) in raw.items():
+                self._entries.setdefault(
+                    ticker_symbol,
+                    (fetched_at, pd.Timestamp(earnings) if earnings else None)
+                )
+
+    def _save_to_disk(self):
+        """Atomically write the cache to the JSON file."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            raw = {
+                ticker_symbol: [fetched_at, earnings.isoformat() if earnings is not None else None]
+                for ticker_symbol, (fetched_at, earnings) in self._entries.items()
+            }
+        try:
+            atomic_write(self.cache_file, lambda f: json.dump(raw, f), mode="w")
+        except OSError as e:
+            logging.warning(f"Could not write earnings cache {self.cache_file}: {e}")
+
+
+_default_calendar = None
+_default_calendar_lock = threading.Lock()
+
+
+def get_default_calendar():
+    """Return the process-wide EarningsCalendar, creating it on first use."""
+    global _default_calendar
+    with _default_calendar_lock:
+        if _default_calendar is None:
+            _default_calendar = EarningsCalendar()
+        return _default_calendar
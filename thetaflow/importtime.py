@@ -0,0 +1,84 @@
+"""
+Module: importtime
+Purpose: Report cold-start import cost of ThetaFlow entry points.
+
+Each target is imported in a fresh interpreter with `python -X importtime`, and the
+cumulative time is broken down by top-level package (numpy, pandas, scipy, yfinance,
+thetaflow, ...) so regressions in startup cost are easy to spot.
+
+Usage:
+    python -m thetaflow.importtime                       # default targets
+    python -m thetaflow.importtime thetaflow.strategy main
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+DEFAULT_TARGETS = ('thetaflow', 'thetaflow.utils', 'thetaflow.strategy', 'thetaflow.backtest', 'main')
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)")
+
+
+def measure_import(target, python=sys.executable, cwd=None):
+    """
+    Import a module in a fresh interpreter and collect -X importtime output.
+
+    Args:
+        target (str): Module to import, e.g. 'thetaflow.strategy'
+        python (str): Interpreter to run
+        cwd (str): Working directory (defaults to the repository root)
+
+    Returns:
+        dict: 'target', 'total_ms' (total import time) and 'packages' mapping each
+            top-level package to the summed self time of all its modules, in milliseconds.
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    cwd = cwd or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{completed.stderr[-2000:]}")
+
+    packages = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        # Self time excludes nested imports, so each module is counted exactly once
+        package = match.group(3).split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(match.group(1)) / 1000
+
+    return {
+        'target': target,
+        'total_ms': sum(packages.values()),
+        'packages': dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+def import_time_report(targets=DEFAULT_TARGETS, top=6):
+    """
+    Build a printable cold-start report for several import targets.
+
+    Args:
+        targets (iterable): Modules to measure
+        top (int): Number of most expensive packages listed per target
+
+    Returns:
+        str: The formatted report
+    """
+    lines = ["=== ThetaFlow import-time report ==="]
+    for target in targets:
+        result = measure_import(target)
+        breakdown = ", ".join(f"{name} {ms:.0f} ms" for name, ms in list(result['packages'].items())[:top])
+        lines.append(f"{target:<24} {result['total_ms']:>8.0f} ms  ({breakdown})")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(import_time_report(sys.argv[1:] or DEFAULT_TARGETS))
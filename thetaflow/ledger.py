@@ -0,0 +1,160 @@
+"""
+Module: ledger
+Purpose: Compact, column-oriented record keeping for backtests.
+
+A ColumnarLedger stores each column in its own preallocated NumPy array and grows
+by doubling, so appending a row writes a handful of scalars instead of allocating
+a Python dict per row. Daily portfolio snapshots take about 40 bytes per row this
+way, against several hundred for a list of dicts. Exports to pandas reuse the
+column buffers instead of copying them.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 1024
+
+PORTFOLIO_COLUMNS = {
+    'date': 'datetime64[ns]',
+    'stock_price': 'f8',
+    'stock_value': 'f8',
+    'cash': 'f8',
+    'total_value': 'f8',
+}
+
+TRADE_COLUMNS = {
+    'date': 'datetime64[ns]',
+    'action': 'O',
+    'strike': 'f8',
+    'expiry': 'datetime64[ns]',
+    'contracts': 'i8',
+    'price': 'f8',
+    'cash_flow': 'f8',
+}
+
+
+class ColumnarLedger:
+    """
+    Append-only table backed by growable per-column NumPy arrays.
+
+    Args:
+        columns (dict): Column name -> NumPy dtype, in output order.
+        initial_capacity (int): Rows preallocated before the first resize.
+    """
+
+    def __init__(self, columns, initial_capacity=DEFAULT_CAPACITY):
+        self.columns = dict(columns)
+        self._capacity = max(int(initial_capacity), 1)
+        self._size = 0
+        self._data = {name: np.empty(self._capacity, dtype=dtype) for name, dtype in self.columns.items()}
+        self._datetime_columns = {
+            name for name, dtype in self.columns.items() if np.dtype(dtype).kind == 'M'
+        }
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, name):
+        """Return a read-only view of a column's filled rows."""
+        view = self._data[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column buffers (including spare capacity)."""
+        return sum(column.nbytes for column in self._data.values())
+
+    def _reserve(self, n_rows):
+        """Grow every column so that n_rows more rows fit."""
+        required = self._size + n_rows
+        if required <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < required:
+            capacity *= 2
+        for name, column in self._data.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._data[name] = grown
+        self._capacity = capacity
+
+    def append(self, row=None, **values):
+        """
+        Append one row, given as a dict and/or keyword arguments.
+
+        Raises:
+            KeyError: If a column is missing from the row.
+        """
+        if row is not None:
+            values = {**row, **values}
+        self._reserve(1)
+        i = self._size
+        for name, column in self._data.items():
+            value = values[name]
+            if name in self._datetime_columns and value is not None:
+                # Go through Timestamp to keep nanosecond precision
+                value = pd.Timestamp(value).to_datetime64()
+            column[i] = value
+        self._size += 1
+
+    def extend(self, **arrays):
+        """
+        Append many rows at once from equal-length column arrays.
+
+        Raises:
+            KeyError: If a column is missing.
+            ValueError: If the arrays have different lengths.
+        """
+        lengths = {len(arrays[name]) for name in self.columns}
+        if len(lengths) > 1:
+            raise ValueError(f"Column arrays have different lengths: {sorted(lengths)}")
+        n_rows = lengths.pop() if lengths else 0
+        self._reserve(n_rows)
+        for name, column in self._data.items():
+            values = arrays[name]
+            if name in self._datetime_columns:
+                values = pd.DatetimeIndex(values).to_numpy(dtype=column.dtype)
+            column[self._size:self._size + n_rows] = values
+        self._size += n_rows
+
+    def __getstate__(self):
+        # Pickle only the filled rows (at least one slot), not the spare capacity
+        capacity = max(self._size, 1)
+        state = self.__dict__.copy()
+        state['_data'] = {name: column[:capacity].copy() for name, column in self._data.items()}
+        state['_capacity'] = capacity
+        return state
+
+    def columns_from(self, start):
+        """
+        Return copies of the column arrays from row `start` on.
+
+        The result can be passed to extend() as keyword arguments, which is how
+        checkpoints persist only the rows added since the previous save.
+
+        Returns:
+            dict: Column name -> array of the rows from start to the end
+        """
+        return {name: column[start:self._size].copy() for name, column in self._data.items()}
+
+    def clear(self):
+        """Drop all rows, keeping the allocated capacity."""
+        self._size = 0
+
+    def to_frame(self, copy=False):
+        """
+        Export the ledger as a DataFrame.
+
+        Args:
+            copy (bool): Copy the data. By default the frame's columns are views onto
+                the ledger's buffers, so modify the frame only if copy=True.
+
+        Returns:
+            DataFrame: One column per ledger column, in declaration order.
+        """
+        return pd.DataFrame(
+            {name: column[:self._size] for name, column in self._data.items()},
+            columns=list(self.columns),
+            copy=copy
+        )
@@ -0,0 +1,237 @@
+"""
+Module: metrics
+Purpose: Lightweight stage timers and counters for finding where a run spends its time.
+
+Instrumented code calls timer(), timed() and increment() unconditionally; while
+metrics are disabled (the default) each call is a single flag check, so the
+instrumentation can stay in hot paths. Enable it with enable(), or by setting the
+THETAFLOW_METRICS_FILE environment variable, which also writes the metrics to that
+file when the interpreter exits:
+
+    THETAFLOW_METRICS_FILE=data/metrics.prom python run_backtest.py
+
+Metrics export as JSON or Prometheus text exposition format (chosen by file
+extension: .prom or .txt for Prometheus, anything else for JSON).
+
+This module only depends on the standard library so that it stays cheap to import.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+from .utils import atomic_write
+
+METRICS_FILE_ENV = "THETAFLOW_METRICS_FILE"
+PROMETHEUS_PREFIX = "thetaflow"
+
+
+class _NullTimer:
+    """Context manager returned by timer() while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    """Context manager that records one timed stage into a registry."""
+
+    __slots__ = ('registry', 'stage', 'started')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.record(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of stage timings and counters.
+
+    Timings keep a call count, total and maximum duration per stage; counters are
+    plain running totals.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._timers = {}  # stage -> [count, total_seconds, max_seconds]
+        self._counters = {}  # name -> value
+
+    def record(self, stage, seconds):
+        """Add one timed call of a stage."""
+        with self._lock:
+            entry = self._timers.get(stage)
+            if entry is None:
+                self._timers[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def timer(self, stage):
+        """Return a context manager timing a stage (a shared no-op when disabled)."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def increment(self, name, value=1):
+        """Add to a counter when enabled."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self):
+        """Drop all recorded timings and counters."""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """
+        Return a copy of the current metrics.
+
+        Returns:
+            dict: 'timers' (stage -> count, total_seconds, max_seconds, mean_seconds)
+                and 'counters' (name -> value)
+        """
+        with self._lock:
+            timers = {
+                stage: {
+                    'count': count,
+                    'total_seconds': total,
+                    'max_seconds': peak,
+                    'mean_seconds': total / count,
+                }
+                for stage, (count, total, peak) in sorted(self._timers.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {'timers': timers, 'counters': counters}
+
+    def to_prometheus(self):
+        """Render the metrics in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        name = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per pipeline stage.", f"# TYPE {name} summary"]
+        for stage, timer in snapshot['timers'].items():
+            lines.append(f'{name}_sum{{stage="{stage}"}} {timer["total_seconds"]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {timer["count"]}')
+        lines += [f"# HELP {name}_max Slowest single call per pipeline stage.", f"# TYPE {name}_max gauge"]
+        for stage, timer in snapshot['timers'].items():
+            lines.append(f'{name}_max{{stage="{stage}"}} {timer["max_seconds"]:.9f}')
+        for counter, value in snapshot['counters'].items():
+            metric = f"{PROMETHEUS_PREFIX}_{counter}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """
+        Atomically write the metrics to a file.
+
+        Args:
+            path (str): Output file; '.prom' or '.txt' writes Prometheus text, anything else JSON
+        """
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2) + "\n"
+        atomic_write(path, lambda f: f.write(content), mode="w")
+
+
+# Process-wide registry used by the module-level helpers
+registry = MetricsRegistry()
+
+
+def enable():
+    """Start recording metrics."""
+    registry.enabled = True
+
+
+def disable():
+    """Stop recording metrics (recorded values are kept)."""
+    registry.enabled = False
+
+
+def is_enabled():
+    return registry.enabled
+
+
+def timer(stage):
+    """
+    Time a block of code as a named stage.
+
+    Example:
+        with metrics.timer('fetch'):
+            chain = get_options_data('TSLA')
+    """
+    if not registry.enabled:
+        return _NULL_TIMER
+    return _StageTimer(registry, stage)
+
+
+def timed(stage):
+    """
+    Decorator timing every call of a function as a named stage.
+
+    The enabled flag is checked per call, so metrics can be switched on after import.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.record(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def increment(name, value=1):
+    """Add to a named counter (e.g. rows processed, cache hits) when enabled."""
+    if registry.enabled:
+        registry.increment(name, value)
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def reset():
+    registry.reset()
+
+
+def export(path):
+    registry.export(path)
+
+
+def _export_on_exit(path):
+    try:
+        registry.export(path)
+    except OSError:
+        pass
+
+
+if os.environ.get(METRICS_FILE_ENV):
+    enable()
+    atexit.register(_export_on_exit, os.environ[METRICS_FILE_ENV])
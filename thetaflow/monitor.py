@@ -0,0 +1,219 @@
+"""
+Module: monitor
+Purpose: Long-running asyncio monitor that polls a watchlist and reports covered call
+candidates as they appear and disappear.
+
+Each poll fetches the watched chains off the event loop and diffs every contract
+against the previous poll by contractSymbol. Only contracts whose quote, implied
+volatility, open interest, spot or expiry changed are re-scored with
+select_low_risk_calls; the rest keep their previous verdict. Because time to expiry
+keeps shrinking, a contract is also re-scored once its score is older than
+rescore_after seconds. The top candidates per ticker are compared with the previous
+poll and emitted as 'new' / 'dropped' events.
+
+Example:
+    monitor = WatchlistMonitor(['TSLA', 'AAPL'], interval_seconds=60, on_event=print)
+    asyncio.run(monitor.run())
+"""
+
+import asyncio
+import logging
+
+import pandas as pd
+from . import metrics
+from .data_fetch import get_options_chains
+from .strategy import select_low_risk_calls
+
+DEFAULT_INTERVAL_SECONDS = 60
+DEFAULT_RESCORE_AFTER_SECONDS = 15 * 60
+DEFAULT_MAX_QUEUED_EVENTS = 1000  # Oldest events are dropped once the queue holds this many
+# Inputs that change a contract's score when they move
+WATCHED_COLUMNS = ('lastPrice', 'bid', 'ask', 'impliedVolatility', 'openInterest', 'currentPrice', 'expiry')
+
+
+def changed_contracts(current, previous, scored_at, now, rescore_after):
+    """
+    Flag the contracts of a chain that need re-scoring.
+
+    Args:
+        current (DataFrame): This poll's chain indexed by contractSymbol
+        previous (DataFrame or None): The previous poll's chain indexed by contractSymbol
+        scored_at (Series): Last score time per contractSymbol
+        now (Timestamp): Current time
+        rescore_after (float): Maximum age of a score in seconds
+
+    Returns:
+        ndarray: Boolean mask over current's rows
+    """
+    if previous is None:
+        return pd.Series(True, index=current.index).to_numpy()
+
+    aligned = previous.reindex(current.index)
+    same = pd.Series(True, index=current.index)
+    for column in WATCHED_COLUMNS:
+        if column not in current:
+            continue
+        new = current[column]
+        old = aligned[column] if column in aligned else pd.Series(float('nan'), index=current.index)
+        same &= (new == old) | (new.isna() & old.isna())
+
+    # Contracts never scored before have NaT and count as stale
+    last_scored = scored_at.reindex(current.index)
+    stale = ~(last_scored > now - pd.Timedelta(seconds=rescore_after))
+    return (~same | stale).to_numpy()
+
+
+class WatchlistMonitor:
+    """
+    Poll a watchlist and emit candidate events with incremental re-scoring.
+
+    Args:
+        tickers (list): Underlying tickers to watch
+        interval_seconds (float): Delay between polls
+        max_contracts (int): Candidates kept per ticker
+        target_probability (float): Desired probability of profit
+        expiry_window (tuple): Inclusive (min_days, max_days) days-to-expiry range to fetch
+        max_expiries (int): Fetch at most this many of the nearest expiries per ticker
+        rescore_after (float): Re-score unchanged contracts after this many seconds
+        on_event (callable): Called with every event dict; events are also put on self.events
+        max_queued_events (int): Capacity of self.events; when nobody drains it the oldest
+            events are dropped, so a long-running monitor's memory stays bounded
+        provider (DataProvider): Data source; defaults to get_default_provider()
+        earnings_calendar (EarningsCalendar): Passed through to select_low_risk_calls
+    """
+
+    def __init__(self, tickers, interval_seconds=DEFAULT_INTERVAL_SECONDS, max_contracts=2,
+                 target_probability=0.90, expiry_window=None, max_expiries=None,
+                 rescore_after=DEFAULT_RESCORE_AFTER_SECONDS, on_event=None, provider=None,
+                 earnings_calendar=None, max_queued_events=DEFAULT_MAX_QUEUED_EVENTS):
+        self.tickers = [t.upper() for t in tickers]
+        self.interval_seconds = interval_seconds
+        self.max_contracts = max_contracts
+        self.target_probability = target_probability
+        self.expiry_window = expiry_window
+        self.max_expiries = max_expiries
+        self.rescore_after = rescore_after
+        self.on_event = on_event
+        self.provider = provider
+        self.earnings_calendar = earnings_calendar
+        self.events = asyncio.Queue(maxsize=max_queued_events)
+        self.candidates = {}  # ticker -> DataFrame of current top candidates
+        self.last_rescored = {}  # ticker -> contracts re-scored in the latest poll
+        self._chains = {}  # ticker -> previous chain (watched columns) by contractSymbol
+        self._scored_at = {}  # ticker -> Series of last score time by contractSymbol
+        self._eligible = {}  # ticker -> contracts passing selection, by contractSymbol
+
+    def _fetch(self):
+        return get_options_chains(self.tickers, expiry_window=self.expiry_window,
+                                  max_expiries=self.max_expiries, provider=self.provider)
+
+    def update(self, ticker_symbol, chain, now=None):
+        """
+        Re-score one ticker's chain incrementally and return candidate events.
+
+        Args:
+            ticker_symbol (str): Underlying ticker
+            chain (DataFrame): Latest chain for the ticker, unique by contractSymbol
+            now (Timestamp): Poll time (defaults to now)
+
+        Returns:
+            list: Event dicts with 'type' ('new' or 'dropped'), 'ticker', 'contractSymbol',
+                'time' and, for new candidates, the 'candidate' row as a dict
+        """
+        now = now or pd.Timestamp.now()
+        chain = chain.reset_index(drop=True)
+        current = chain.set_index('contractSymbol')
+        watched = current[[c for c in WATCHED_COLUMNS if c in current]]
+
+        changed = changed_contracts(
+            watched, self._chains.get(ticker_symbol),
+            self._scored_at.get(ticker_symbol, pd.Series(dtype='datetime64[ns]')),
+            now, self.rescore_after
+        )
+        self.last_rescored[ticker_symbol] = int(changed.sum())
+        metrics.increment('contracts_rescored', self.last_rescored[ticker_symbol])
+
+        # Keep previous verdicts for unchanged contracts still listed, re-score the rest
+        eligible = self._eligible.get(ticker_symbol)
+        if eligible is not None:
+            eligible = eligible[eligible.index.isin(current.index[~changed])]
+        if changed.any():
+            rescored = select_low_risk_calls(
+                chain[changed], max_contracts=int(changed.sum()),
+                target_probability=self.target_probability, earnings_calendar=self.earnings_calendar
+            )
+            if not rescored.empty:
+                rescored = rescored.set_index('contractSymbol')
+                eligible = rescored if eligible is None or eligible.empty else pd.concat([eligible, rescored])
+
+        scored_at = self._scored_at.get(ticker_symbol, pd.Series(dtype='datetime64[ns]')).reindex(current.index)
+        scored_at[changed] = now
+        self._scored_at[ticker_symbol] = scored_at
+        self._chains[ticker_symbol] = watched
+        if eligible is None:
+            eligible = pd.DataFrame()
+        self._eligible[ticker_symbol] = eligible
+
+        top = eligible.sort_values('openInterest', ascending=False, kind='stable').head(self.max_contracts) \
+            if not eligible.empty else eligible
+        previous_top = self.candidates.get(ticker_symbol, pd.DataFrame())
+        self.candidates[ticker_symbol] = top
+
+        events = [
+            {'type': 'new', 'ticker': ticker_symbol, 'contractSymbol': symbol, 'time': now,
+             'candidate': top.loc[symbol].to_dict()}
+            for symbol in top.index if symbol not in previous_top.index
+        ]
+        events += [
+            {'type': 'dropped', 'ticker': ticker_symbol, 'contractSymbol': symbol, 'time': now}
+            for symbol in previous_top.index if symbol not in top.index
+        ]
+        return events
+
+    async def poll_once(self):
+        """
+        Fetch the watchlist once, re-score what changed and publish events.
+
+        Returns:
+            list: The events published by this poll
+        """
+        try:
+            chains = await asyncio.to_thread(self._fetch)
+        except Exception as e:
+            logging.warning(f"Watchlist fetch failed: {e}")
+            return []
+
+        now = pd.Timestamp.now()
+        events = []
+        for ticker_symbol, chain in chains.groupby('ticker', observed=True, sort=False):
+            events += self.update(str(ticker_symbol), chain, now=now)
+
+        for event in events:
+            self._publish(event)
+            if self.on_event is not None:
+                self.on_event(event)
+        return events
+
+    def _publish(self, event):
+        """Put an event on self.events, dropping the oldest one when the queue is full."""
+        if self.events.full():
+            self.events.get_nowait()
+            metrics.increment('monitor_events_dropped')
+        self.events.put_nowait(event)
+
+    async def run(self, iterations=None):
+        """
+        Poll every interval_seconds until cancelled or `iterations` polls have run.
+
+        Args:
+            iterations (int): Number of polls; None runs forever
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            started = asyncio.get_running_loop().time()
+            await self.poll_once()
+            count += 1
+            if iterations is not None and count >= iterations:
+                break
+            elapsed = asyncio.get_running_loop().time() - started
+            await asyncio.sleep(max(0.0, self.interval_seconds - elapsed))
@@ -0,0 +1,222 @@
+"""
+Module: monte_carlo
+Purpose: Monte Carlo P&L distributions for covered-call positions.
+
+Terminal prices are simulated under Geometric Brownian Motion, optionally with
+Merton log-normal jumps. Paths are generated in fixed-size chunks and reduced
+on the fly (running sums, assignment counts and a fixed-range histogram of P&L),
+so memory stays bounded no matter how many paths are requested. Every chunk
+draws from its own stream spawned from one SeedSequence, which makes results
+reproducible for a given seed and chunk size regardless of how many worker
+threads are used.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from .backtest import SHARES_PER_CONTRACT
+from .strategy import FEE_PER_CONTRACT
+
+DEFAULT_N_PATHS = 1_000_000
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_PERCENTILES = (1, 5, 10, 25, 50)
+DEFAULT_N_BINS = 20_000
+
+
+def simulate_terminal_prices(price, time_to_expiry, drift, volatility, n_paths, rng,
+                             jump_intensity=0.0, jump_mean=0.0, jump_std=0.0):
+    """
+    Draw terminal stock prices under GBM with optional Merton jumps.
+
+    Args:
+        price (float): Current stock price
+        time_to_expiry (float): Horizon in years
+        drift (float): Annualized drift (the risk-free rate for risk-neutral pricing)
+        volatility (float): Annualized diffusion volatility (decimal)
+        n_paths (int): Number of terminal prices to draw
+        rng (Generator): NumPy random generator
+        jump_intensity (float): Expected number of jumps per year (0 disables jumps)
+        jump_mean (float): Mean of the log jump size
+        jump_std (float): Standard deviation of the log jump size
+
+    Returns:
+        ndarray: Simulated terminal prices, shape (n_paths,)
+    """
+    # Compensate the drift so E[S_T] = S_0 * exp(drift * T) with or without jumps
+    jump_compensation = jump_intensity * (np.exp(jump_mean + 0.5 * jump_std ** 2) - 1)
+    log_return = ((drift - 0.5 * volatility ** 2 - jump_compensation) * time_to_expiry +
+                  volatility * np.sqrt(time_to_expiry) * rng.standard_normal(n_paths))
+
+    if jump_intensity > 0:
+        n_jumps = rng.poisson(jump_intensity * time_to_expiry, n_paths)
+        # The sum of n iid normal jumps is normal with mean n*m and variance n*s^2
+        log_return += n_jumps * jump_mean + np.sqrt(n_jumps) * jump_std * rng.standard_normal(n_paths)
+
+    return price * np.exp(log_return)
+
+
+def _covered_call_pnl(terminal_prices, price, strike, net_premium, shares):
+    """P&L of long shares plus a short call held to expiry."""
+    return shares * (np.minimum(terminal_prices, strike) - price) + net_premium
+
+
+def _histogram_percentiles(counts, edges, percentiles):
+    """Interpolate percentiles from a histogram's cumulative counts."""
+    cumulative = np.cumsum(counts)
+    total = cumulative[-1]
+    results = {}
+    for pct in percentiles:
+        target = total * pct / 100
+        bin_index = min(int(np.searchsorted(cumulative, target, side='left')), len(counts) - 1)
+        below = cumulative[bin_index - 1] if bin_index > 0 else 0
+        in_bin = counts[bin_index]
+        fraction = (target - below) / in_bin if in_bin else 0.0
+        results[pct] = edges[bin_index] + fraction * (edges[bin_index + 1] - edges[bin_index])
+    return results
+
+
+def covered_call_pnl_distribution(price, strike, premium, time_to_expiry, volatility,
+                                  drift=0.05, n_paths=DEFAULT_N_PATHS, chunk_size=DEFAULT_CHUNK_SIZE,
+                                  seed=None, n_workers=1, percentiles=DEFAULT_PERCENTILES,
+                                  n_bins=DEFAULT_N_BINS, shares=SHARES_PER_CONTRACT,
+                                  fee_per_contract=FEE_PER_CONTRACT, jump_intensity=0.0,
+                                  jump_mean=0.0, jump_std=0.0):
+    """
+    Simulate the P&L distribution of one covered call held to expiry.
+
+    The position is `shares` of stock bought at `price` plus one short call at
+    `strike` sold for `premium` per share. P&L is bounded between the stock
+    going to zero and the stock being called away, so the distribution is
+    accumulated in a fixed histogram over that range; percentiles are accurate
+    to one bin width.
+
+    Args:
+        price (float): Current stock price
+        strike (float): Call strike price
+        premium (float): Call premium per share
+        time_to_expiry (float): Time to expiration in years
+        volatility (float): Annualized volatility (decimal)
+        drift (float): Annualized drift; the default risk-free rate gives risk-neutral paths
+        n_paths (int): Total number of simulated paths
+        chunk_size (int): Paths simulated per chunk; bounds peak memory
+        seed (int or SeedSequence): Seed for reproducible results
+        n_workers (int): Threads used to simulate chunks concurrently
+        percentiles (tuple): P&L percentiles to report
+        n_bins (int): Histogram resolution for percentiles
+        shares (int): Shares covered by the call
+        fee_per_contract (float): Commission deducted from the premium
+        jump_intensity, jump_mean, jump_std (float): Merton jump parameters (see
+            simulate_terminal_prices); jumps are disabled by default
+
+    Returns:
+        dict: expected_pnl, pnl_std, expected_return (on stock cost), prob_assignment,
+            prob_loss, max_pnl, n_paths and a 'percentiles' dict of P&L values.
+
+    Raises:
+        ValueError: If an input is not positive.
+    """
+    if price <= 0 or strike <= 0 or time_to_expiry <= 0 or volatility <= 0:
+        raise ValueError("Price, strike, time to expiry, and volatility must be positive")
+    if n_paths < 1 or chunk_size < 1:
+        raise ValueError(f"n_paths and chunk_size must be at least 1, got {n_paths} and {chunk_size}")
+
+    net_premium = premium * shares - fee_per_contract
+    lower = _covered_call_pnl(0.0, price, strike, net_premium, shares)
+    upper = _covered_call_pnl(strike, price, strike, net_premium, shares)
+
+    chunk_sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        chunk_sizes.append(n_paths % chunk_size)
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    streams = seed_sequence.spawn(len(chunk_sizes))
+
+    def run_chunk(args):
+        size, stream = args
+        rng = np.random.default_rng(stream)
+        terminal = simulate_terminal_prices(price, time_to_expiry, drift, volatility, size, rng,
+                                            jump_intensity, jump_mean, jump_std)
+        pnl = _covered_call_pnl(terminal, price, strike, net_premium, shares)
+        counts, _ = np.histogram(pnl, bins=n_bins, range=(lower, upper))
+        return pnl.sum(), np.square(pnl).sum(), np.count_nonzero(terminal > strike), \
+            np.count_nonzero(pnl < 0), counts
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        # map() keeps chunk order, so the reduction is identical for any n_workers
+        chunk_results = list(pool.map(run_chunk, zip(chunk_sizes, streams)))
+
+    pnl_sum = sum(r[0] for r in chunk_results)
+    pnl_sq_sum = sum(r[1] for r in chunk_results)
+    n_assigned = sum(r[2] for r in chunk_results)
+    n_loss = sum(r[3] for r in chunk_results)
+    counts = np.sum([r[4] for r in chunk_results], axis=0)
+
+    expected_pnl = pnl_sum / n_paths
+    variance = max(pnl_sq_sum / n_paths - expected_pnl ** 2, 0.0)
+    edges = np.linspace(lower, upper, n_bins + 1)
+
+    return {
+        'expected_pnl': expected_pnl,
+        'pnl_std': np.sqrt(variance),
+        'expected_return': expected_pnl / (price * shares),
+        'prob_assignment': n_assigned / n_paths,
+        'prob_loss': n_loss / n_paths,
+        'max_pnl': upper,
+        'n_paths': n_paths,
+        'percentiles': _histogram_percentiles(counts, edges, percentiles),
+    }
+
+
+def score_candidates(candidates_df, drift=0.05, n_paths=200_000, chunk_size=DEFAULT_CHUNK_SIZE,
+                     seed=None, n_workers=1, percentiles=(1, 5), **simulation_kwargs):
+    """
+    Add Monte Carlo risk columns to candidates from select_low_risk_calls.
+
+    Uses each row's currentPrice, strike, lastPrice, impliedVolatility and
+    time_to_expiry. Each candidate gets its own spawned random stream.
+
+    Args:
+        candidates_df (DataFrame): Output of select_low_risk_calls
+        drift (float): Annualized drift for the simulated paths
+        n_paths (int): Paths per candidate
+        chunk_size (int): Paths per chunk
+        seed (int): Seed for reproducible scores
+        n_workers (int): Threads per candidate simulation
+        percentiles (tuple): P&L percentiles added as mc_pnl_p<N> columns
+        **simulation_kwargs: Passed to covered_call_pnl_distribution (e.g. jump parameters)
+
+    Returns:
+        DataFrame: Copy of candidates_df with mc_expected_pnl, mc_expected_return,
+            mc_prob_assignment, mc_prob_loss and mc_pnl_p<N> columns.
+    """
+    scored = candidates_df.copy()
+    if scored.empty:
+        return scored
+
+    streams = np.random.SeedSequence(seed).spawn(len(scored))
+    rows = []
+    for stream, (_, row) in zip(streams, scored.iterrows()):
+        result = covered_call_pnl_distribution(
+            price=float(row['currentPrice']),
+            strike=float(row['strike']),
+            premium=float(row['lastPrice']),
+            time_to_expiry=float(row['time_to_expiry']),
+            volatility=float(row['impliedVolatility']),
+            drift=drift,
+            n_paths=n_paths,
+            chunk_size=chunk_size,
+            seed=stream,
+            n_workers=n_workers,
+            percentiles=percentiles,
+            **simulation_kwargs
+        )
+        scores = {
+            'mc_expected_pnl': result['expected_pnl'],
+            'mc_expected_return': result['expected_return'],
+            'mc_prob_assignment': result['prob_assignment'],
+            'mc_prob_loss': result['prob_loss'],
+        }
+        scores.update({f'mc_pnl_p{pct}': value for pct, value in result['percentiles'].items()})
+        rows.append(scores)
+
+    return pd.concat([scored, pd.DataFrame(rows, index=scored.index)], axis=1)
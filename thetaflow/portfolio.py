@@ -0,0 +1,259 @@
+"""
+Module: portfolio
+Purpose: Covered call backtest across many underlyings with one combined equity curve.
+
+Closing prices for every ticker are aligned into a single dates x tickers matrix
+that is placed in shared memory once. Worker processes attach to it on start-up
+and each task runs an ordinary ThetaFlowBacktester on one column with that
+ticker's share of the capital, so only a ticker name and a few numbers are sent
+per task and only the daily value path and trades come back. Tickers are
+independent, so the run scales with the number of worker processes.
+"""
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtest import SHARES_PER_CONTRACT, ThetaFlowBacktester
+from .price_cache import get_default_price_cache
+from .shared_frame import SharedFrame
+
+ALLOCATION_RULES = ('equal', 'inverse_volatility')
+VOLATILITY_LOOKBACK_DAYS = 60
+STRATEGY_PARAMETERS = ('target_probability', 'strike_step', 'days_to_expiry', 'review_days', 'take_profit', 'roll')
+
+# Per-worker-process state populated by _init_worker
+_worker_prices = None
+_worker_handles = None
+_worker_settings = None
+
+
+def build_price_matrix(tickers, start_date, end_date, price_cache=None):
+    """
+    Load daily closes for many tickers and align them on one date index.
+
+    Missing days for a ticker are forward-filled; days before its first bar stay NaN.
+
+    Returns:
+        DataFrame: Closes indexed by date with one column per ticker
+    """
+    cache = price_cache or get_default_price_cache()
+    closes = {
+        ticker_symbol: cache.get_history(ticker_symbol, start_date, end_date, interval="1d")['Close']
+        for ticker_symbol in tickers
+    }
+    return pd.DataFrame(closes).sort_index().ffill()
+
+
+def allocate_capital(prices, total_capital, rule='equal', weights=None):
+    """
+    Split capital across tickers.
+
+    Args:
+        prices (DataFrame): Price matrix (dates x tickers) used by the volatility rule
+        total_capital (float): Capital to allocate
+        rule (str): 'equal', or 'inverse_volatility' (weights proportional to 1 / the
+            standard deviation of daily log returns over the rows given)
+        weights (dict): Explicit ticker -> weight; overrides `rule`. Normalized to sum to 1.
+
+    Returns:
+        Series: Capital per ticker
+
+    Raises:
+        ValueError: For an unknown rule or weights naming unknown tickers.
+    """
+    tickers = list(prices.columns)
+    if weights is not None:
+        unknown = set(weights) - set(tickers)
+        if unknown:
+            raise ValueError(f"Weights given for unknown tickers: {sorted(unknown)}")
+        raw = pd.Series({t: float(weights.get(t, 0.0)) for t in tickers})
+    elif rule == 'equal':
+        raw = pd.Series(1.0, index=tickers)
+    elif rule == 'inverse_volatility':
+        volatility = np.log(prices).diff().std()
+        raw = (1 / volatility).replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    else:
+        raise ValueError(f"Unknown allocation rule: {rule}. Use one of {ALLOCATION_RULES}")
+
+    if raw.sum() <= 0:
+        raise ValueError("Allocation weights must have a positive sum")
+    return total_capital * raw / raw.sum()
+
+
+def _init_worker(spec, settings):
+    """Attach the shared price matrix once per worker process."""
+    global _worker_prices, _worker_handles, _worker_settings
+    _worker_prices, _worker_handles = SharedFrame.attach(spec)
+    _worker_settings = settings
+
+
+def _run_ticker(task):
+    """Worker entry point: backtest one ticker against the worker's shared price matrix."""
+    return _backtest_ticker(task, _worker_prices, _worker_settings)
+
+
+def _backtest_ticker(task, prices, settings):
+    """
+    Backtest one ticker against its column of a price matrix.
+
+    Args:
+        task (tuple): (ticker, capital, round lots)
+        prices (DataFrame): Price matrix (dates x tickers)
+        settings (dict): 'start_date', 'end_date' and 'strategy' parameters
+
+    Returns:
+        dict: 'ticker', daily 'dates' and 'total_value' arrays, and the 'trades' frame
+    """
+    ticker_symbol, capital, max_contracts = task
+    closes = prices[ticker_symbol].dropna()
+    backtester = ThetaFlowBacktester(
+        ticker=ticker_symbol,
+        start_date=settings['start_date'],
+        end_date=settings['end_date'],
+        max_contracts=max_contracts,
+        initial_capital=capital,
+        **settings['strategy']
+    )
+    backtester.stock_data = closes.to_frame('Close')
+    if not closes.empty:
+        # Silence the per-run progress line; one per ticker is just noise here
+        with contextlib.redirect_stdout(io.StringIO()):
+            backtester.run_backtest()
+
+    portfolio = backtester.portfolio_value
+    trades_df = backtester.trades.to_frame(copy=True)
+    trades_df.insert(1, 'ticker', ticker_symbol)
+    return {
+        'ticker': ticker_symbol,
+        'dates': np.array(portfolio['date']),
+        'total_value': np.array(portfolio['total_value']),
+        'trades': trades_df,
+    }
+
+
+class PortfolioBacktester:
+    """
+    Covered call book across several underlyings.
+
+    Each ticker is backtested independently with its allocated capital and as many
+    round lots (up to max_contracts) as that capital buys at its first tradable close; the
+    per-ticker value paths are summed into one equity curve. Capital that buys no
+    lot, and the unallocated remainder, is held as cash.
+
+    Args:
+        tickers (list): Underlyings in the book
+        start_date (str): Backtest start date
+        end_date (str): Backtest end date
+        initial_capital (float): Capital for the whole book
+        allocation (str): Allocation rule, see allocate_capital. With
+            'inverse_volatility' the first VOLATILITY_LOOKBACK_DAYS rows are only used
+            to estimate volatility and trading starts after them (no look-ahead).
+        weights (dict): Explicit ticker -> weight, overriding `allocation`
+        max_contracts (int): Cap on round lots per ticker; None lets capital decide
+        max_workers (int): Worker processes; defaults to the CPU count. 1 runs in-process.
+        price_cache (PriceCache): Cache used to load the price matrix
+        **strategy_params: Passed to every ThetaFlowBacktester (see STRATEGY_PARAMETERS)
+    """
+
+    def __init__(self, tickers, start_date="2020-01-01", end_date="2024-12-31", initial_capital=1_000_000,
+                 allocation='equal', weights=None, max_contracts=None, max_workers=None, price_cache=None,
+                 **strategy_params):
+        unknown = set(strategy_params) - set(STRATEGY_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+        self.tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        self.start_date = pd.to_datetime(start_date)
+        self.end_date = pd.to_datetime(end_date)
+        self.initial_capital = initial_capital
+        self.allocation = allocation
+        self.weights = weights
+        self.max_contracts = max_contracts
+        self.max_workers = max_workers
+        self.price_cache = price_cache
+        self.strategy_params = strategy_params
+        self.price_matrix = None  # Dates x tickers closes, loaded on first use
+        self.capital = None  # Capital per ticker, set by run()
+
+    def load_prices(self):
+        """Load the aligned price matrix unless one was assigned beforehand."""
+        if self.price_matrix is None:
+            self.price_matrix = build_price_matrix(self.tickers, self.start_date, self.end_date, self.price_cache)
+        return self.price_matrix
+
+    def _tasks(self, prices, allocation_prices=None):
+        """
+        Allocate capital and work out each ticker's round lots.
+
+        Args:
+            prices (DataFrame): Tradable price matrix; lots are sized at each ticker's first close in it
+            allocation_prices (DataFrame): Rows used by the allocation rule; defaults to prices
+        """
+        self.capital = allocate_capital(prices if allocation_prices is None else allocation_prices,
+                                        self.initial_capital, self.allocation, self.weights)
+        tasks = []
+        for ticker_symbol in self.tickers:
+            first_close = prices[ticker_symbol].dropna()
+            lots = 0
+            if not first_close.empty:
+                lots = int(self.capital[ticker_symbol] // (first_close.iloc[0] * SHARES_PER_CONTRACT))
+            if self.max_contracts is not None:
+                lots = min(lots, self.max_contracts)
+            tasks.append((ticker_symbol, float(self.capital[ticker_symbol]), lots))
+        return tasks
+
+    def run(self):
+        """
+        Run every ticker and combine the results.
+
+        Returns:
+            tuple: (equity_df, trades_df). equity_df is indexed by date with each
+                ticker's total value, 'cash' for unallocated capital and the book's
+                'total_value'; trades_df holds every trade with a 'ticker' column.
+
+        Raises:
+            ValueError: If no price data was found.
+        """
+        prices = self.load_prices()[self.tickers]
+        if prices.dropna(how='all').empty:
+            raise ValueError("No historical data found")
+
+        if self.allocation == 'inverse_volatility' and self.weights is None:
+            lookback, prices = prices.iloc[:VOLATILITY_LOOKBACK_DAYS], prices.iloc[VOLATILITY_LOOKBACK_DAYS:]
+            tasks = self._tasks(prices, allocation_prices=lookback)
+        else:
+            tasks = self._tasks(prices)
+
+        settings = {'start_date': self.start_date, 'end_date': self.end_date, 'strategy': self.strategy_params}
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(tasks))
+
+        if max_workers == 1:
+            results = [_backtest_ticker(task, prices, settings) for task in tasks]
+        else:
+            with SharedFrame(prices) as shared:
+                with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                         initargs=(shared.spec, settings)) as pool:
+                    results = list(pool.map(_run_ticker, tasks))
+
+        return self._combine(prices.index, results)
+
+    def _combine(self, dates, results):
+        """Align per-ticker value paths on the matrix dates and sum them."""
+        values = {}
+        for result in results:
+            path = pd.Series(result['total_value'], index=pd.DatetimeIndex(result['dates']))
+            # Capital waits in cash until a ticker's first bar
+            values[result['ticker']] = path.reindex(dates).ffill().fillna(self.capital[result['ticker']])
+        equity_df = pd.DataFrame(values, index=dates)
+        equity_df['cash'] = self.initial_capital - self.capital.sum()
+        equity_df['total_value'] = equity_df.sum(axis=1)
+        equity_df.index.name = 'date'
+
+        trades = [result['trades'] for result in results if len(result['trades'])]
+        trades_df = pd.concat(trades, ignore_index=True).sort_values('date', kind='stable', ignore_index=True) \
+            if trades else pd.DataFrame()
+        return equity_df, trades_df
@@ -0,0 +1,148 @@
+"""
+Module: positions
+Purpose: Book of open short calls indexed by the date each one next needs attention.
+
+Every position is scheduled on a min-heap keyed by its next action date: its expiry,
+or an earlier review date when the strategy rolls or takes profit before expiry.
+Each trading day the backtester pops only the positions that are due, so the daily
+cost depends on how many contracts expire or need action, not on how many are open.
+Closed or rescheduled positions leave stale heap entries behind, which are discarded
+lazily when they surface.
+"""
+
+import heapq
+
+import pandas as pd
+
+
+class ShortCall:
+    """
+    One short call position.
+
+    Attributes:
+        position_id (int): Unique id within the book
+        ticker (str): Underlying ticker
+        strike (float): Strike price
+        expiry (Timestamp): Expiry date
+        contracts (int): Number of contracts (100 shares each)
+        premium (float): Premium received per share
+        opened (Timestamp): Date the call was sold
+        implied_volatility (float): IV at sale, used to reprice when no quote is available
+        action_date (Timestamp or None): When the position is next due; None while
+            it is being handled after due()
+    """
+
+    __slots__ = ('position_id', 'ticker', 'strike', 'expiry', 'contracts', 'premium', 'opened',
+                 'implied_volatility', 'action_date')
+
+    def __init__(self, position_id, ticker, strike, expiry, contracts, premium, opened,
+                 implied_volatility=float('nan')):
+        self.position_id = position_id
+        self.ticker = ticker
+        self.strike = float(strike)
+        self.expiry = pd.Timestamp(expiry)
+        self.contracts = int(contracts)
+        self.premium = float(premium)
+        self.opened = pd.Timestamp(opened)
+        self.implied_volatility = float(implied_volatility)
+        self.action_date = None
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return (f"ShortCall({self.ticker} {self.strike:g}C {self.expiry:%Y-%m-%d} x{self.contracts}, "
+                f"premium {self.premium:.2f})")
+
+
+class PositionBook:
+    """Open short calls across tickers, scheduled by next action date."""
+
+    def __init__(self):
+        self._positions = {}  # position_id -> ShortCall
+        self._schedule = []  # heap of (action_date ns, position_id)
+        self._contracts = {}  # ticker -> open contracts
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(self._positions.values())
+
+    def __contains__(self, position_id):
+        return position_id in self._positions
+
+    def get(self, position_id):
+        return self._positions[position_id]
+
+    def open_contracts(self, ticker_symbol):
+        """Return the number of open contracts on a ticker."""
+        return self._contracts.get(ticker_symbol, 0)
+
+    def open(self, ticker_symbol, strike, expiry, contracts, premium, opened, implied_volatility=float('nan'),
+             review_date=None):
+        """
+        Add a short call and schedule it.
+
+        Args:
+            review_date (Timestamp): Date to review the position before expiry; the
+                position is scheduled at its expiry when None or not before expiry
+
+        Returns:
+            ShortCall: The new position
+        """
+        position = ShortCall(self._next_id, ticker_symbol, strike, expiry, contracts, premium, opened,
+                             implied_volatility)
+        self._next_id += 1
+        self._positions[position.position_id] = position
+        self._contracts[ticker_symbol] = self._contracts.get(ticker_symbol, 0) + position.contracts
+
+        if review_date is not None and pd.Timestamp(review_date) < position.expiry:
+            self.reschedule(position, review_date)
+        else:
+            self.reschedule(position, position.expiry)
+        return position
+
+    def reschedule(self, position, action_date):
+        """Schedule an open position's next action date."""
+        position.action_date = pd.Timestamp(action_date)
+        heapq.heappush(self._schedule, (position.action_date.value, position.position_id))
+
+    def close(self, position):
+        """
+        Remove a position from the book.
+
+        Returns:
+            ShortCall: The removed position
+        """
+        position = self._positions.pop(position.position_id)
+        self._contracts[position.ticker] -= position.contracts
+        position.action_date = None
+        return position
+
+    def due(self, date):
+        """
+        Pop every position whose action date is on or before `date`.
+
+        The returned positions stay open with action_date cleared; the caller must
+        either close() or reschedule() each of them.
+
+        Returns:
+            list: Due ShortCall positions in action-date order
+        """
+        cutoff = pd.Timestamp(date).value
+        due = []
+        while self._schedule and self._schedule[0][0] <= cutoff:
+            action_ns, position_id = heapq.heappop(self._schedule)
+            position = self._positions.get(position_id)
+            # Skip entries left behind by close() or reschedule()
+            if position is None or position.action_date is None or position.action_date.value != action_ns:
+                continue
+            position.action_date = None
+            due.append(position)
+        return due
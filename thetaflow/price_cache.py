@@ -0,0 +1,264 @@
+"""
+Module: price_cache
+Purpose: Local on-disk store of historical price bars so backtests don't re-download
+the same history on every run.
+
+Bars for each (ticker, interval) are kept in a NumPy structured array saved as a .npy
+file and read back memory-mapped. A small JSON sidecar records the date range that
+has already been requested from the data source, so a repeat run only fetches the
+part of the requested range that is not covered yet (normally just the new tail).
+Newly downloaded bars are merged with the cached ones chunk by chunk while the new
+file is written, so extending years of minute bars never loads the whole cache.
+If the data source is unreachable, whatever is cached is served as-is.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from . import metrics
+from .providers import get_default_provider
+from .utils import atomic_write
+
+DEFAULT_CACHE_DIR = "data/cache/prices"
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DEFAULT_CHUNK_BARS = 50_000  # ~2.4 MB of bars per chunk
+BAR_DTYPE = np.dtype([('date', 'i8')] + [(column, 'f8') for column in PRICE_COLUMNS])
+
+
+def download_history(ticker_symbol, start, end, interval="1d"):
+    """
+    Download price bars from the default data provider.
+
+    Args:
+        ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+        start (Timestamp): First date to fetch (inclusive).
+        end (Timestamp): Last date to fetch (exclusive).
+        interval (str): Bar interval, e.g., '1d'.
+
+    Returns:
+        DataFrame: OHLCV bars indexed by a tz-naive DatetimeIndex.
+    """
+    return get_default_provider().price_history(ticker_symbol, start, end, interval)
+
+
+def _to_records(frame):
+    """Convert an OHLCV DataFrame to a BAR_DTYPE structured array."""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records['date'] = index.asi8
+    for column in PRICE_COLUMNS:
+        records[column] = frame[column].to_numpy(dtype=float) if column in frame else np.nan
+    return records
+
+
+def _to_frame(records):
+    """Convert a BAR_DTYPE structured array slice to an OHLCV DataFrame."""
+    index = pd.DatetimeIndex(records['date'].astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame({column: np.array(records[column]) for column in PRICE_COLUMNS}, index=index)
+
+
+def _dedupe_bars(records):
+    """Sort bars by date, keeping the last occurrence of a repeated date."""
+    _, last_occurrence = np.unique(records['date'][::-1], return_index=True)
+    return records[len(records) - 1 - last_occurrence]
+
+
+def _write_merged(f, existing, new, chunk_size=DEFAULT_CHUNK_BARS):
+    """
+    Stream sorted cached bars and new bars into one sorted .npy file.
+
+    The cached bars are read chunk_size at a time from their memory map and each
+    chunk is merged with the new bars that sort into it; where dates repeat, the
+    new bar wins.
+
+    Args:
+        f (file): Binary file to write the .npy data to
+        existing (ndarray): Cached BAR_DTYPE records sorted by date (may be memory-mapped)
+        new (ndarray): New BAR_DTYPE records, sorted by date with unique dates
+        chunk_size (int): Cached bars held in memory at once
+    """
+    starts = list(range(0, len(existing), chunk_size)) or [0]
+    ends = starts[1:] + [len(existing)]
+    # New bars up to the last date of a chunk belong to it; the rest go to the last chunk
+    last_dates = [existing['date'][end - 1] for end in ends[:-1]]
+    cuts = [0] + list(np.searchsorted(new['date'], last_dates, side='right')) + [len(new)]
+
+    def chunks():
+        for j, (start, end) in enumerate(zip(starts, ends)):
+            cached = np.array(existing[start:end])
+            incoming = new[cuts[j]:cuts[j + 1]]
+            yield cached[~np.isin(cached['date'], incoming['date'])], incoming
+
+    total = sum(len(cached) + len(incoming) for cached, incoming in chunks())
+    np.lib.format.write_array_header_1_0(f, {
+        'descr': np.lib.format.dtype_to_descr(BAR_DTYPE), 'fortran_order': False, 'shape': (total,)
+    })
+    for cached, incoming in chunks():
+        merged = np.concatenate([cached, incoming])
+        f.write(merged[np.argsort(merged['date'], kind='stable')].tobytes())
+
+
+class PriceCache:
+    """
+    Incrementally refreshed on-disk store of price bars per ticker.
+
+    Args:
+        cache_dir (str): Directory holding the .npy bar files and their metadata.
+        downloader (callable): Function (ticker, start, end, interval) -> OHLCV DataFrame.
+            Defaults to download_history.
+        chunk_size (int): Cached bars held in memory at once while merging new bars in.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, downloader=None, chunk_size=DEFAULT_CHUNK_BARS):
+        self.cache_dir = cache_dir
+        self.downloader = downloader or download_history
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def _paths(self, ticker_symbol, interval):
+        stem = os.path.join(self.cache_dir, f"{ticker_symbol.upper()}_{interval}")
+        return stem + ".npy", stem + ".json"
+
+    def _read_meta(self, meta_path):
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta['covered_from']), pd.Timestamp(meta['covered_until'])
+
+    def load(self, ticker_symbol, interval="1d"):
+        """
+        Return the cached bars for a ticker as a read-only memory-mapped array.
+
+        Returns:
+            ndarray: BAR_DTYPE records sorted by date (empty if nothing is cached).
+        """
+        bars_path, _ = self._paths(ticker_symbol, interval)
+        if not os.path.exists(bars_path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(bars_path, mmap_mode='r')
+
+    def refresh(self, ticker_symbol, start, end, interval="1d"):
+        """
+        Make sure [start, end) has been fetched, downloading only the uncovered parts.
+
+        Args:
+            ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+            start (str or Timestamp): First date required (inclusive).
+            end (str or Timestamp): End of the range required (exclusive).
+            interval (str): Bar interval, e.g., '1d'.
+        """
+        start = pd.Timestamp(start)
+        # Never ask for today's still-forming bar; it would be cached as final
+        end = min(pd.Timestamp(end), pd.Timestamp.now().normalize())
+        bars_path, meta_path = self._paths(ticker_symbol, interval)
+
+        with self._lock:
+            covered = self._read_meta(meta_path)
+            if covered is None:
+                missing = [(start, end)] if start < end else []
+            else:
+                covered_from, covered_until = covered
+                missing = []
+                if start < covered_from:
+                    missing.append((start, covered_from))
+                if end > covered_until:
+                    missing.append((covered_until, end))
+            if not missing:
+                metrics.increment('price_cache_hits')
+                return
+            metrics.increment('price_cache_misses')
+
+            fetched = []
+            for fetch_start, fetch_end in missing:
+                try:
+                    frame = self.downloader(ticker_symbol, fetch_start, fetch_end, interval)
+                except Exception as e:
+                    logging.warning(f"Price download failed for {ticker_symbol} "
+                                    f"{fetch_start.date()} to {fetch_end.date()}, using cache: {e}")
+                    return
+                if frame is not None and not frame.empty:
+                    fetched.append(_to_records(frame))
+                    metrics.increment('price_bars_downloaded', len(frame))
+
+            new = _dedupe_bars(np.concatenate(fetched)) if fetched else np.empty(0, dtype=BAR_DTYPE)
+            existing = self.load(ticker_symbol, interval)
+
+            covered_from = start if covered is None else min(start, covered[0])
+            covered_until = end if covered is None else max(end, covered[1])
+            # Keep the most recently downloaded bar when dates overlap
+            atomic_write(bars_path, lambda f: _write_merged(f, existing, new, self.chunk_size))
+            del existing
+            meta = {'covered_from': covered_from.isoformat(), 'covered_until': covered_until.isoformat()}
+            atomic_write(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+
+    def get_history(self, ticker_symbol, start, end, interval="1d", refresh=True):
+        """
+        Return price bars for [start, end), refreshing the cache first if needed.
+
+        Args:
+            ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+            start (str or Timestamp): First date (inclusive).
+            end (str or Timestamp): Last date (exclusive), matching DataProvider.price_history.
+            interval (str): Bar interval, e.g., '1d'.
+            refresh (bool): Fetch uncovered dates before reading; False reads the cache only.
+
+        Returns:
+            DataFrame: OHLCV bars indexed by date.
+        """
+        if refresh:
+            self.refresh(ticker_symbol, start, end, interval)
+        bars = self.load(ticker_symbol, interval)
+        lo, hi = np.searchsorted(
+            bars['date'],
+            [pd.Timestamp(start).value, pd.Timestamp(end).value],
+            side='left'
+        )
+        return _to_frame(bars[lo:hi])
+
+    def iter_chunks(self, ticker_symbol, start, end, interval="1d", chunk_size=DEFAULT_CHUNK_BARS, refresh=True):
+        """
+        Stream price bars for [start, end) in fixed-size chunks.
+
+        Bars are read from the memory-mapped cache file, so only the chunk being
+        consumed is materialized; memory stays bounded by chunk_size however long
+        the range is.
+
+        Args:
+            ticker_symbol (str): Stock ticker, e.g., 'TSLA'.
+            start (str or Timestamp): First date (inclusive).
+            end (str or Timestamp): Last date (exclusive).
+            interval (str): Bar interval, e.g., '1m'.
+            chunk_size (int): Maximum bars per chunk.
+            refresh (bool): Fetch uncovered dates before reading; False reads the cache only.
+
+        Yields:
+            DataFrame: OHLCV bars indexed by date, at most chunk_size rows each.
+        """
+        if refresh:
+            self.refresh(ticker_symbol, start, end, interval)
+        bars = self.load(ticker_symbol, interval)
+        lo, hi = np.searchsorted(
+            bars['date'],
+            [pd.Timestamp(start).value, pd.Timestamp(end).value],
+            side='left'
+        )
+        for chunk_start in range(lo, hi, chunk_size):
+            yield _to_frame(bars[chunk_start:min(chunk_start + chunk_size, hi)])
+
+
+_default_cache = None
+
+
+def get_default_price_cache():
+    """Return the process-wide PriceCache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PriceCache()
+    return _default_cache
@@ -0,0 +1,301 @@
+"""
+Module: providers
+Purpose: Pluggable market-data sources for quotes, options chains, earnings dates and
+price history.
+
+data_fetch, earnings and price_cache never talk to yfinance directly; they ask a
+DataProvider. YFinanceProvider serves live data. ReplayProvider serves responses
+recorded on disk, so selection and backtests run offline at disk speed and give the
+same answer every time. Give it a source provider to record whatever it is missing:
+
+    recorder = ReplayProvider("data/recordings", source=YFinanceProvider())
+    set_default_provider(recorder)          # live run, responses saved as they arrive
+    set_default_provider(ReplayProvider("data/recordings"))   # offline replay
+
+Setting THETAFLOW_REPLAY_DIR makes a ReplayProvider on that directory the default.
+"""
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+from .utils import atomic_write, lazy_import
+
+# yfinance is only imported the first time live data is requested
+yf = lazy_import("yfinance")
+
+DEFAULT_REPLAY_ENV = "THETAFLOW_REPLAY_DIR"
+
+
+class DataProvider(ABC):
+    """
+    Interface every market-data source implements.
+
+    All methods take an upper-case ticker symbol. Implementations must be safe to
+    call from several threads at once (data_fetch fetches chains concurrently).
+    Subclasses must implement every method; an incomplete provider cannot be
+    instantiated.
+    """
+
+    @abstractmethod
+    def current_price(self, ticker_symbol):
+        """
+        Return the most recent close.
+
+        Returns:
+            float: Latest closing price
+        """
+
+    @abstractmethod
+    def option_expiries(self, ticker_symbol):
+        """
+        Return listed option expiries, nearest first.
+
+        Returns:
+            list: Expiry dates as 'YYYY-MM-DD' strings
+        """
+
+    @abstractmethod
+    def option_chain(self, ticker_symbol, expiry):
+        """
+        Return the call chain for one expiry.
+
+        Args:
+            ticker_symbol (str): Stock ticker
+            expiry (str): Expiry date as 'YYYY-MM-DD'
+
+        Returns:
+            DataFrame: Calls in yfinance's column layout
+        """
+
+    @abstractmethod
+    def next_earnings(self, ticker_symbol):
+        """
+        Return the next earnings date.
+
+        Returns:
+            Timestamp or None: The next earnings date, or None if unavailable
+        """
+
+    @abstractmethod
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        """
+        Return OHLCV bars for [start, end).
+
+        Args:
+            ticker_symbol (str): Stock ticker
+            start (Timestamp): First date (inclusive)
+            end (Timestamp): Last date (exclusive)
+            interval (str): Bar interval, e.g., '1d'
+
+        Returns:
+            DataFrame: OHLCV bars indexed by a tz-naive DatetimeIndex
+        """
+
+
+class YFinanceProvider(DataProvider):
+    """Live data from Yahoo Finance via yfinance."""
+
+    def current_price(self, ticker_symbol):
+        return float(yf.Ticker(ticker_symbol).history(period="1d")['Close'].iloc[-1])
+
+    def option_expiries(self, ticker_symbol):
+        return list(yf.Ticker(ticker_symbol).options)
+
+    def option_chain(self, ticker_symbol, expiry):
+        return yf.Ticker(ticker_symbol).option_chain(expiry).calls
+
+    def next_earnings(self, ticker_symbol):
+        calendar = yf.Ticker(ticker_symbol).calendar
+        # Newer yfinance returns a dict of lists, older versions a DataFrame
+        if isinstance(calendar, dict):
+            dates = calendar.get('Earnings Date') or []
+            earnings = dates[0] if dates else None
+        elif isinstance(calendar, pd.DataFrame) and not calendar.empty:
+            earnings = calendar.iloc[0]['Earnings Date']
+        else:
+            earnings = None
+
+        if earnings is None:
+            return None
+        return pd.to_datetime(earnings)
+
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        data = yf.download(ticker_symbol, start=start, end=end, interval=interval, progress=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Newer yfinance returns (Price, Ticker) columns even for a single ticker
+            data.columns = data.columns.get_level_values(0)
+        if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+            # Intraday bars come back in exchange time; keep the wall-clock time, drop the zone
+            data.index = data.index.tz_localize(None)
+        return data
+
+
+class ReplayProvider(DataProvider):
+    """
+    Serve recorded responses from disk, optionally recording misses from a live source.
+
+    Each ticker gets a directory holding small JSON files for the quote, expiry list
+    and earnings date, and pickled DataFrames for chains and price history. Recordings
+    are trusted local files written by this class; do not replay files from elsewhere.
+
+    Price history is kept as one merged frame per ticker and interval, together with
+    the list of date ranges actually requested, and sliced per request. Requests
+    inside recorded ranges replay without a miss; only the uncovered gaps of a
+    request are fetched from the source (or warned about when there is none).
+
+    Args:
+        root (str): Directory holding the recordings.
+        source (DataProvider): Provider to fetch and record missing responses from.
+            With no source, a missing recording raises ValueError.
+    """
+
+    def __init__(self, root, source=None):
+        self.root = root
+        self.source = source
+        self._lock = threading.Lock()
+
+    def _path(self, ticker_symbol, name):
+        return os.path.join(self.root, ticker_symbol.upper(), name)
+
+    def _missing(self, ticker_symbol, what):
+        if self.source is None:
+            raise ValueError(f"No recorded {what} for {ticker_symbol} in {self.root}")
+
+    def _json(self, ticker_symbol, name, what, fetch, encode=lambda v: v, decode=lambda v: v):
+        path = self._path(ticker_symbol, name)
+        if os.path.exists(path):
+            with open(path) as f:
+                return decode(json.load(f))
+        self._missing(ticker_symbol, what)
+        value = fetch()
+        atomic_write(path, lambda f: json.dump(encode(value), f), mode="w")
+        return value
+
+    def current_price(self, ticker_symbol):
+        return self._json(ticker_symbol, "price.json", "price",
+                          lambda: float(self.source.current_price(ticker_symbol)))
+
+    def option_expiries(self, ticker_symbol):
+        return self._json(ticker_symbol, "expiries.json", "expiries",
+                          lambda: list(self.source.option_expiries(ticker_symbol)))
+
+    def next_earnings(self, ticker_symbol):
+        return self._json(
+            ticker_symbol, "earnings.json", "earnings date",
+            lambda: self.source.next_earnings(ticker_symbol),
+            encode=lambda v: v.isoformat() if v is not None else None,
+            decode=lambda v: pd.Timestamp(v) if v else None
+        )
+
+    def option_chain(self, ticker_symbol, expiry):
+        path = self._path(ticker_symbol, f"chain_{expiry}.pkl")
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        self._missing(ticker_symbol, f"{expiry} chain")
+        calls = self.source.option_chain(ticker_symbol, expiry)
+        atomic_write(path, calls.to_pickle)
+        return calls
+
+    def price_history(self, ticker_symbol, start, end, interval="1d"):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        data_path = self._path(ticker_symbol, f"history_{interval}.pkl")
+        meta_path = self._path(ticker_symbol, f"history_{interval}.json")
+
+        with self._lock:
+            recorded, covered = None, []
+            if os.path.exists(data_path):
+                recorded = pd.read_pickle(data_path)
+                with open(meta_path) as f:
+                    covered = _load_intervals(json.load(f))
+
+            gaps = _uncovered(start, end, covered)
+            if gaps and self.source is None:
+                if recorded is None:
+                    self._missing(ticker_symbol, f"{interval} price history")
+                missing = ", ".join(f"{gap_start:%Y-%m-%d} to {gap_end:%Y-%m-%d}" for gap_start, gap_end in gaps)
+                logging.warning(f"No recorded {ticker_symbol} history for {missing}; replaying what was recorded")
+            elif gaps:
+                fetched = [self.source.price_history(ticker_symbol, gap_start, gap_end, interval)
+                           for gap_start, gap_end in gaps]
+                merged = pd.concat(([recorded] if recorded is not None else []) + fetched)
+                recorded = merged[~merged.index.duplicated(keep='last')].sort_index()
+                covered = _merge_intervals(covered + gaps)
+                atomic_write(data_path, recorded.to_pickle)
+                atomic_write(meta_path, lambda f: json.dump(
+                    [[interval_start.isoformat(), interval_end.isoformat()] for interval_start, interval_end in covered],
+                    f), mode="w")
+
+        return recorded[(recorded.index >= start) & (recorded.index < end)]
+
+
+def _load_intervals(meta):
+    """Read recorded [start, end) intervals, accepting the old single-range [start, end] format."""
+    if meta and not isinstance(meta[0], list):
+        meta = [meta]
+    return [(pd.Timestamp(interval_start), pd.Timestamp(interval_end)) for interval_start, interval_end in meta]
+
+
+def _merge_intervals(intervals):
+    """Merge overlapping or touching [start, end) intervals into a sorted list."""
+    merged = []
+    for interval_start, interval_end in sorted(intervals):
+        if merged and interval_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], interval_end))
+        else:
+            merged.append((interval_start, interval_end))
+    return merged
+
+
+def _uncovered(start, end, intervals):
+    """Return the parts of [start, end) not covered by the sorted, merged intervals."""
+    gaps = []
+    for interval_start, interval_end in intervals:
+        if interval_end <= start:
+            continue
+        if interval_start >= end:
+            break
+        if interval_start > start:
+            gaps.append((start, interval_start))
+        start = max(start, interval_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+_default_provider = None
+_default_provider_lock = threading.Lock()
+
+
+def get_default_provider():
+    """
+    Return the process-wide DataProvider, creating it on first use.
+
+    This is a ReplayProvider on $THETAFLOW_REPLAY_DIR when that is set, otherwise a
+    YFinanceProvider.
+    """
+    global _default_provider
+    with _default_provider_lock:
+        if _default_provider is None:
+            replay_dir = os.environ.get(DEFAULT_REPLAY_ENV)
+            _default_provider = ReplayProvider(replay_dir) if replay_dir else YFinanceProvider()
+        return _default_provider
+
+
+def set_default_provider(provider):
+    """
+    Replace the process-wide DataProvider.
+
+    Args:
+        provider (DataProvider or None): New default; None restores the lazy default.
+
+    Returns:
+        DataProvider: The previous default (may be None)
+    """
+    global _default_provider
+    with _default_provider_lock:
+        previous, _default_provider = _default_provider, provider
+    return previous
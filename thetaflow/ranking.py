@@ -0,0 +1,208 @@
+"""
+Module: ranking
+Purpose: Rank covered call candidates across every expiry and strike of a chain.
+
+select_low_risk_calls filters a chain and keeps the most liquid survivors. This
+module scores every eligible contract instead, on annualized premium yield,
+probability of expiring OTM, liquidity and an earnings penalty, and returns the
+best k contracts per ticker. Features are computed once as NumPy arrays, the
+scorer maps them to one score per contract, and the top k of each ticker are
+found with np.argpartition, so only k rows per ticker are ever sorted.
+
+Scorers are plain callables taking the feature dict (see chain_features) and
+returning an array of scores where higher is better:
+
+    def yield_only(features):
+        return features['annualized_yield']
+
+    rank_candidates(chains, k=5, scorer=yield_only)
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from . import metrics
+from .earnings import get_default_calendar, ticker_from_options
+from .risk_model import estimate_delta_batch
+from .strategy import (FEE_PER_CONTRACT, MAX_IMPLIED_VOLATILITY, MIN_OPEN_INTEREST, RISK_FREE_RATE,
+                       SECONDS_PER_YEAR, _expiry_datetimes, option_prices)
+
+EARNINGS_BUFFER = timedelta(days=5)
+EARNINGS_PENALTY = 0.5  # Fraction of the score lost when expiry falls near earnings
+LIQUIDITY_REFERENCE = 10_000  # Open interest treated as fully liquid
+
+
+def make_scorer(yield_weight=1.0, probability_weight=1.0, liquidity_weight=1.0, earnings_penalty=EARNINGS_PENALTY):
+    """
+    Build a scorer combining the standard features multiplicatively.
+
+    score = annualized_yield ** yield_weight * prob_otm ** probability_weight
+            * liquidity ** liquidity_weight * (1 - earnings_penalty if near earnings else 1)
+
+    With the default weights this is the probability-weighted annualized yield,
+    discounted for thin open interest and for expiries near earnings.
+
+    Args:
+        yield_weight (float): Exponent on annualized premium yield
+        probability_weight (float): Exponent on the probability of expiring OTM
+        liquidity_weight (float): Exponent on the liquidity factor (0 ignores liquidity)
+        earnings_penalty (float): Fraction of the score removed near earnings (1 scores them zero)
+
+    Returns:
+        callable: Scorer taking a feature dict and returning an ndarray of scores
+    """
+    def scorer(features):
+        score = features['annualized_yield'] ** yield_weight * features['prob_otm'] ** probability_weight
+        if liquidity_weight:
+            score = score * features['liquidity'] ** liquidity_weight
+        return np.where(features['near_earnings'], score * (1 - earnings_penalty), score)
+    return scorer
+
+
+default_scorer = make_scorer()
+
+
+def chain_features(options_df, as_of=None, earnings_calendar=None, price_source='mid'):
+    """
+    Compute the per-contract features scorers work from.
+
+    Args:
+        options_df (DataFrame): Calls chain with strike, lastPrice, openInterest,
+            impliedVolatility, currentPrice and expiry columns; a 'ticker' column allows
+            several underlyings in one frame, otherwise the ticker comes from ticker_from_options
+        as_of (Timestamp): Valuation time; defaults to now
+        earnings_calendar (EarningsCalendar): Earnings lookup; defaults to the shared calendar
+        price_source (str): Premium used for the yield, 'mid' or 'last' (see option_prices)
+
+    Returns:
+        dict: Arrays aligned with options_df rows: 'spot', 'strike', 'premium',
+            'expiry_datetime', 'time_to_expiry' (years), 'implied_volatility',
+            'open_interest', 'annualized_yield' (premium / spot / years), 'prob_otm'
+            (1 - delta, as in select_low_risk_calls), 'liquidity' (open interest
+            relative to LIQUIDITY_REFERENCE, capped at 1, log scale) and
+            'near_earnings' (expiry within EARNINGS_BUFFER of the next earnings date)
+    """
+    current_time = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()
+    spot = options_df['currentPrice'].to_numpy(dtype=float)
+    strike = options_df['strike'].to_numpy(dtype=float)
+    premium = option_prices(options_df, price_source)
+    open_interest = options_df['openInterest'].to_numpy(dtype=float)
+    implied_volatility = options_df['impliedVolatility'].to_numpy(dtype=float)
+    expiry_datetime = _expiry_datetimes(options_df['expiry'])
+    time_to_expiry = (expiry_datetime - current_time).total_seconds().to_numpy() / SECONDS_PER_YEAR
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized_yield = premium / spot / time_to_expiry
+        liquidity = np.minimum(1.0, np.log1p(open_interest) / np.log1p(LIQUIDITY_REFERENCE))
+    prob_otm = 1 - estimate_delta_batch(spot, strike, time_to_expiry, RISK_FREE_RATE, implied_volatility)
+
+    near_earnings = np.zeros(len(options_df), dtype=bool)
+    if 'ticker' in options_df:
+        codes, tickers = pd.factorize(options_df['ticker'])
+    else:
+        ticker_symbol = ticker_from_options(options_df)
+        codes, tickers = np.zeros(len(options_df), dtype=int), [ticker_symbol] if ticker_symbol else []
+    if len(tickers):
+        earnings_calendar = earnings_calendar or get_default_calendar()
+        for code, ticker_symbol in enumerate(tickers):
+            next_earnings = earnings_calendar.next_earnings(str(ticker_symbol))
+            if next_earnings is not None:
+                rows = codes == code
+                near_earnings[rows] = abs(expiry_datetime[rows] - next_earnings) <= EARNINGS_BUFFER
+
+    return {
+        'spot': spot,
+        'strike': strike,
+        'premium': premium,
+        'expiry_datetime': expiry_datetime,
+        'time_to_expiry': time_to_expiry,
+        'implied_volatility': implied_volatility,
+        'open_interest': open_interest,
+        'annualized_yield': annualized_yield,
+        'prob_otm': prob_otm,
+        'liquidity': liquidity,
+        'near_earnings': near_earnings,
+    }
+
+
+def _top_k(scores, rows, k):
+    """Return the positions in `rows` of its k best scores, best first."""
+    if rows.size > k:
+        rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+    return rows[np.argsort(-scores[rows], kind='stable')]
+
+
+@metrics.timed('rank')
+def rank_candidates(options_df, k=2, scorer=None, min_probability=None, as_of=None, earnings_calendar=None,
+                    price_source='mid'):
+    """
+    Return the best k covered call candidates per ticker across all expiries.
+
+    Contracts go through the same eligibility checks as select_low_risk_calls
+    (liquidity, OTM, at least a day to expiry, sane IV) and are then scored.
+
+    Args:
+        options_df (DataFrame): Calls chain, typically get_options_chains output
+        k (int): Candidates returned per ticker
+        scorer (callable): Maps the feature dict to scores (higher is better);
+            defaults to default_scorer
+        min_probability (float): Drop contracts whose probability OTM is below this
+        as_of (Timestamp): Valuation time; defaults to now
+        earnings_calendar (EarningsCalendar): Earnings lookup; defaults to the shared calendar
+        price_source (str): Premium used for the yield, 'mid' or 'last'
+
+    Returns:
+        DataFrame: Selected rows of options_df with the feature columns, 'net_premium',
+            'score' and 'rank' (1 = best within its ticker), ordered by ticker then rank
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    metrics.increment('rows_ranked', len(options_df))
+    if options_df.empty:
+        return pd.DataFrame()
+
+    features = chain_features(options_df, as_of=as_of, earnings_calendar=earnings_calendar,
+                              price_source=price_source)
+    eligible = (
+        (features['open_interest'] > MIN_OPEN_INTEREST) &
+        (features['strike'] > features['spot']) &
+        (features['time_to_expiry'] >= (1 / 365.25)) &
+        (features['implied_volatility'] > 0) &
+        (features['implied_volatility'] < MAX_IMPLIED_VOLATILITY) &
+        (features['premium'] > 0) &
+        (features['prob_otm'] > 0)
+    )
+    if min_probability is not None:
+        eligible &= features['prob_otm'] >= min_probability
+
+    scores = np.asarray((scorer or default_scorer)(features), dtype=float)
+    if scores.shape != (len(options_df),):
+        raise ValueError(f"Scorer returned shape {scores.shape}, expected ({len(options_df)},)")
+    scores = np.where(eligible & ~np.isnan(scores), scores, -np.inf)
+    eligible &= np.isfinite(scores)
+
+    # Group eligible rows by ticker (a single group when there is no ticker column)
+    rows = np.flatnonzero(eligible)
+    if 'ticker' in options_df:
+        codes = pd.factorize(options_df['ticker'])[0][rows]
+        order = np.argsort(codes, kind='stable')
+        rows, codes = rows[order], codes[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        groups = np.split(rows, bounds)
+    else:
+        groups = [rows]
+
+    selected = [_top_k(scores, group, k) for group in groups if group.size]
+    if not selected:
+        return pd.DataFrame()
+    ranks = np.concatenate([np.arange(1, group.size + 1) for group in selected])
+    selected = np.concatenate(selected)
+
+    candidates = options_df.iloc[selected].copy()
+    for name in ('expiry_datetime', 'time_to_expiry', 'premium', 'annualized_yield', 'prob_otm',
+                 'liquidity', 'near_earnings'):
+        candidates[name] = features[name][selected]
+    candidates['net_premium'] = candidates['premium'] * 100 - FEE_PER_CONTRACT
+    candidates['score'] = scores[selected]
+    candidates['rank'] = ranks
+    return candidates
@@ -0,0 +1,238 @@
+"""
+Module: results_io
+Purpose: Write backtest results in compact columnar formats and render charts off the main process.
+
+Results are written as zstd-compressed Parquet or Feather when pyarrow is
+installed, and as gzip-compressed CSV otherwise (or on request). Every file is
+written to a temporary name and renamed into place, so an interrupted run never
+leaves a truncated result behind.
+
+Charts are rendered by a separate worker process started with the 'spawn' method:
+forking would copy a process that may already run threads (such as the queued
+log writer from setup_logging(queued=True)), which is unsafe and deprecated.
+Long series are downsampled
+first (keeping each bucket's minimum and maximum so spikes and drawdowns
+survive), which keeps both the data sent to the worker and the rendering time
+independent of the run length.
+
+Example:
+    paths = save_results(portfolio_df, trades_df, "data")
+    chart = render_chart_async(portfolio_df, "data/backtest_performance.png", ticker="TSLA")
+    ...
+    chart.result()  # wait for the chart before exiting
+"""
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from .utils import atomic_write
+
+RESULT_FORMATS = ('parquet', 'feather', 'csv')
+COLUMNAR_COMPRESSION = 'zstd'
+CSV_COMPRESSION = 'gzip'
+CHART_MAX_POINTS = 2000
+CHART_DPI = 300
+_EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather', 'csv': '.csv.gz'}
+
+
+def columnar_available():
+    """Return True when pyarrow is installed, so Parquet and Feather can be written."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def default_format():
+    return 'parquet' if columnar_available() else 'csv'
+
+
+def _split_extension(path):
+    """Return (path without a known results extension, format implied by it or None)."""
+    lowered = path.lower()
+    for suffix, fmt in (('.csv.gz', 'csv'), ('.csv', 'csv'), ('.parquet', 'parquet'), ('.feather', 'feather')):
+        if lowered.endswith(suffix):
+            return path[:-len(suffix)], fmt
+    return path, None
+
+
+def write_frame(df, path, format=None, index=True):
+    """
+    Atomically write a DataFrame as Parquet, Feather or compressed CSV.
+
+    Args:
+        df (DataFrame): Frame to write
+        path (str): Output path. A '.parquet', '.feather', '.csv' or '.csv.gz'
+            extension selects the format; without one the format's extension is added.
+        format (str): 'parquet', 'feather' or 'csv'; overrides the extension. Defaults
+            to the extension, else Parquet when pyarrow is installed, else CSV.
+        index (bool): Keep the index (stored as a column in Feather and CSV)
+
+    Returns:
+        str: The path written. Parquet/Feather requests fall back to '.csv.gz' with a
+            warning when pyarrow is missing.
+
+    Raises:
+        ValueError: For an unknown format.
+    """
+    stem, implied = _split_extension(path)
+    format = format or implied or default_format()
+    if format not in RESULT_FORMATS:
+        raise ValueError(f"Unknown results format: {format}. Use one of {RESULT_FORMATS}")
+    if format != 'csv' and not columnar_available():
+        logging.warning(f"pyarrow is not installed; writing {stem}.csv.gz instead of {format}")
+        format = 'csv'
+    # A plain '.csv' path stays uncompressed when asked for explicitly
+    if format == 'csv' and path.lower().endswith('.csv'):
+        path, compression = path, None
+    else:
+        path, compression = stem + _EXTENSIONS[format], CSV_COMPRESSION
+
+    if format == 'parquet':
+        atomic_write(path, lambda f: df.to_parquet(f, compression=COLUMNAR_COMPRESSION, index=index))
+    elif format == 'feather':
+        frame = df.reset_index() if index else df.reset_index(drop=True)
+        atomic_write(path, lambda f: frame.to_feather(f, compression=COLUMNAR_COMPRESSION))
+    else:
+        atomic_write(path, lambda f: df.to_csv(f, index=index, compression=compression))
+    return path
+
+
+def read_frame(path):
+    """
+    Read a file written by write_frame.
+
+    Feather and CSV files come back with a default index; restore one with set_index.
+    """
+    _, format = _split_extension(path)
+    if format == 'parquet':
+        return pd.read_parquet(path)
+    if format == 'feather':
+        return pd.read_feather(path)
+    if format == 'csv':
+        return pd.read_csv(path)
+    raise ValueError(f"Cannot tell the results format of {path}")
+
+
+def save_results(portfolio_df, trades_df, output_dir, format=None, prefix="backtest"):
+    """
+    Write a backtest's portfolio path and trades.
+
+    Args:
+        portfolio_df (DataFrame): Daily portfolio rows (from create_results, with a 'date' column)
+        trades_df (DataFrame): Trades (from create_results)
+        output_dir (str): Directory for the files
+        format (str): See write_frame
+        prefix (str): File name prefix
+
+    Returns:
+        dict: 'portfolio' and 'trades' -> path written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    return {
+        'portfolio': write_frame(portfolio_df, os.path.join(output_dir, f"{prefix}_portfolio"), format, index=False),
+        'trades': write_frame(trades_df, os.path.join(output_dir, f"{prefix}_trades"), format, index=False),
+    }
+
+
+def downsample(frame, columns, max_points=CHART_MAX_POINTS):
+    """
+    Reduce a series to at most ~max_points rows while keeping its extremes.
+
+    Rows are split into max_points // 2 equal buckets and each bucket keeps the rows
+    holding the minimum and maximum of every column, plus the first and last row.
+
+    Args:
+        frame (DataFrame): Rows in plotting order
+        columns (list): Numeric columns whose shape must be preserved
+        max_points (int): Target row count per column
+
+    Returns:
+        DataFrame: Selected rows in their original order
+    """
+    n = len(frame)
+    if n <= max_points:
+        return frame
+    n_buckets = max(1, max_points // 2)
+    bucket = np.arange(n) * n_buckets // n
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    keep = [np.array([0, n - 1])]
+    for column in columns:
+        values = frame[column].to_numpy(dtype=float)
+        values = np.where(np.isnan(values), np.inf, values)
+        # Sorting by (bucket, value) puts each bucket's minimum first and maximum last
+        order = np.lexsort((values, bucket))
+        keep.append(order[starts])
+        keep.append(order[ends])
+    rows = np.unique(np.concatenate(keep))
+    return frame.iloc[rows]
+
+
+def render_chart(portfolio_df, path, ticker="", max_points=CHART_MAX_POINTS, dpi=CHART_DPI):
+    """
+    Plot portfolio value and stock price side by side and save the figure.
+
+    Args:
+        portfolio_df (DataFrame): Portfolio rows with total_value and stock_price
+            columns, indexed by date (or with a 'date' column)
+        path (str): Image file to write
+        ticker (str): Underlying shown in the stock price title
+        max_points (int): Downsampling target per series
+        dpi (int): Image resolution
+
+    Returns:
+        str: The path written
+    """
+    import matplotlib
+    matplotlib.use("Agg")  # Headless: the worker has no display
+    import matplotlib.pyplot as plt
+
+    frame = portfolio_df.set_index('date') if 'date' in portfolio_df else portfolio_df
+    frame = downsample(frame, ['total_value', 'stock_price'], max_points)
+
+    fig, (value_ax, price_ax) = plt.subplots(1, 2, figsize=(12, 6))
+    for ax, column, title, label in (
+        (value_ax, 'total_value', 'Portfolio Value Over Time', 'Portfolio Value ($)'),
+        (price_ax, 'stock_price', f'{ticker} Stock Price'.strip(), 'Stock Price ($)'),
+    ):
+        ax.plot(frame.index, frame[column])
+        ax.set_title(title)
+        ax.set_xlabel('Date')
+        ax.set_ylabel(label)
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+
+def render_chart_async(portfolio_df, path, ticker="", max_points=CHART_MAX_POINTS, dpi=CHART_DPI):
+    """
+    Render a chart in a background process and return immediately.
+
+    The series is downsampled before it is sent to the worker, so only a few
+    thousand rows cross the process boundary. The worker is a freshly spawned
+    interpreter (not a fork), so scripts calling this must guard their entry point
+    with `if __name__ == "__main__":`. The worker process exits once the chart is
+    written; the interpreter waits for it before exiting.
+
+    Returns:
+        Future: Resolves to the path written; its exception is set if rendering
+            failed (e.g. matplotlib is not installed)
+    """
+    frame = portfolio_df.set_index('date') if 'date' in portfolio_df else portfolio_df
+    frame = downsample(frame[['total_value', 'stock_price']], ['total_value', 'stock_price'], max_points)
+    executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        future = executor.submit(render_chart, frame, path, ticker, max_points, dpi)
+    finally:
+        executor.shutdown(wait=False)
+    return future
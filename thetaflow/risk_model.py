@@ -13,85 +13,233 @@ Black-Scholes Model Assumptions:
 """
 
 import numpy as np
-from scipy.stats import norm
+from . import metrics
+from .utils import lazy_import
 
+# scipy is only imported the first time something is priced
+special = lazy_import("scipy.special")
 
-def estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+# Upper bounds beyond which inputs are treated as unrealistic
+MAX_IMPLIED_VOLATILITY = 10.0  # 1000% volatility
+MAX_TIME_TO_EXPIRY = 10.0  # 10 years
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def _valid_inputs_mask(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
     """
-    Calculate the option's delta using the Black-Scholes model.
+    Build a boolean mask of contracts whose inputs can be priced.
+
+    Mirrors the scalar validation in estimate_delta: positive price and strike,
+    0 < time_to_expiry <= MAX_TIME_TO_EXPIRY, 0 < implied_volatility <= MAX_IMPLIED_VOLATILITY
+    and a finite risk-free rate. NaN inputs fail every comparison and are masked out.
+    """
+    return (
+        (price > 0) &
+        (strike > 0) &
+        (time_to_expiry > 0) & (time_to_expiry <= MAX_TIME_TO_EXPIRY) &
+        (implied_volatility > 0) & (implied_volatility <= MAX_IMPLIED_VOLATILITY) &
+        np.isfinite(risk_free_rate)
+    )
+
+
+def _prepare_arrays(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """Broadcast inputs to float arrays and compute d1, d2 on the valid subset."""
+    price, strike, time_to_expiry, risk_free_rate, implied_volatility = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (price, strike, time_to_expiry, risk_free_rate, implied_volatility))
+    )
+    valid = _valid_inputs_mask(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
+
+    # Substitute harmless values for invalid rows so the maths never warns;
+    # the results for those rows are overwritten with NaN by the caller.
+    safe_price = np.where(valid, price, 1.0)
+    safe_strike = np.where(valid, strike, 1.0)
+    safe_time = np.where(valid, time_to_expiry, 1.0)
+    safe_rate = np.where(valid, risk_free_rate, 0.0)
+    safe_vol = np.where(valid, implied_volatility, 1.0)
+
+    sqrt_time = np.sqrt(safe_time)
+    vol_sqrt_time = safe_vol * sqrt_time
+    d1 = (np.log(safe_price / safe_strike) +
+          (safe_rate + safe_vol ** 2 / 2) * safe_time) / vol_sqrt_time
+    d2 = d1 - vol_sqrt_time
+
+    return {
+        'price': safe_price,
+        'strike': safe_strike,
+        'time': safe_time,
+        'rate': safe_rate,
+        'vol': safe_vol,
+        'sqrt_time': sqrt_time,
+        'd1': d1,
+        'd2': d2,
+        'valid': valid,
+    }
+
+
+@metrics.timed('greeks')
+def black_scholes_greeks(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """
+    Price call options and compute their Greeks for whole arrays of contracts in one pass.
+
+    Inputs are broadcast against each other, so a scalar price can be combined with
+    arrays of strikes, expiries and volatilities. Rows with invalid inputs are not
+    raised on; they are flagged in the returned 'valid' mask and carry NaN results.
 
     Args:
-        price (float): Current stock price
-        strike (float): Option strike price
-        time_to_expiry (float): Time to expiration in years
-        risk_free_rate (float): Annualized risk-free interest rate (decimal)
-        implied_volatility (float): Option implied volatility (decimal)
+        price (float or array-like): Current stock price(s)
+        strike (float or array-like): Option strike price(s)
+        time_to_expiry (float or array-like): Time to expiration in years
+        risk_free_rate (float or array-like): Annualized risk-free interest rate (decimal)
+        implied_volatility (float or array-like): Option implied volatility (decimal)
 
     Returns:
-        float: Delta value between 0 and 1 for calls
-
-    Raises:
-        ValueError: If inputs are invalid (negative or zero values)
+        dict: Arrays keyed by 'price' (theoretical call value), 'delta', 'gamma',
+            'theta' (per year), 'vega' (per 1.00 change in volatility),
+            'rho' (per 1.00 change in rate) and 'valid' (boolean mask).
     """
-    # Input validation
-    if price <= 0 or strike <= 0 or time_to_expiry <= 0 or implied_volatility <= 0:
-        raise ValueError("Price, strike, time to expiry, and volatility must be positive")
+    p = _prepare_arrays(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
+    d1, d2, valid = p['d1'], p['d2'], p['valid']
+    metrics.increment('contracts_priced', d1.size)
+
+    nd1 = special.ndtr(d1)
+    nd2 = special.ndtr(d2)
+    pdf_d1 = np.exp(-0.5 * d1 ** 2) * _INV_SQRT_2PI
+    discounted_strike = p['strike'] * np.exp(-p['rate'] * p['time'])
+
+    greeks = {
+        'price': p['price'] * nd1 - discounted_strike * nd2,
+        'delta': nd1,
+        'gamma': pdf_d1 / (p['price'] * p['vol'] * p['sqrt_time']),
+        'theta': (-p['price'] * pdf_d1 * p['vol'] / (2 * p['sqrt_time']) -
+                  p['rate'] * discounted_strike * nd2),
+        'vega': p['price'] * pdf_d1 * p['sqrt_time'],
+        'rho': discounted_strike * p['time'] * nd2,
+    }
+    for name in greeks:
+        greeks[name] = np.where(valid, greeks[name], np.nan)
+    greeks['valid'] = valid
+    return greeks
+
+
+@metrics.timed('greeks')
+def estimate_delta_batch(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """
+    Vectorized counterpart of estimate_delta.
 
-    try:
-        # Calculate d1 from Black-Scholes formula
-        d1 = (np.log(price / strike) +
-              (risk_free_rate + implied_volatility**2 / 2) * time_to_expiry) / \
-             (implied_volatility * np.sqrt(time_to_expiry))
+    Args:
+        price, strike, time_to_expiry, risk_free_rate, implied_volatility: Scalars or arrays,
+            broadcast against each other (see black_scholes_greeks).
 
-        # Delta for a call option is N(d1)
-        call_delta = norm.cdf(d1)
+    Returns:
+        ndarray: Call deltas rounded to 4 decimals, NaN where inputs are invalid.
+    """
+    p = _prepare_arrays(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
+    metrics.increment('contracts_priced', p['d1'].size)
+    delta = np.round(special.ndtr(p['d1']), 4)
+    return np.where(p['valid'], delta, np.nan)
 
-        return round(call_delta, 4)
 
-    except Exception as e:
-        raise ValueError(f"Error calculating delta: {str(e)}")
+def estimate_profit_probability_batch(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """
+    Vectorized counterpart of estimate_profit_probability.
 
+    Returns:
+        ndarray: Probability each call expires OTM (1 - delta), NaN where inputs are invalid.
+    """
+    return 1 - estimate_delta_batch(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
 
-def estimate_profit_probability(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
-    """Calculate probability of profit for a covered call"""
-    delta = estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
-    return 1 - delta  # Probability it expires OTM
-"""
-Module: risk_model
-Purpose: Contains functions for calculating risk metrics using Black-Scholes model.
 
-Black-Scholes Model Assumptions:
-1. The stock follows a lognormal random walk (Geometric Brownian Motion)
-2. No dividends are paid during the option's life
-3. Markets are efficient (no arbitrage)
-4. No transaction costs or taxes
-5. Risk-free rate is constant
-6. All securities are perfectly divisible
-7. European-style options (no early exercise)
-"""
-
-import numpy as np
-from scipy.stats import norm
+def _call_price_and_vega(price, strike, time_to_expiry, risk_free_rate, vol):
+    """Black-Scholes call value and vega for already-validated arrays."""
+    sqrt_time = np.sqrt(time_to_expiry)
+    d1 = (np.log(price / strike) + (risk_free_rate + vol ** 2 / 2) * time_to_expiry) / (vol * sqrt_time)
+    d2 = d1 - vol * sqrt_time
+    value = price * special.ndtr(d1) - strike * np.exp(-risk_free_rate * time_to_expiry) * special.ndtr(d2)
+    vega = price * np.exp(-0.5 * d1 ** 2) * _INV_SQRT_2PI * sqrt_time
+    return value, vega
 
 
-def estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+@metrics.timed('implied_volatility')
+def implied_volatility_batch(option_price, price, strike, time_to_expiry, risk_free_rate,
+                             tol=1e-6, max_iter=100, vol_low=1e-4, vol_high=MAX_IMPLIED_VOLATILITY):
     """
-    Calculate the option's delta using the Black-Scholes model.
+    Solve Black-Scholes implied volatility for whole arrays of call prices.
+
+    Runs a safeguarded Newton iteration on every contract at once: each contract
+    keeps a [low, high] bracket, takes a Newton step when it stays inside the
+    bracket and falls back to bisection when it does not (or vega is negligible).
+    Only contracts that have not converged are re-evaluated on each pass.
 
     Args:
-        price (float): Current stock price
-        strike (float): Option strike price
-        time_to_expiry (float): Time to expiration in years
-        risk_free_rate (float): Annualized risk-free interest rate (decimal)
-        implied_volatility (float): Option implied volatility (decimal)
+        option_price (float or array-like): Observed call prices
+        price (float or array-like): Current stock price(s)
+        strike (float or array-like): Option strike price(s)
+        time_to_expiry (float or array-like): Time to expiration in years
+        risk_free_rate (float or array-like): Annualized risk-free interest rate (decimal)
+        tol (float): Convergence tolerance, relative to the option price for the pricing
+            error and absolute for the width of the volatility bracket
+        max_iter (int): Maximum number of iterations
+        vol_low (float): Lower volatility bound
+        vol_high (float): Upper volatility bound
 
     Returns:
-        float: Delta value between 0 and 1 for calls
-
-    Raises:
-        ValueError: If inputs are invalid (negative or zero values)
+        ndarray: Implied volatilities, NaN where inputs are invalid, the price lies
+            outside the no-arbitrage bounds, or the solver did not converge.
     """
-    # Enhanced input validation
+    option_price, price, strike, time_to_expiry, risk_free_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (option_price, price, strike, time_to_expiry, risk_free_rate))
+    )
+    shape = option_price.shape
+    option_price, price, strike, time_to_expiry, risk_free_rate = (
+        x.ravel() for x in (option_price, price, strike, time_to_expiry, risk_free_rate)
+    )
+
+    valid = _valid_inputs_mask(price, strike, time_to_expiry, risk_free_rate, np.full_like(price, vol_low))
+    with np.errstate(invalid='ignore', over='ignore'):
+        lower_bound = np.maximum(price - strike * np.exp(-risk_free_rate * time_to_expiry), 0.0)
+    # Prices must carry some time value and stay below the stock price
+    valid &= (option_price > lower_bound) & (option_price < price)
+
+    result = np.full(option_price.shape, np.nan)
+    active = np.flatnonzero(valid)
+    if active.size == 0:
+        return result.reshape(shape)
+
+    target = option_price[active]
+    s, k, t, r = price[active], strike[active], time_to_expiry[active], risk_free_rate[active]
+    low = np.full(active.size, vol_low)
+    high = np.full(active.size, vol_high)
+    # Brenner-Subrahmanyam ATM approximation as the starting point
+    vol = np.clip(np.sqrt(2 * np.pi / t) * target / s, vol_low * 2, vol_high / 2)
+
+    for _ in range(max_iter):
+        value, vega = _call_price_and_vega(s, k, t, r, vol)
+        diff = value - target
+        done = (np.abs(diff) <= tol * target) | (high - low < tol)
+        if done.any():
+            result[active[done]] = vol[done]
+            keep = ~done
+            active, target, s, k, t, r = active[keep], target[keep], s[keep], k[keep], t[keep], r[keep]
+            low, high, vol, diff, vega = low[keep], high[keep], vol[keep], diff[keep], vega[keep]
+            if active.size == 0:
+                break
+
+        # Call value increases with volatility, so the sign of diff tightens the bracket
+        high = np.where(diff > 0, vol, high)
+        low = np.where(diff > 0, low, vol)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = vol - diff / vega
+        use_newton = (vega > 1e-12) & (newton > low) & (newton < high)
+        vol = np.where(use_newton, newton, 0.5 * (low + high))
+
+    return result.reshape(shape)
+
+
+def _validate_scalar_inputs(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """Raise ValueError with a descriptive message for invalid scalar inputs."""
     if not isinstance(price, (int, float)) or price <= 0:
         raise ValueError(f"Price must be a positive number, got: {price}")
 
@@ -108,40 +256,39 @@ def estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volati
         raise ValueError(f"Risk-free rate must be a number, got: {risk_free_rate}")
 
     # Additional validation for extreme values
-    if implied_volatility > 10:  # 1000% volatility is unrealistic
+    if implied_volatility > MAX_IMPLIED_VOLATILITY:
         raise ValueError(f"Implied volatility too high: {implied_volatility}")
 
-    if time_to_expiry > 10:  # More than 10 years is unrealistic for most options
+    if time_to_expiry > MAX_TIME_TO_EXPIRY:
         raise ValueError(f"Time to expiry too long: {time_to_expiry}")
 
-    try:
-        # Calculate d1 from Black-Scholes formula
-        sqrt_time = np.sqrt(time_to_expiry)
-        if sqrt_time == 0:
-            raise ValueError("Time to expiry is too small")
-
-        d1 = (np.log(price / strike) +
-              (risk_free_rate + implied_volatility**2 / 2) * time_to_expiry) / \
-             (implied_volatility * sqrt_time)
 
-        # Check for overflow/underflow
-        if np.isnan(d1) or np.isinf(d1):
-            raise ValueError("Invalid d1 calculation result")
+def estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
+    """
+    Calculate the option's delta using the Black-Scholes model.
 
-        # Delta for a call option is N(d1)
-        call_delta = norm.cdf(d1)
+    Args:
+        price (float): Current stock price
+        strike (float): Option strike price
+        time_to_expiry (float): Time to expiration in years
+        risk_free_rate (float): Annualized risk-free interest rate (decimal)
+        implied_volatility (float): Option implied volatility (decimal)
 
-        # Ensure result is within expected bounds
-        if np.isnan(call_delta) or call_delta < 0 or call_delta > 1:
-            raise ValueError("Invalid delta calculation result")
+    Returns:
+        float: Delta value between 0 and 1 for calls
 
-        return round(call_delta, 4)
+    Raises:
+        ValueError: If inputs are invalid (negative or zero values)
+    """
+    _validate_scalar_inputs(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
 
-    except Exception as e:
-        raise ValueError(f"Error calculating delta: {str(e)}")
+    delta = estimate_delta_batch(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
+    if np.isnan(delta):
+        raise ValueError("Invalid delta calculation result")
+    return float(delta)
 
 
 def estimate_profit_probability(price, strike, time_to_expiry, risk_free_rate, implied_volatility):
     """Calculate probability of profit for a covered call"""
     delta = estimate_delta(price, strike, time_to_expiry, risk_free_rate, implied_volatility)
-    return 1 - delta  # Probability it expires OTM
\ No newline at end of file
+    return 1 - delta  # Probability it expires OTM
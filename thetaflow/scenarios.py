@@ -0,0 +1,293 @@
+"""
+Module: scenarios
+Purpose: Revalue a book of stock and short calls over a grid of spot, volatility and time scenarios.
+
+Every call in the book is repriced with Black-Scholes at every combination of
+
+    spot shock   relative move of each underlying (-0.2 = down 20%)
+    vol shock    additive change in implied volatility (0.1 = +10 vol points)
+    time step    calendar days elapsed (calls past expiry are worth intrinsic value)
+
+in one broadcast over (positions, spots, vols, times). Terms that depend on
+fewer axes (log-moneyness, discounting, sigma * sqrt(T)) are computed on their
+own axes first, so only the final d1/d2/price arithmetic runs on the full grid.
+Positions are processed in chunks that bound peak memory, and each chunk's
+values are summed into per-ticker P&L surfaces with a single matrix product.
+
+Positions are given as a DataFrame with one row per holding:
+
+    ticker               underlying
+    quantity             shares for stock, contracts for calls (negative when short)
+    strike               call strike; NaN for stock
+    time_to_expiry       years to expiry; NaN for stock
+    implied_volatility   current IV; NaN for stock
+
+plus a mapping of ticker -> spot price. positions_from_backtester builds both
+from a ThetaFlowBacktester.
+"""
+
+import numpy as np
+import pandas as pd
+from . import metrics
+from .backtest import SHARES_PER_CONTRACT
+from .risk_model import black_scholes_greeks, special
+from .strategy import RISK_FREE_RATE, SECONDS_PER_YEAR
+
+MIN_VOLATILITY = 0.01  # Floor for shocked implied volatility
+CHUNK_ELEMENTS = 1_000_000  # Grid points evaluated per chunk (~8 MB per float array)
+DEFAULT_SPOT_SHOCKS = np.linspace(-0.3, 0.3, 25)
+DEFAULT_VOL_SHOCKS = np.linspace(-0.1, 0.3, 9)
+DEFAULT_TIME_STEPS = np.array([0, 1, 5, 10, 20])
+POSITION_COLUMNS = ('ticker', 'quantity', 'strike', 'time_to_expiry', 'implied_volatility')
+
+
+def positions_from_backtester(backtester, as_of=None):
+    """
+    Build the scenario inputs for a backtester's current holdings.
+
+    Args:
+        backtester (ThetaFlowBacktester): Backtester with a processed day
+        as_of (Timestamp): Valuation time; defaults to the backtester's last date
+
+    Returns:
+        tuple: (positions DataFrame, {ticker: spot})
+
+    Raises:
+        ValueError: If the backtester has not processed a day yet.
+    """
+    if backtester.current_price is None:
+        raise ValueError("The backtester has no current price; run it first")
+    as_of = pd.Timestamp(as_of if as_of is not None else backtester.last_date)
+    rows = []
+    if backtester.stock_position:
+        rows.append((backtester.ticker, float(backtester.stock_position), np.nan, np.nan, np.nan))
+    rows += positions_from_book(backtester.option_positions, as_of)
+    return pd.DataFrame(rows, columns=list(POSITION_COLUMNS)), {backtester.ticker: float(backtester.current_price)}
+
+
+def positions_from_book(position_book, as_of):
+    """
+    Convert open short calls to position rows.
+
+    Args:
+        position_book (PositionBook): Open short calls
+        as_of (Timestamp): Valuation time
+
+    Returns:
+        list: (ticker, quantity, strike, time_to_expiry, implied_volatility) tuples
+    """
+    as_of = pd.Timestamp(as_of)
+    return [
+        (call.ticker, -float(call.contracts), call.strike,
+         (call.expiry - as_of).total_seconds() / SECONDS_PER_YEAR, call.implied_volatility)
+        for call in position_book
+    ]
+
+
+def _call_values(spot, strike, time_to_expiry, implied_volatility, spot_shocks, vol_shocks, time_steps,
+                 risk_free_rate):
+    """
+    Black-Scholes call values of a chunk of positions over the full grid.
+
+    Returns:
+        ndarray: Values with shape (n_positions, n_spot, n_vol, n_time)
+    """
+    shocked_spot = spot[:, None] * (1 + spot_shocks)  # (c, s)
+    log_moneyness = np.log(shocked_spot / strike[:, None])  # (c, s)
+    tau = time_to_expiry[:, None] - time_steps  # (c, t)
+    live = tau > 0
+    safe_tau = np.where(live, tau, 1.0)
+    vol = np.maximum(implied_volatility[:, None] + vol_shocks, MIN_VOLATILITY)  # (c, v)
+
+    vol_sqrt_tau = vol[:, :, None] * np.sqrt(safe_tau)[:, None, :]  # (c, v, t)
+    drift = (risk_free_rate + 0.5 * vol[:, :, None] ** 2) * safe_tau[:, None, :]  # (c, v, t)
+    discounted_strike = strike[:, None] * np.exp(-risk_free_rate * safe_tau)  # (c, t)
+
+    # Full-grid arithmetic is done in place on two buffers
+    d1 = log_moneyness[:, :, None, None] + drift[:, None]
+    d1 /= vol_sqrt_tau[:, None]
+    d2 = d1 - vol_sqrt_tau[:, None]
+    values = special.ndtr(d1, out=d1)
+    values *= shocked_spot[:, :, None, None]
+    strike_leg = special.ndtr(d2, out=d2)
+    strike_leg *= discounted_strike[:, None, None, :]
+    values -= strike_leg
+
+    if not live.all():
+        intrinsic = np.maximum(shocked_spot - strike[:, None], 0.0)  # (c, s)
+        values = np.where(live[:, None, None, :], values, intrinsic[:, :, None, None])
+    return values
+
+
+class ScenarioResult:
+    """
+    P&L surfaces and risk summary of a stress run.
+
+    Attributes:
+        spot_shocks (ndarray): Relative spot moves, shape (n_spot,)
+        vol_shocks (ndarray): Additive IV changes, shape (n_vol,)
+        time_steps (ndarray): Calendar days elapsed, shape (n_time,)
+        tickers (list): Underlyings in the book
+        pnl (ndarray): Book P&L, shape (n_spot, n_vol, n_time)
+        pnl_by_ticker (ndarray): P&L per underlying, shape (n_tickers, n_spot, n_vol, n_time)
+        greeks (DataFrame): Current aggregated Greeks per ticker (see stress_test)
+    """
+
+    def __init__(self, spot_shocks, vol_shocks, time_steps, tickers, pnl_by_ticker, greeks):
+        self.spot_shocks = spot_shocks
+        self.vol_shocks = vol_shocks
+        self.time_steps = time_steps
+        self.tickers = tickers
+        self.pnl_by_ticker = pnl_by_ticker
+        self.pnl = pnl_by_ticker.sum(axis=0)
+        self.greeks = greeks
+
+    def worst_case(self, ticker=None):
+        """
+        Return the scenario with the largest loss.
+
+        Args:
+            ticker (str): Restrict to one underlying; None uses the whole book
+
+        Returns:
+            dict: 'pnl', 'spot_shock', 'vol_shock' and 'time_step' of the worst scenario
+        """
+        pnl = self.pnl if ticker is None else self.pnl_by_ticker[self.tickers.index(ticker)]
+        i, j, k = np.unravel_index(np.argmin(pnl), pnl.shape)
+        return {
+            'pnl': float(pnl[i, j, k]),
+            'spot_shock': float(self.spot_shocks[i]),
+            'vol_shock': float(self.vol_shocks[j]),
+            'time_step': float(self.time_steps[k]),
+        }
+
+    def pnl_surface(self, time_step=0):
+        """
+        Spot x vol P&L table at one time step.
+
+        Returns:
+            DataFrame: Indexed by spot shock with one column per vol shock
+        """
+        k = int(np.argmin(np.abs(self.time_steps - time_step)))
+        return pd.DataFrame(self.pnl[:, :, k], index=pd.Index(self.spot_shocks, name='spot_shock'),
+                            columns=pd.Index(self.vol_shocks, name='vol_shock'))
+
+    def to_frame(self):
+        """Every scenario as one row: spot_shock, vol_shock, time_step and pnl."""
+        spot, vol, time = np.meshgrid(self.spot_shocks, self.vol_shocks, self.time_steps, indexing='ij')
+        return pd.DataFrame({'spot_shock': spot.ravel(), 'vol_shock': vol.ravel(),
+                             'time_step': time.ravel(), 'pnl': self.pnl.ravel()})
+
+
+def _aggregate_greeks(positions, spots, tickers, codes, is_call, risk_free_rate):
+    """Current Greeks of the book per ticker, in share and dollar terms."""
+    spot = np.array([spots[t] for t in tickers])[codes]
+    quantity = positions['quantity'].to_numpy(dtype=float)
+    greeks = black_scholes_greeks(spot[is_call], positions['strike'].to_numpy(dtype=float)[is_call],
+                                  positions['time_to_expiry'].to_numpy(dtype=float)[is_call], risk_free_rate,
+                                  positions['implied_volatility'].to_numpy(dtype=float)[is_call])
+    multiplier = quantity[is_call] * SHARES_PER_CONTRACT
+
+    def per_ticker(values, stock=None):
+        total = np.bincount(codes[is_call], weights=np.nan_to_num(values) * multiplier,
+                            minlength=len(tickers)).astype(float)
+        if stock is not None:
+            total += np.bincount(codes[~is_call], weights=stock, minlength=len(tickers))
+        return total
+
+    delta = per_ticker(greeks['delta'], stock=quantity[~is_call])
+    frame = pd.DataFrame({
+        'spot': [spots[t] for t in tickers],
+        'delta': delta,  # Share-equivalent exposure
+        'dollar_delta': delta * np.array([spots[t] for t in tickers]),
+        'gamma': per_ticker(greeks['gamma']),
+        'vega': per_ticker(greeks['vega'] / 100),  # Per vol point
+        'theta': per_ticker(greeks['theta'] / 365),  # Per calendar day
+    }, index=pd.Index(tickers, name='ticker'))
+    frame.loc['TOTAL'] = frame.drop(columns='spot').sum()
+    return frame
+
+
+@metrics.timed('stress_test')
+def stress_test(positions, spots, spot_shocks=DEFAULT_SPOT_SHOCKS, vol_shocks=DEFAULT_VOL_SHOCKS,
+                time_steps=DEFAULT_TIME_STEPS, risk_free_rate=RISK_FREE_RATE, chunk_elements=CHUNK_ELEMENTS):
+    """
+    Revalue a book over every spot x vol x time scenario.
+
+    Identical calls (same ticker, strike, expiry and IV) are merged before pricing.
+    P&L is measured against the book's value at the current inputs: stock moves
+    with spot, and calls are repriced with time_to_expiry reduced by each time step.
+
+    Args:
+        positions (DataFrame): One row per holding (see module docstring)
+        spots (dict): Ticker -> current spot price
+        spot_shocks (array-like): Relative spot moves
+        vol_shocks (array-like): Additive implied volatility changes
+        time_steps (array-like): Calendar days elapsed
+        risk_free_rate (float): Annualized risk-free rate
+        chunk_elements (int): Grid values evaluated at once; bounds peak memory
+
+    Returns:
+        ScenarioResult: P&L surfaces, worst cases and aggregated Greeks. The Greeks
+            frame has one row per ticker plus 'TOTAL', with share-equivalent delta,
+            dollar delta, gamma, vega per vol point and theta per day. An empty
+            book gives zero P&L everywhere and a single zero 'TOTAL' row.
+
+    Raises:
+        ValueError: If positions lack required columns or a ticker has no spot.
+    """
+    missing = set(POSITION_COLUMNS) - set(positions.columns)
+    if missing:
+        raise ValueError(f"Positions are missing columns: {sorted(missing)}")
+    codes, tickers = pd.factorize(positions['ticker'])
+    tickers = [str(t) for t in tickers]
+    unknown = [t for t in tickers if t not in spots]
+    if unknown:
+        raise ValueError(f"No spot price for: {unknown}")
+
+    spot_shocks = np.asarray(spot_shocks, dtype=float)
+    vol_shocks = np.asarray(vol_shocks, dtype=float)
+    time_steps = np.asarray(time_steps, dtype=float)
+    time_years = time_steps * 86400 / SECONDS_PER_YEAR
+    grid_shape = (len(spot_shocks), len(vol_shocks), len(time_steps))
+    spot_by_code = np.array([spots[t] for t in tickers], dtype=float)
+
+    is_call = positions['strike'].notna().to_numpy()
+    greeks = _aggregate_greeks(positions, spots, tickers, codes, is_call, risk_free_rate)
+
+    # Stock P&L is linear in the spot shock and the same for every vol and time
+    pnl_by_ticker = np.zeros((len(tickers),) + grid_shape)
+    shares = np.bincount(codes[~is_call], weights=positions['quantity'].to_numpy(dtype=float)[~is_call],
+                         minlength=len(tickers))
+    pnl_by_ticker += (shares * spot_by_code)[:, None, None, None] * spot_shocks[None, :, None, None]
+
+    calls = positions.loc[is_call, ['strike', 'time_to_expiry', 'implied_volatility', 'quantity']]
+    calls = calls.assign(code=codes[is_call], quantity=calls['quantity'].astype(float))
+    calls = calls.groupby(['code', 'strike', 'time_to_expiry', 'implied_volatility'], as_index=False,
+                          sort=False)['quantity'].sum()
+    calls = calls[calls['quantity'] != 0]
+    metrics.increment('scenario_positions', len(calls))
+
+    if len(calls):
+        call_codes = calls['code'].to_numpy()
+        strike = calls['strike'].to_numpy(dtype=float)
+        time_to_expiry = calls['time_to_expiry'].to_numpy(dtype=float)
+        implied_volatility = calls['implied_volatility'].to_numpy(dtype=float)
+        weight = calls['quantity'].to_numpy(dtype=float) * SHARES_PER_CONTRACT
+        spot = spot_by_code[call_codes]
+        base = black_scholes_greeks(spot, strike, time_to_expiry, risk_free_rate, implied_volatility)['price']
+        base = np.where(np.isfinite(base), base, np.maximum(spot - strike, 0.0))
+
+        grid_size = int(np.prod(grid_shape))
+        chunk = max(1, chunk_elements // max(grid_size, 1))
+        for start in range(0, len(calls), chunk):
+            rows = slice(start, start + chunk)
+            values = _call_values(spot[rows], strike[rows], time_to_expiry[rows], implied_volatility[rows],
+                                  spot_shocks, vol_shocks, time_years, risk_free_rate)
+            values -= base[rows, None, None, None]
+            # Weighted one-hot (ticker x position) matrix sums the chunk per ticker in one product
+            owner = np.zeros((len(tickers), values.shape[0]))
+            owner[call_codes[rows], np.arange(values.shape[0])] = weight[rows]
+            pnl_by_ticker += np.tensordot(owner, values, axes=1)
+
+    return ScenarioResult(spot_shocks, vol_shocks, time_steps, tickers, pnl_by_ticker, greeks)
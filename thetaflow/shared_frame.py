@@ -0,0 +1,81 @@
+"""
+Module: shared_frame
+Purpose: Share a numeric DataFrame with worker processes through shared memory.
+
+The frame's values and index are copied once into multiprocessing shared-memory
+blocks. Workers attach by name and get a DataFrame that is a read-only view onto
+those blocks, so a large price history is never pickled per task.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class SharedFrame:
+    """
+    Owner of a shared-memory copy of a float DataFrame with a DatetimeIndex.
+
+    Create it in the parent process, pass `spec` to workers (e.g. through a pool
+    initializer) and call SharedFrame.attach(spec) there. The owner must call
+    close() (or use it as a context manager) to release the memory.
+
+    Args:
+        frame (DataFrame): Numeric frame to share; values are stored as float64.
+    """
+
+    def __init__(self, frame):
+        values = np.ascontiguousarray(frame.to_numpy(dtype=float))
+        index = pd.DatetimeIndex(frame.index).asi8
+
+        self._values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self._index_shm = shared_memory.SharedMemory(create=True, size=max(index.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=self._values_shm.buf)[:] = values
+        np.ndarray(index.shape, dtype=index.dtype, buffer=self._index_shm.buf)[:] = index
+
+        self.spec = {
+            'values_name': self._values_shm.name,
+            'index_name': self._index_shm.name,
+            'shape': values.shape,
+            'columns': list(frame.columns),
+            'index_label': frame.index.name,
+        }
+
+    @staticmethod
+    def attach(spec):
+        """
+        Attach to a shared frame created in another process.
+
+        Args:
+            spec (dict): The owner's `spec` attribute.
+
+        Returns:
+            tuple: (DataFrame view onto shared memory, list of SharedMemory handles).
+                Keep the handles referenced for as long as the frame is used.
+        """
+        values_shm = shared_memory.SharedMemory(name=spec['values_name'])
+        index_shm = shared_memory.SharedMemory(name=spec['index_name'])
+        values = np.ndarray(spec['shape'], dtype=np.float64, buffer=values_shm.buf)
+        index = np.ndarray(spec['shape'][:1], dtype=np.int64, buffer=index_shm.buf)
+        values.flags.writeable = False
+
+        frame = pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(index.view('datetime64[ns]'), name=spec['index_label']),
+            columns=spec['columns'],
+            copy=False
+        )
+        return frame, [values_shm, index_shm]
+
+    def close(self):
+        """Release the shared-memory blocks."""
+        for shm in (self._values_shm, self._index_shm):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
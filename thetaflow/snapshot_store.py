@@ -0,0 +1,277 @@
+"""
+Module: snapshot_store
+Purpose: Append-only archive of captured options chains for historical replay.
+
+Layout on disk (one directory per capture, never modified after it is written):
+
+    <root>/ticker=TSLA/date=2025-06-02/part-20250602T143000123456-1a2b3c4d/
+        _meta.json          row count, column dtypes and min/max stats
+        strike.npy          one .npy file per column
+        expiry.npy
+        ...
+
+Columns are stored as plain NumPy arrays (strings as fixed-width unicode,
+datetimes as datetime64[ns]; the expiry column is always stored as datetime64,
+even when the chain carries 'YYYY-MM-DD' strings) and read back memory-mapped, so a query only
+touches the pages it needs. Queries prune partitions by ticker and date from the
+directory names, skip whole captures using the expiry/strike min/max stats in
+_meta.json, and only then evaluate the expiry/strike predicates row by row before
+gathering the requested columns.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+import pandas as pd
+from . import metrics
+
+DEFAULT_ROOT = "data/snapshots"
+STATS_COLUMNS = ('expiry', 'strike')
+_META_FILE = "_meta.json"
+
+
+def _column_to_array(series):
+    """Convert a chain column to an mmap-friendly NumPy array."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = pd.DatetimeIndex(series)
+        if values.tz is not None:
+            values = values.tz_convert('UTC').tz_localize(None)
+        return values.to_numpy(dtype='datetime64[ns]')
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        if series.isna().any() and not pd.api.types.is_float_dtype(series):
+            return series.to_numpy(dtype=float)
+        return series.to_numpy()
+    # Strings and other objects are stored as fixed-width unicode
+    return series.fillna('').astype(str).to_numpy(dtype=str)
+
+
+def _write_part(part_dir, frame, captured_at):
+    """Write one capture to a temporary directory and move it into place atomically."""
+    parent = os.path.dirname(part_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        dtypes = {}
+        for column in frame.columns:
+            array = _column_to_array(frame[column])
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), array)
+            dtypes[column] = array.dtype.str
+
+        stats = {}
+        for column in STATS_COLUMNS:
+            if column in frame.columns and len(frame):
+                array = _column_to_array(frame[column])
+                if array.dtype.kind == 'M':
+                    array = array.view('i8')
+                stats[column] = [array.min().item(), array.max().item()]
+
+        meta = {
+            'n_rows': len(frame),
+            'captured_at': captured_at.isoformat(),
+            'columns': dtypes,
+            'stats': stats,
+        }
+        with open(os.path.join(tmp_dir, _META_FILE), "w") as f:
+            json.dump(meta, f)
+        os.rename(tmp_dir, part_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _range_bounds(value_range, to_number):
+    """Normalize an inclusive (low, high) range with optional None ends."""
+    if value_range is None:
+        return None
+    low, high = value_range
+    return (
+        -np.inf if low is None else to_number(low),
+        np.inf if high is None else to_number(high),
+    )
+
+
+class ChainSnapshotStore:
+    """
+    Partitioned, append-only store of options chain snapshots.
+
+    Args:
+        root (str): Directory holding the archive.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, chain_df, captured_at=None):
+        """
+        Archive a captured chain.
+
+        A frame with several tickers (e.g. from get_options_chains) is split into one
+        capture per ticker. String expiries (as set by get_options_data) are
+        converted to datetimes so they can be filtered with expiry_range.
+
+        Args:
+            chain_df (DataFrame): Chain with a 'ticker' column
+            captured_at (Timestamp): Capture time; defaults to now
+
+        Returns:
+            list: Paths of the capture directories written
+        """
+        if 'ticker' not in chain_df.columns:
+            raise ValueError("Chain must have a 'ticker' column to be archived")
+        if 'expiry' in chain_df.columns and not pd.api.types.is_datetime64_any_dtype(chain_df['expiry']):
+            chain_df = chain_df.assign(expiry=pd.to_datetime(chain_df['expiry']))
+        captured_at = pd.Timestamp(captured_at or pd.Timestamp.now())
+        if captured_at.tz is not None:
+            captured_at = captured_at.tz_convert('UTC').tz_localize(None)
+
+        written = []
+        for ticker_symbol, frame in chain_df.groupby(chain_df['ticker'].astype(str), sort=False):
+            part_name = f"part-{captured_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+            part_dir = os.path.join(self._date_dir(ticker_symbol, captured_at), part_name)
+            _write_part(part_dir, frame.reset_index(drop=True), captured_at)
+            written.append(part_dir)
+        return written
+
+    # ------------------------------------------------------------------ layout
+
+    def _ticker_dir(self, ticker_symbol):
+        return os.path.join(self.root, f"ticker={ticker_symbol.upper()}")
+
+    def _date_dir(self, ticker_symbol, date):
+        return os.path.join(self._ticker_dir(ticker_symbol), f"date={pd.Timestamp(date):%Y-%m-%d}")
+
+    def tickers(self):
+        """Return the tickers that have at least one capture."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name.split('=', 1)[1] for name in os.listdir(self.root) if name.startswith('ticker='))
+
+    def dates(self, ticker_symbol, start=None, end=None):
+        """
+        Return the capture dates for a ticker within [start, end] (inclusive).
+
+        Returns:
+            list: Sorted Timestamps
+        """
+        ticker_dir = self._ticker_dir(ticker_symbol)
+        if not os.path.isdir(ticker_dir):
+            return []
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() if end is not None else None
+        dates = []
+        for name in os.listdir(ticker_dir):
+            if not name.startswith('date='):
+                continue
+            date = pd.Timestamp(name.split('=', 1)[1])
+            if (start is None or date >= start) and (end is None or date <= end):
+                dates.append(date)
+        return sorted(dates)
+
+    def _parts(self, ticker_symbol, date):
+        date_dir = self._date_dir(ticker_symbol, date)
+        if not os.path.isdir(date_dir):
+            return []
+        # Part names start with the capture timestamp, so lexical order is capture order
+        return [os.path.join(date_dir, name) for name in sorted(os.listdir(date_dir)) if name.startswith('part-')]
+
+    # ------------------------------------------------------------------ reading
+
+    def _read_part(self, part_dir, columns, expiry_bounds, strike_bounds):
+        with open(os.path.join(part_dir, _META_FILE)) as f:
+            meta = json.load(f)
+
+        # Skip the whole capture when its min/max stats cannot satisfy the predicates
+        for column, bounds in (('expiry', expiry_bounds), ('strike', strike_bounds)):
+            if bounds is None:
+                continue
+            if column not in meta['stats']:
+                return None
+            low, high = meta['stats'][column]
+            if high < bounds[0] or low > bounds[1]:
+                metrics.increment('snapshot_parts_pruned')
+                return None
+        metrics.increment('snapshot_parts_read')
+
+        def load(column):
+            return np.load(os.path.join(part_dir, f"{column}.npy"), mmap_mode='r')
+
+        mask = None
+        for column, bounds in (('expiry', expiry_bounds), ('strike', strike_bounds)):
+            if bounds is None:
+                continue
+            values = load(column)
+            if values.dtype.kind == 'M':
+                values = values.view('i8')
+            condition = (values >= bounds[0]) & (values <= bounds[1])
+            mask = condition if mask is None else mask & condition
+
+        wanted = [c for c in (columns or meta['columns']) if c in meta['columns']]
+        if mask is None:
+            data = {column: np.array(load(column)) for column in wanted}
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return None
+            data = {column: load(column)[rows] for column in wanted}
+
+        frame = pd.DataFrame(data, columns=wanted)
+        frame['captured_at'] = pd.Timestamp(meta['captured_at'])
+        return frame
+
+    def read(self, ticker_symbol, start=None, end=None, columns=None, expiry_range=None,
+             strike_range=None, latest_per_day=True):
+        """
+        Query archived chains for one ticker.
+
+        Args:
+            ticker_symbol (str): Underlying ticker
+            start (str or Timestamp): First capture date (inclusive)
+            end (str or Timestamp): Last capture date (inclusive)
+            columns (list): Columns to load; defaults to all stored columns
+            expiry_range (tuple): Inclusive (low, high) expiry dates; either end may be None
+            strike_range (tuple): Inclusive (low, high) strikes; either end may be None
+            latest_per_day (bool): Only use the last capture of each day
+
+        Returns:
+            DataFrame: Matching rows with a 'captured_at' column (empty if none match)
+        """
+        frames = [
+            frame for _, frame in self.replay(
+                ticker_symbol, start, end, columns=columns, expiry_range=expiry_range,
+                strike_range=strike_range, latest_per_day=latest_per_day
+            )
+        ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def replay(self, ticker_symbol, start=None, end=None, columns=None, expiry_range=None,
+               strike_range=None, latest_per_day=True):
+        """
+        Yield archived chains day by day without loading the whole archive.
+
+        Takes the same arguments as read().
+
+        Yields:
+            tuple: (date, DataFrame) for every capture date with matching rows
+        """
+        expiry_bounds = _range_bounds(expiry_range, lambda d: pd.Timestamp(d).value)
+        strike_bounds = _range_bounds(strike_range, float)
+
+        for date in self.dates(ticker_symbol, start, end):
+            parts = self._parts(ticker_symbol, date)
+            if latest_per_day:
+                parts = parts[-1:]
+            frames = [
+                frame for frame in
+                (self._read_part(part, columns, expiry_bounds, strike_bounds) for part in parts)
+                if frame is not None
+            ]
+            if frames:
+                yield date, pd.concat(frames, ignore_index=True)
@@ -3,86 +3,95 @@ Module: strategy
 Purpose: To define the covered call selection rules.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-import yfinance as yf
-from .risk_model import estimate_delta
+from . import metrics
+from .earnings import get_default_calendar, ticker_from_options
+from .risk_model import estimate_delta_batch, implied_volatility_batch
 
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+MIN_OPEN_INTEREST = 1000  # Ensure liquidity
+MAX_IMPLIED_VOLATILITY = 5.0  # Remove unrealistic volatility values
+RISK_FREE_RATE = 0.05
+FEE_PER_CONTRACT = 0.65
 
-def select_low_risk_calls(options_df, max_contracts=2, target_probability=0.90):
-    """
-    Select the safest covered call with specific criteria:
-    - High probability of expiring OTM (90%)
-    - Avoid earnings dates
-    - Limited by number of contracts
-    - Weekly options preferred
 
-    Args:
-        options_df (DataFrame): Options chain data
-        max_contracts (int): Maximum number of contracts (based on shares owned)
-        target_probability (float): Desired probability of profit
+def _expiry_datetimes(expiry):
     """
-    # Get current price and next earnings date
-    ticker = yf.Ticker("TSLA")
-    current_price = options_df['currentPrice'].iloc[0]
+    Convert an expiry column to datetime64 values.
 
-    try:
-        next_earnings = pd.to_datetime(ticker.calendar.iloc[0]['Earnings Date'])
-        earnings_buffer = timedelta(days=5)  # Avoid options expiring near earnings
-    except:
-        next_earnings = None
-
-    # Filter options
-    filtered = options_df[
-        (options_df['openInterest'] > 1000) &  # Ensure liquidity
-        (options_df['strike'] > current_price)  # OTM calls only
-    ].copy()
-
-    # Calculate probability of profit (1 - delta)
-    filtered['prob_profit'] = filtered.apply(
-        lambda row: 1 - estimate_delta(
-            current_price,
-            row['strike'],
-            (pd.to_datetime(row['expiry']) - pd.Timestamp.now()).days / 365,
-            0.05,  # Risk-free rate
-            row['impliedVolatility']
-        ),
-        axis=1
-    )
-
-    # Avoid earnings dates
-    if next_earnings is not None:
-        filtered = filtered[
-            abs(pd.to_datetime(filtered['expiry']) - next_earnings) > earnings_buffer
-        ]
+    Chains repeat the same handful of expiry strings across thousands of rows,
+    so only the unique values are parsed and then broadcast back.
+    """
+    if pd.api.types.is_datetime64_any_dtype(expiry):
+        return pd.DatetimeIndex(expiry)
+    codes, uniques = pd.factorize(expiry, sort=False)
+    parsed = pd.DatetimeIndex(pd.to_datetime(uniques))
+    # factorize marks missing values with -1; take() maps those to NaT
+    return parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
 
-    # Select options meeting probability target
-    candidates = filtered[
-        (filtered['prob_profit'] >= target_probability)
-    ].sort_values('openInterest', ascending=False)
 
-    # Calculate expected profit after fees
-    fee_per_contract = 0.65
-    candidates['net_premium'] = candidates['lastPrice'] * 100 - fee_per_contract
+def option_prices(options_df, price_source='mid'):
+    """
+    Pick the observed price of each contract for IV inversion.
 
-    # Return best candidate(s) up to max_contracts
-    return candidates.head(max_contracts)
+    Args:
+        options_df (DataFrame): Options chain data
+        price_source (str): 'mid' uses the bid/ask midpoint when the quote is two-sided
+            and falls back to lastPrice; 'last' always uses lastPrice
 
+    Returns:
+        ndarray: Option prices
+    """
+    last = options_df['lastPrice'].to_numpy(dtype=float)
+    if price_source == 'last' or 'bid' not in options_df or 'ask' not in options_df:
+        return last
+    if price_source != 'mid':
+        raise ValueError(f"Unknown price source: {price_source}")
+    bid = options_df['bid'].to_numpy(dtype=float)
+    ask = options_df['ask'].to_numpy(dtype=float)
+    two_sided = (bid > 0) & (ask >= bid)
+    return np.where(two_sided, (bid + ask) / 2, last)
+
+
+def solve_chain_implied_volatility(options_df, price_source='mid', risk_free_rate=RISK_FREE_RATE,
+                                   as_of=None, tol=1e-6, max_iter=100):
+    """
+    Recompute implied volatility for a whole chain from observed prices.
 
-# Alias for clarity if you want to extend further risk filtering later
-select_covered_calls = select_low_risk_calls
-"""
-Module: strategy
-Purpose: To define the covered call selection rules.
-"""
+    yfinance's impliedVolatility is often stale or zero; this inverts Black-Scholes
+    for every contract in one batched solve (see risk_model.implied_volatility_batch).
 
-import pandas as pd
-from datetime import datetime, timedelta
-import yfinance as yf
-from .risk_model import estimate_delta
+    Args:
+        options_df (DataFrame): Options chain with strike, lastPrice, currentPrice and
+            expiry columns (bid/ask optional)
+        price_source (str): 'mid' or 'last' (see option_prices)
+        risk_free_rate (float): Annualized risk-free interest rate (decimal)
+        as_of (Timestamp): Valuation time; defaults to now
+        tol (float): Solver tolerance
+        max_iter (int): Maximum solver iterations
+
+    Returns:
+        ndarray: Solved implied volatilities, NaN where no volatility fits the price.
+    """
+    as_of = as_of or pd.Timestamp.now()
+    expiry_datetime = _expiry_datetimes(options_df['expiry'])
+    time_to_expiry = (expiry_datetime - as_of).total_seconds().to_numpy() / SECONDS_PER_YEAR
+    return implied_volatility_batch(
+        option_prices(options_df, price_source),
+        options_df['currentPrice'].to_numpy(dtype=float),
+        options_df['strike'].to_numpy(dtype=float),
+        time_to_expiry,
+        risk_free_rate,
+        tol=tol,
+        max_iter=max_iter
+    )
 
 
-def select_low_risk_calls(options_df, max_contracts=2, target_probability=0.90):
+@metrics.timed('select')
+def select_low_risk_calls(options_df, max_contracts=2, target_probability=0.90, earnings_calendar=None,
+                          solve_iv=False, as_of=None):
     """
     Select the safest covered call with specific criteria:
     - High probability of expiring OTM (90%)
@@ -90,85 +99,87 @@ def select_low_risk_calls(options_df, max_contracts=2, target_probability=0.90):
     - Limited by number of contracts
     - Weekly options preferred
 
+    The chain is filtered column-wise: liquidity, OTM, expiry and IV checks are
+    fused into a single mask over NumPy arrays, delta is computed in one batch for
+    the surviving rows, and the frame is only sliced once at the end.
+
     Args:
         options_df (DataFrame): Options chain data
         max_contracts (int): Maximum number of contracts (based on shares owned)
         target_probability (float): Desired probability of profit
+        earnings_calendar (EarningsCalendar): Cached earnings lookup; defaults to the
+            shared calendar from thetaflow.earnings
+        solve_iv (bool): Replace the reported impliedVolatility with volatilities solved
+            from bid/ask mids (see solve_chain_implied_volatility)
+        as_of (Timestamp): Valuation time for time to expiry; defaults to now
+            (backtests pass the simulated trading day)
     """
-    # Get current price and next earnings date
-    ticker = yf.Ticker("TSLA")
+    metrics.increment('rows_screened', len(options_df))
+
+    # Get current price and next earnings date for the chain's underlying
     current_price = options_df['currentPrice'].iloc[0]
+    earnings_calendar = earnings_calendar or get_default_calendar()
+    earnings_buffer = timedelta(days=5)  # Avoid options expiring near earnings
+
+    ticker_symbol = ticker_from_options(options_df)
+    next_earnings = earnings_calendar.next_earnings(ticker_symbol) if ticker_symbol else None
+
+    current_time = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()
+    open_interest = options_df['openInterest'].to_numpy()
+    strike = options_df['strike'].to_numpy(dtype=float)
+    expiry_datetime = _expiry_datetimes(options_df['expiry'])
+    time_to_expiry = (expiry_datetime - current_time).total_seconds().to_numpy() / SECONDS_PER_YEAR
+    if solve_iv:
+        implied_volatility = solve_chain_implied_volatility(options_df, as_of=current_time)
+    else:
+        implied_volatility = options_df['impliedVolatility'].to_numpy(dtype=float)
+
+    # Liquidity, OTM-only, unexpired with at least one day left, and sane IV
+    mask = (
+        (open_interest > MIN_OPEN_INTEREST) &
+        (strike > current_price) &
+        (expiry_datetime > current_time) &
+        (time_to_expiry >= (1 / 365.25)) &
+        (implied_volatility > 0) &
+        (implied_volatility < MAX_IMPLIED_VOLATILITY)
+    )
+    rows = np.flatnonzero(mask)
 
-    try:
-        next_earnings = pd.to_datetime(ticker.calendar.iloc[0]['Earnings Date'])
-        earnings_buffer = timedelta(days=5)  # Avoid options expiring near earnings
-    except:
-        next_earnings = None
-
-    # Filter options with basic criteria first
-    filtered = options_df[
-        (options_df['openInterest'] > 1000) &  # Ensure liquidity
-        (options_df['strike'] > current_price)  # OTM calls only
-        ].copy()
-
-    # Data validation and cleaning
-    current_time = pd.Timestamp.now()
-    filtered['expiry_datetime'] = pd.to_datetime(filtered['expiry'])
-
-    # Remove expired options and calculate time to expiry
-    filtered = filtered[filtered['expiry_datetime'] > current_time]
-    filtered['time_to_expiry'] = (filtered['expiry_datetime'] - current_time).dt.total_seconds() / (365.25 * 24 * 3600)
-
-    # Ensure minimum time to expiry (at least 1 day)
-    filtered = filtered[filtered['time_to_expiry'] >= (1/365.25)]
-
-    # Clean implied volatility data
-    filtered = filtered[
-        (filtered['impliedVolatility'] > 0) &
-        (filtered['impliedVolatility'] < 5.0) &  # Remove unrealistic volatility values
-        (filtered['impliedVolatility'].notna())
-        ]
-
-    if filtered.empty:
+    if rows.size == 0:
         return pd.DataFrame()
 
-    # Calculate probability of profit (1 - delta) with error handling
-    def safe_calculate_prob_profit(row):
-        try:
-            delta = estimate_delta(
-                current_price,
-                row['strike'],
-                row['time_to_expiry'],
-                0.05,  # Risk-free rate
-                row['impliedVolatility']
-            )
-            return 1 - delta
-        except (ValueError, ZeroDivisionError, OverflowError):
-            return 0.0  # Return 0 probability if calculation fails
-
-    filtered['prob_profit'] = filtered.apply(safe_calculate_prob_profit, axis=1)
-
-    # Remove rows where probability calculation failed
-    filtered = filtered[filtered['prob_profit'] > 0]
+    # Probability of profit (1 - delta); contracts that cannot be priced drop out
+    prob_profit = 1 - estimate_delta_batch(
+        current_price,
+        strike[rows],
+        time_to_expiry[rows],
+        RISK_FREE_RATE,
+        implied_volatility[rows]
+    )
+    keep = prob_profit > 0
 
     # Avoid earnings dates
     if next_earnings is not None:
-        filtered = filtered[
-            abs(filtered['expiry_datetime'] - next_earnings) > earnings_buffer
-            ]
+        keep &= abs(expiry_datetime[rows] - next_earnings) > earnings_buffer
 
     # Select options meeting probability target
-    candidates = filtered[
-        (filtered['prob_profit'] >= target_probability)
-    ].sort_values('openInterest', ascending=False)
+    keep &= prob_profit >= target_probability
+
+    rows = rows[keep]
+    candidates = options_df.iloc[rows].copy()
+    candidates['expiry_datetime'] = expiry_datetime[rows]
+    candidates['time_to_expiry'] = time_to_expiry[rows]
+    if solve_iv:
+        candidates['impliedVolatility'] = implied_volatility[rows]
+    candidates['prob_profit'] = prob_profit[keep]
+    candidates = candidates.sort_values('openInterest', ascending=False)
 
     # Calculate expected profit after fees
-    fee_per_contract = 0.65
-    candidates['net_premium'] = candidates['lastPrice'] * 100 - fee_per_contract
+    candidates['net_premium'] = candidates['lastPrice'] * 100 - FEE_PER_CONTRACT
 
     # Return best candidate(s) up to max_contracts
     return candidates.head(max_contracts)
 
 
 # Alias for clarity if you want to extend further risk filtering later
-select_covered_calls = select_low_risk_calls
\ No newline at end of file
+select_covered_calls = select_low_risk_calls
@@ -0,0 +1,135 @@
+"""
+Module: sweep
+Purpose: Run ThetaFlowBacktester over a grid of strategy parameters in parallel.
+
+The price history is loaded once in the parent process and placed in shared
+memory; each worker process attaches to it on start-up, so configurations are
+dispatched as small parameter dicts rather than pickled copies of the history.
+"""
+
+import contextlib
+import io
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtest import ThetaFlowBacktester
+from .shared_frame import SharedFrame
+
+SWEEPABLE_PARAMETERS = ('target_probability', 'max_contracts', 'strike_step', 'days_to_expiry')
+
+# Per-worker state populated by _init_worker
+_worker_history = None
+_worker_handles = None
+_worker_settings = None
+
+
+def expand_grid(param_grid):
+    """
+    Expand a parameter grid into a list of configurations.
+
+    Args:
+        param_grid (dict): Parameter name -> list of values, e.g.
+            {'target_probability': [0.85, 0.9], 'max_contracts': [1, 2]}
+
+    Returns:
+        list: One dict per combination, in itertools.product order.
+
+    Raises:
+        ValueError: If the grid names a parameter that cannot be swept.
+    """
+    unknown = set(param_grid) - set(SWEEPABLE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+
+def summarize_run(portfolio_df, trades_df, initial_capital):
+    """
+    Reduce one backtest's results to summary statistics.
+
+    Returns:
+        dict: final_value, total_return, max_drawdown (negative fraction) and n_trades.
+    """
+    total_value = portfolio_df['total_value'].to_numpy(dtype=float)
+    if total_value.size == 0:
+        final_value, max_drawdown = float(initial_capital), 0.0
+    else:
+        final_value = float(total_value[-1])
+        running_peak = np.maximum.accumulate(total_value)
+        max_drawdown = float(np.min(total_value / running_peak - 1))
+    return {
+        'final_value': final_value,
+        'total_return': final_value / initial_capital - 1,
+        'max_drawdown': max_drawdown,
+        'n_trades': len(trades_df),
+    }
+
+
+def _init_worker(spec, settings):
+    """Attach the shared price history once per worker process."""
+    global _worker_history, _worker_handles, _worker_settings
+    _worker_history, _worker_handles = SharedFrame.attach(spec)
+    _worker_settings = settings
+
+
+def _run_config(params):
+    """Run a single configuration against the worker's shared price history."""
+    backtester = ThetaFlowBacktester(
+        ticker=_worker_settings['ticker'],
+        start_date=_worker_settings['start_date'],
+        end_date=_worker_settings['end_date'],
+        trade_options=not _worker_settings['vectorized'],
+        **params
+    )
+    backtester.stock_data = _worker_history
+    # Silence the per-run progress line; hundreds of them are just noise here
+    with contextlib.redirect_stdout(io.StringIO()):
+        portfolio_df, trades_df = backtester.run_backtest(vectorized=_worker_settings['vectorized'])
+    return {**params, **summarize_run(portfolio_df, trades_df, backtester.initial_capital)}
+
+
+def run_sweep(param_grid, ticker="TSLA", start_date="2020-01-01", end_date="2024-12-31",
+              max_workers=None, stock_data=None, vectorized=False, price_cache=None):
+    """
+    Backtest every configuration in a parameter grid across a process pool.
+
+    Args:
+        param_grid (dict): Parameter name -> list of values (see expand_grid).
+        ticker (str): Underlying to backtest.
+        start_date (str): Backtest start date.
+        end_date (str): Backtest end date.
+        max_workers (int): Worker processes; defaults to the CPU count.
+        stock_data (DataFrame): Preloaded daily bars; loaded via the price cache if None.
+        vectorized (bool): Use the vectorized backtest mode in each run (no option trading).
+        price_cache (PriceCache): Cache used to load the history when stock_data is None.
+
+    Returns:
+        DataFrame: One row per configuration with its parameters, final_value,
+            total_return, max_drawdown and n_trades.
+    """
+    configs = expand_grid(param_grid)
+    if not configs:
+        return pd.DataFrame()
+
+    if stock_data is None:
+        loader = ThetaFlowBacktester(ticker=ticker, start_date=start_date, end_date=end_date,
+                                     price_cache=price_cache)
+        stock_data = loader.load_price_history()
+    if stock_data.empty:
+        raise ValueError("No historical data found")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    settings = {'ticker': ticker, 'start_date': start_date, 'end_date': end_date, 'vectorized': vectorized}
+    chunksize = max(1, len(configs) // (max_workers * 4))
+
+    with SharedFrame(stock_data[['Open', 'High', 'Low', 'Close', 'Volume']]) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.spec, settings)) as pool:
+            results = list(pool.map(_run_config, configs, chunksize=chunksize))
+
+    return pd.DataFrame(results)
@@ -1,27 +1,222 @@
 """
 Module: utils
-Purpose: Provides helper functions such as logging configuration.
+Purpose: Provides helper functions such as logging configuration, atomic file writes
+and lazy imports.
+
+This module only depends on the standard library so that it stays cheap to import.
 """
 
+import atexit
+import importlib
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import tempfile
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_BATCH_SIZE = 512
+LOG_FLUSH_INTERVAL_SECONDS = 0.5
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# Background writer installed by setup_logging(queued=True)
+_log_writer = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format each record as one JSON object per line.
+
+    Every line has 'time', 'level', 'logger' and 'message'; fields passed through
+    `extra=` are included as top-level keys, and tracebacks under 'exc_info'.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class QueuedLogWriter:
+    """
+    Background thread that drains a log queue and writes records to a file in batches.
+
+    Callers only pay for putting the record on the queue; formatting, the write and
+    the flush happen here, once per batch of up to batch_size records. When
+    max_bytes is set the file is rotated like RotatingFileHandler (log.1 ... log.N).
+
+    Args:
+        log_file (str): Path to the log file
+        formatter (logging.Formatter): Formats each record into one line
+        max_bytes (int): Rotate once the file would exceed this size; 0 disables rotation
+        backup_count (int): Rotated files to keep; 0 disables rotation, as in RotatingFileHandler
+        batch_size (int): Most records written per batch
+        flush_interval (float): Longest a record waits in the queue while logging is idle
+    """
+
+    def __init__(self, log_file, formatter, max_bytes=0, backup_count=5, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL_SECONDS):
+        self.log_file = log_file
+        self.formatter = formatter
+        # RotatingFileHandler never rolls over without backups rather than truncating the log
+        self.max_bytes = max_bytes if backup_count > 0 else 0
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self._stream = None
+        self._size = 0
+        self._thread = None
+
+    def start(self):
+        self._stream = open(self.log_file, 'a', encoding='utf-8')
+        self._size = self._stream.tell()
+        self._thread = threading.Thread(target=self._run, name='thetaflow-log-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything still queued, then stop the thread and close the file."""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._stream.close()
+        self._stream = None
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            # A None record is the stop sentinel; everything queued before it is in batch
+            running = record is not None
+            if batch:
+                self._write(batch)
+
+    def _format(self, record):
+        try:
+            return self.formatter.format(record) + '\n'
+        except Exception:
+            return f"Unformattable log record: {record.msg!r}\n"
+
+    def _write(self, batch):
+        lines = []
+        pending = 0
+        for record in batch:
+            line = self._format(record)
+            size = len(line.encode('utf-8'))
+            if self.max_bytes and self._size + pending + size > self.max_bytes and self._size + pending > 0:
+                self._stream.write(''.join(lines))
+                lines, pending = [], 0
+                self._rotate()
+            lines.append(line)
+            pending += size
+        self._stream.write(''.join(lines))
+        self._stream.flush()
+        self._size += pending
 
+    def _rotate(self):
+        self._stream.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.log_file}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.log_file}.{i + 1}")
+        os.replace(self.log_file, f"{self.log_file}.1")
+        self._stream = open(self.log_file, 'w', encoding='utf-8')
+        self._size = 0
 
-def setup_logging(log_file="logs/run_logs.txt"):
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting, including tracebacks, to the writer thread."""
+
+    def prepare(self, record):
+        # Resolve the message now, since its args may change after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(log_file="logs/run_logs.txt", queued=False, json_lines=False, max_bytes=0, backup_count=5):
     """
     Sets up the logging configuration. Logs are saved to the specified file.
 
+    With queued=True, records are put on an in-memory queue and written by a
+    background thread in batches, so logging per contract or per backtest day does
+    not put disk I/O on the caller's thread. The queue is flushed when the
+    interpreter exits or on shutdown_logging(). Worker processes do not inherit the
+    writer thread, so pool workers should log synchronously.
+
     Args:
         log_file (str): Path to the log file.
+        queued (bool): Write logs from a background thread in batches.
+        json_lines (bool): Write one JSON object per record instead of plain text.
+        max_bytes (int): Rotate the file when it would exceed this size; 0 disables rotation.
+        backup_count (int): Rotated files to keep; 0 disables rotation.
     """
     # Ensure the logs directory exists
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
+    directory = os.path.dirname(log_file)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    formatter = JsonLinesFormatter() if json_lines else logging.Formatter(LOG_FORMAT)
+    if not queued:
+        if max_bytes:
+            handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+        else:
+            handler = logging.FileHandler(log_file, mode='a')
+        handler.setFormatter(formatter)
+        logging.basicConfig(level=logging.INFO, handlers=[handler])
+        return
+
+    global _log_writer
+    shutdown_logging()
+    _log_writer = QueuedLogWriter(log_file, formatter, max_bytes=max_bytes, backup_count=backup_count)
+    _log_writer.start()
+    root = logging.getLogger()
+    root.addHandler(_QueueHandler(_log_writer.queue))
+    root.setLevel(logging.INFO)
 
-    logging.basicConfig(filename=log_file,
-                        level=logging.INFO,
-                        format='%(asctime)s - %(levelname)s - %(message)s',
-                        filemode='a')
+
+def shutdown_logging():
+    """Flush and remove the queued log writer installed by setup_logging, if any."""
+    global _log_writer
+    if _log_writer is None:
+        return
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _QueueHandler) and handler.queue is _log_writer.queue:
+            root.removeHandler(handler)
+    _log_writer.stop()
+    _log_writer = None
+
+
+atexit.register(shutdown_logging)
 
 
 def log_message(message):
@@ -32,3 +227,81 @@ def log_message(message):
         message (str): The message you wish to log.
     """
     logging.info(message)
+
+
+def atomic_write(path, write, mode="wb"):
+    """
+    Write a file via a temporary file in the same directory and rename it into place.
+
+    Readers see either the old file or the complete new one, never a partial write.
+
+    Args:
+        path (str): Destination file; its directory is created if needed.
+        write (callable): Called with the open temporary file object.
+        mode (str): File mode, "wb" for binary or "w" for text.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+
+    Lets heavy dependencies (yfinance, scipy) be referenced at module level
+    without paying their import cost until a function actually uses them.
+    Attribute reads and writes are forwarded to the real module, so code and
+    tests can treat it exactly like the imported module.
+
+    Args:
+        name (str): Fully qualified module name, e.g. 'yfinance'.
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        module = object.__getattribute__(self, '_module')
+        if module is None:
+            # import_module is thread-safe and returns the cached module after the first call
+            module = importlib.import_module(object.__getattribute__(self, '_name'))
+            object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if object.__getattribute__(self, '_module') is not None else "not loaded"
+        return f"<lazy module '{object.__getattribute__(self, '_name')}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Return a module, deferring its import until it is first used.
+
+    Args:
+        name (str): Fully qualified module name.
+
+    Returns:
+        module or LazyModule: The module itself if it is already imported.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
@@ -0,0 +1,371 @@
+"""
+Module: vol_surface
+Purpose: Implied volatility surfaces fitted per expiry with the SVI smile, cached by ticker and date.
+
+Each expiry slice is a raw SVI curve in total implied variance w = sigma^2 * T
+against forward log-moneyness k = log(strike / forward):
+
+    w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + s^2))
+
+Between fitted expiries total variance is interpolated linearly in time at the
+same log-moneyness; before the first and after the last expiry the nearest
+slice's implied volatility is held constant. Evaluation is pure NumPy over
+arrays of strikes and tenors, so a fitted surface can price whole chains (or a
+dates x strikes grid) without refitting.
+
+Surfaces come from:
+    - VolatilitySurface.fit(chain): least-squares fit of every expiry in a real chain
+    - parametric_surface(atm_volatility): a fixed skew around a chosen ATM level,
+      used for simulated chains when no fitted parameters are available
+    - SurfaceCache: fitted surfaces keyed by (ticker, date), in memory and
+      optionally persisted as small JSON files, so each day is fitted once;
+      SurfaceCache.latest serves the prior close's surface to avoid same-day look-ahead
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+from . import metrics
+from .strategy import (MAX_IMPLIED_VOLATILITY, MIN_OPEN_INTEREST, RISK_FREE_RATE, SECONDS_PER_YEAR,
+                       _expiry_datetimes)
+from .utils import atomic_write, lazy_import
+
+# scipy is only imported the first time a surface is fitted
+optimize = lazy_import("scipy.optimize")
+
+MIN_SLICE_POINTS = 5  # Fewer quotes than SVI's five parameters cannot pin a slice down
+MIN_TOTAL_VARIANCE = 1e-8
+# Shape of the simulated smile, in annualized variance units
+SIMULATED_SKEW = {'b': 0.15, 'rho': -0.5, 'm': 0.0, 's': 0.2}
+PARAMETER_NAMES = ('a', 'b', 'rho', 'm', 's')
+
+
+def svi_total_variance(k, a, b, rho, m, s):
+    """
+    Evaluate the raw SVI total variance.
+
+    All arguments broadcast against each other, so per-point parameters can be
+    gathered from several slices at once. Results are floored at a tiny positive
+    variance so implied volatility stays real.
+    """
+    x = k - m
+    return np.maximum(a + b * (rho * x + np.sqrt(x * x + s * s)), MIN_TOTAL_VARIANCE)
+
+
+def fit_svi_slice(log_moneyness, total_variance, weights=None):
+    """
+    Fit one expiry's SVI parameters by bounded least squares.
+
+    Args:
+        log_moneyness (ndarray): Forward log-moneyness of each quote
+        total_variance (ndarray): Observed implied variance * time to expiry
+        weights (ndarray): Optional per-quote residual weights
+
+    Returns:
+        ndarray: (a, b, rho, m, s)
+    """
+    k = np.asarray(log_moneyness, dtype=float)
+    w = np.asarray(total_variance, dtype=float)
+    weights = np.ones_like(w) if weights is None else np.asarray(weights, dtype=float)
+    k_span = max(float(np.ptp(k)), 0.05)
+    w_max = float(w.max())
+
+    def residuals(params):
+        return weights * (svi_total_variance(k, *params) - w)
+
+    initial = np.array([float(w.min()), 0.1 * w_max / k_span, -0.3, float(k[np.argmin(w)]), 0.1])
+    lower = np.array([-w_max, 0.0, -0.999, float(k.min()) - k_span, 1e-4])
+    upper = np.array([w_max, 10.0 * w_max / k_span, 0.999, float(k.max()) + k_span, 2.0 * k_span])
+    result = optimize.least_squares(residuals, np.clip(initial, lower, upper), bounds=(lower, upper))
+    return result.x
+
+
+class VolatilitySurface:
+    """
+    SVI slices at fixed tenors with vectorized interpolation in strike and tenor.
+
+    Args:
+        tenors (array-like): Time to expiry of each slice in years, strictly increasing
+        params (array-like): SVI parameters per slice, shape (n_slices, 5)
+        spot (float): Underlying price the surface was fitted at
+        risk_free_rate (float): Rate used to compute forwards
+        as_of (Timestamp): Fit time (informational)
+    """
+
+    def __init__(self, tenors, params, spot, risk_free_rate=RISK_FREE_RATE, as_of=None):
+        self.tenors = np.asarray(tenors, dtype=float)
+        self.params = np.asarray(params, dtype=float).reshape(len(self.tenors), len(PARAMETER_NAMES))
+        if len(self.tenors) == 0:
+            raise ValueError("A volatility surface needs at least one slice")
+        if np.any(self.tenors <= 0) or np.any(np.diff(self.tenors) <= 0):
+            raise ValueError("Slice tenors must be positive and strictly increasing")
+        self.spot = float(spot)
+        self.risk_free_rate = float(risk_free_rate)
+        self.as_of = None if as_of is None else pd.Timestamp(as_of)
+
+    def __repr__(self):
+        return f"VolatilitySurface({len(self.tenors)} slices, spot {self.spot:g})"
+
+    def total_variance(self, strike, time_to_expiry, spot=None):
+        """
+        Total implied variance for any strikes and tenors (broadcast against each other).
+
+        Args:
+            strike (float or ndarray): Strike prices
+            time_to_expiry (float or ndarray): Years to expiry; non-positive tenors give NaN
+            spot (float or ndarray): Underlying price; defaults to the fit spot. Passing
+                today's price keeps the smile fixed in moneyness (sticky-moneyness).
+
+        Returns:
+            ndarray: Total variance with the broadcast shape of the inputs
+        """
+        spot = self.spot if spot is None else spot
+        strike, t, spot = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (strike, time_to_expiry, spot)))
+        positive = t > 0
+        safe_t = np.where(positive, t, self.tenors[0])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = np.log(strike / spot) - self.risk_free_rate * safe_t
+
+        # Bracketing slices; outside the fitted range both point at the nearest slice
+        n = len(self.tenors)
+        upper = np.searchsorted(self.tenors, safe_t)
+        hi = np.minimum(upper, n - 1)
+        lo = np.clip(upper - 1, 0, n - 1)
+        w_lo = svi_total_variance(k, *(self.params[lo, i] for i in range(len(PARAMETER_NAMES))))
+        w_hi = svi_total_variance(k, *(self.params[hi, i] for i in range(len(PARAMETER_NAMES))))
+        t_lo, t_hi = self.tenors[lo], self.tenors[hi]
+
+        same = lo == hi
+        weight = np.where(same, 0.0, (safe_t - t_lo) / np.where(same, 1.0, t_hi - t_lo))
+        # Hold implied volatility constant outside the fitted tenors
+        variance = np.where(same, w_lo * safe_t / t_lo, w_lo + weight * (w_hi - w_lo))
+        return np.where(positive, variance, np.nan)
+
+    def implied_volatility(self, strike, time_to_expiry, spot=None):
+        """
+        Implied volatility for any strikes and tenors (see total_variance for the arguments).
+
+        Returns:
+            ndarray: Annualized implied volatilities; NaN where time_to_expiry <= 0
+        """
+        variance = self.total_variance(strike, time_to_expiry, spot)
+        with np.errstate(invalid='ignore'):
+            return np.sqrt(variance / np.asarray(time_to_expiry, dtype=float))
+
+    def to_dict(self):
+        return {
+            'tenors': self.tenors.tolist(),
+            'params': self.params.tolist(),
+            'spot': self.spot,
+            'risk_free_rate': self.risk_free_rate,
+            'as_of': None if self.as_of is None else self.as_of.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['tenors'], data['params'], data['spot'], data['risk_free_rate'], data.get('as_of'))
+
+    @classmethod
+    @metrics.timed('surface_fit')
+    def fit(cls, options_df, as_of=None, risk_free_rate=RISK_FREE_RATE, min_open_interest=MIN_OPEN_INTEREST,
+            min_points=MIN_SLICE_POINTS):
+        """
+        Fit an SVI slice to every expiry of a calls chain.
+
+        Quotes with open interest at or below min_open_interest, or with implied
+        volatility outside (0, strategy.MAX_IMPLIED_VOLATILITY), are ignored;
+        residuals are weighted by sqrt(open interest) so liquid strikes dominate.
+        Expiries with fewer than min_points usable quotes are skipped.
+
+        Args:
+            options_df (DataFrame): One underlying's chain with strike, impliedVolatility,
+                openInterest, currentPrice and expiry columns
+            as_of (Timestamp): Valuation time; defaults to now
+            risk_free_rate (float): Rate used to compute forwards
+            min_open_interest (int): Liquidity floor for quotes used in the fit
+            min_points (int): Minimum usable quotes per expiry
+
+        Returns:
+            VolatilitySurface: Surface with one slice per fitted expiry
+
+        Raises:
+            ValueError: If no expiry has enough usable quotes.
+        """
+        as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.now()
+        spot = float(options_df['currentPrice'].iloc[0])
+        strike = options_df['strike'].to_numpy(dtype=float)
+        implied_volatility = options_df['impliedVolatility'].to_numpy(dtype=float)
+        open_interest = options_df['openInterest'].to_numpy(dtype=float)
+        expiry = _expiry_datetimes(options_df['expiry'])
+        time_to_expiry = (expiry - as_of).total_seconds().to_numpy() / SECONDS_PER_YEAR
+
+        usable = (
+            (open_interest > min_open_interest) & (strike > 0) & (time_to_expiry > 0) &
+            (implied_volatility > 0) & (implied_volatility < MAX_IMPLIED_VOLATILITY)
+        )
+        tenors, params = [], []
+        for tenor in np.unique(time_to_expiry[usable]):
+            rows = usable & (time_to_expiry == tenor)
+            if rows.sum() < min_points:
+                continue
+            log_moneyness = np.log(strike[rows] / spot) - risk_free_rate * tenor
+            total_variance = implied_volatility[rows] ** 2 * tenor
+            # Scale residuals to implied-volatility terms so short expiries are not ignored
+            weights = np.sqrt(open_interest[rows]) / tenor
+            tenors.append(tenor)
+            params.append(fit_svi_slice(log_moneyness, total_variance, weights / weights.max()))
+
+        if not tenors:
+            raise ValueError(f"No expiry has at least {min_points} liquid quotes to fit")
+        metrics.increment('surface_slices_fitted', len(tenors))
+        return cls(tenors, params, spot, risk_free_rate, as_of)
+
+
+def parametric_surface(atm_volatility, spot=100.0, risk_free_rate=RISK_FREE_RATE, skew=None):
+    """
+    Build a surface with a fixed equity-style skew around a given ATM volatility.
+
+    The smile is the same at every tenor in implied-volatility terms, with put-side
+    strikes trading at higher volatility than calls. Because the surface is defined
+    in moneyness, pass each day's price as `spot` when evaluating it.
+
+    Args:
+        atm_volatility (float): Implied volatility at the forward
+        spot (float): Reference price stored on the surface
+        risk_free_rate (float): Rate used to compute forwards
+        skew (dict): SVI shape 'b', 'rho', 'm', 's' in annualized units; defaults to SIMULATED_SKEW
+
+    Returns:
+        VolatilitySurface: Single one-year slice; other tenors scale from it
+    """
+    shape = dict(SIMULATED_SKEW, **(skew or {}))
+    b, rho, m, s = shape['b'], shape['rho'], shape['m'], shape['s']
+    # Choose a so that w(0) = atm_volatility^2 over one year
+    a = atm_volatility ** 2 - b * (-rho * m + np.sqrt(m * m + s * s))
+    return VolatilitySurface([1.0], [[a, b, rho, m, s]], spot, risk_free_rate)
+
+
+class SurfaceCache:
+    """
+    Fitted surfaces keyed by (ticker, date), so each trading day is fitted once.
+
+    Surfaces are kept in memory and, when `root` is given, persisted as one JSON
+    file per ticker and date (<root>/<TICKER>/<YYYY-MM-DD>.json) that later runs
+    read back instead of refitting.
+
+    Args:
+        root (str): Directory for persisted surfaces; None keeps them in memory only
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+        self._surfaces = {}  # (ticker, date) -> VolatilitySurface
+        self._dates = {}  # ticker -> sorted list of dates with a surface
+
+    def _path(self, ticker_symbol, date):
+        return os.path.join(self.root, ticker_symbol, f"{date:%Y-%m-%d}.json")
+
+    def _index(self, ticker_symbol):
+        """Sorted dates with a surface for a ticker, scanning the directory on first use."""
+        dates = self._dates.get(ticker_symbol)
+        if dates is None:
+            dates = set()
+            directory = os.path.join(self.root, ticker_symbol) if self.root else None
+            if directory and os.path.isdir(directory):
+                dates.update(pd.Timestamp(name[:-5]) for name in os.listdir(directory) if name.endswith(".json"))
+            dates.update(date for ticker, date in self._surfaces if ticker == ticker_symbol)
+            dates = self._dates[ticker_symbol] = sorted(dates)
+        return dates
+
+    def put(self, ticker_symbol, date, surface):
+        """Store a surface for a ticker and trading date."""
+        ticker_symbol, date = ticker_symbol.upper(), pd.Timestamp(date).normalize()
+        dates = self._index(ticker_symbol)
+        position = bisect_right(dates, date)
+        if position == 0 or dates[position - 1] != date:
+            dates.insert(position, date)
+        self._surfaces[(ticker_symbol, date)] = surface
+        if self.root:
+            payload = json.dumps(surface.to_dict()).encode()
+            atomic_write(self._path(ticker_symbol, date), lambda f: f.write(payload))
+
+    def get(self, ticker_symbol, date):
+        """
+        Return the surface stored for exactly this ticker and date.
+
+        Returns:
+            VolatilitySurface or None
+        """
+        ticker_symbol, date = ticker_symbol.upper(), pd.Timestamp(date).normalize()
+        surface = self._surfaces.get((ticker_symbol, date))
+        if surface is None and self.root and os.path.exists(self._path(ticker_symbol, date)):
+            with open(self._path(ticker_symbol, date)) as f:
+                surface = VolatilitySurface.from_dict(json.load(f))
+            self._surfaces[(ticker_symbol, date)] = surface
+        metrics.increment('surface_cache_hits' if surface is not None else 'surface_cache_misses')
+        return surface
+
+    def latest(self, ticker_symbol, date, include_date=False):
+        """
+        Return the most recent surface fitted before a date (the prior close).
+
+        In a replay the surface stored for a day was fitted from that day's chain,
+        so using it to price the same day would be look-ahead; by default only
+        earlier days are considered.
+
+        Args:
+            ticker_symbol (str): Underlying ticker
+            date (Timestamp): Day being priced
+            include_date (bool): Also accept a surface stored for `date` itself, for
+                live use once the day's chain has been fitted
+
+        Returns:
+            VolatilitySurface or None
+        """
+        ticker_symbol, date = ticker_symbol.upper(), pd.Timestamp(date).normalize()
+        dates = self._index(ticker_symbol)
+        position = (bisect_right if include_date else bisect_left)(dates, date)
+        if position == 0:
+            return None
+        return self.get(ticker_symbol, dates[position - 1])
+
+    def fit(self, ticker_symbol, date, options_df, **fit_kwargs):
+        """
+        Return the cached surface for a ticker and date, fitting it from a chain on a miss.
+
+        Args:
+            ticker_symbol (str): Underlying ticker
+            date (Timestamp): Capture time of the chain; the surface is keyed by its date
+            options_df (DataFrame): The ticker's chain
+            **fit_kwargs: Passed to VolatilitySurface.fit
+
+        Returns:
+            VolatilitySurface
+        """
+        surface = self.get(ticker_symbol, date)
+        if surface is None:
+            fit_kwargs.setdefault('as_of', date)
+            surface = VolatilitySurface.fit(options_df, **fit_kwargs)
+            self.put(ticker_symbol, date, surface)
+        return surface
+
+    def fit_snapshots(self, snapshot_store, ticker_symbol, start=None, end=None):
+        """
+        Fit and cache a surface for every archived trading day of a ticker.
+
+        Days already cached are not refitted; days whose chain cannot be fitted are skipped.
+
+        Returns:
+            int: Number of days with a surface after the call
+        """
+        fitted = 0
+        for date, chain in snapshot_store.replay(ticker_symbol, start, end):
+            try:
+                self.fit(ticker_symbol, date, chain)
+            except ValueError:
+                continue
+            fitted += 1
+        return fitted